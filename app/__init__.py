@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, url_for
 from flask_caching import Cache
 from flask_wtf.csrf import CSRFProtect
 from dotenv import load_dotenv
@@ -66,11 +66,28 @@ def create_app(config_name=None):
     app.jinja_env.globals['inline_css'] = inline_css
     from app.utils.bike_images import bike_list_thumb_url
     app.jinja_env.globals['bike_list_thumb_url'] = bike_list_thumb_url
+    from app.services.catalog_service import catalog_bike_count
+    app.jinja_env.globals['catalog_bike_count'] = catalog_bike_count
+    from app.utils.spec_translations import SPEC_TRANSLATIONS_ASSET, SPEC_TRANSLATIONS_VERSION
+    app.jinja_env.globals['spec_translations_url'] = lambda: url_for(
+        'static', filename=SPEC_TRANSLATIONS_ASSET, v=SPEC_TRANSLATIONS_VERSION
+    )
     
     # Create database tables (if they don't exist)
     with app.app_context():
         db.create_all()
-    
+        # Slug / uuid -> id index used to resolve bike URLs
+        try:
+            from app.services.bike_index import get_bike_index
+            get_bike_index()
+        except Exception as e:
+            print(f"Error building bike index at startup: {e}")
+
+    # Counter write-behind: flush this worker's spool (and any left by dead workers) from boot on
+    if app.config.get('COUNTERS_WRITE_BEHIND', True):
+        from app.services.counter_buffer import start_counter_flusher
+        start_counter_flusher(app)
+
     # Register error handlers
     from .utils.error_handlers import register_error_handlers
     register_error_handlers(app)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -37,8 +38,32 @@ class Config:
     VERSION = os.getenv('APP_VERSION', '1.0.0')
     
     # Cache settings
-    CACHE_TYPE = 'simple'
+    # The cache is shared by all gunicorn workers so cold workers don't re-run
+    # the catalog queries and /api/clear-cache or a tag invalidation reaches
+    # every worker. Default is an on-disk cache; set CACHE_REDIS_URL to use
+    # Redis (or any Redis-protocol server) instead - needs the `redis` package.
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_TYPE = os.getenv('CACHE_TYPE') or ('RedisCache' if CACHE_REDIS_URL else 'FileSystemCache')
+    CACHE_DIR = os.getenv('CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'emtb-cache')
+    CACHE_THRESHOLD = int(os.getenv('CACHE_THRESHOLD', '5000'))  # Max entries before FileSystemCache prunes
+    CACHE_KEY_PREFIX = 'emtb:'
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
+    # Where the catalog feature store (.npz, one file per catalog version) is kept;
+    # defaults to CACHE_DIR. Must be shared by workers on the same host.
+    FEATURE_STORE_DIR = os.getenv('FEATURE_STORE_DIR')
+    # Public site URL(s) the cache warm-up requests pages as, comma-separated
+    # (e.g. "https://www.example.com"); cached pages are keyed per host.
+    WARMUP_BASE_URL = os.getenv('WARMUP_BASE_URL')
+
+    # Compare counts / purchase clicks are spooled to disk by the request and
+    # written to the database in batches (see app/services/counter_buffer.py).
+    # The spool is the only copy of unflushed events, so it must survive reboots and
+    # restarts: it lives in the project (data/counter_spool), not in /tmp.
+    COUNTERS_WRITE_BEHIND = os.getenv('COUNTERS_WRITE_BEHIND', 'true').lower() == 'true'
+    COUNTER_SPOOL_DIR = os.getenv('COUNTER_SPOOL_DIR') or os.path.abspath(
+        os.path.join(os.path.dirname(__file__), '..', 'data', 'counter_spool')
+    )
+    COUNTER_FLUSH_SECONDS = float(os.getenv('COUNTER_FLUSH_SECONDS', '5'))
     
     # Feature flags
     USE_NEW_BIKE_FORMAT = os.getenv('USE_NEW_BIKE_FORMAT', 'false').lower() == 'true'
@@ -56,6 +81,23 @@ class Config:
     
     # OpenAI settings
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+    # Background AI comparisons (app/services/comparison_jobs.py): threads per
+    # worker, when an unfinished job is reported as failed, and how often the
+    # events stream re-reads a job.
+    AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', '4'))
+    AI_JOB_TIMEOUT_SECONDS = int(os.getenv('AI_JOB_TIMEOUT_SECONDS', '300'))
+    AI_JOB_POLL_SECONDS = float(os.getenv('AI_JOB_POLL_SECONDS', '1'))
+    # Offer the server-sent events stream to clients (they poll otherwise). An open stream holds
+    # a worker thread for the whole job: only enable with threaded / async gunicorn workers.
+    AI_JOB_EVENTS = os.getenv('AI_JOB_EVENTS', 'false').lower() == 'true'
+    # Stream the completion and publish each finished part of the answer to the events stream
+    AI_STREAM_COMPARISONS = os.getenv('AI_STREAM_COMPARISONS', 'true').lower() == 'true'
+    # Repeat comparisons of the same bikes reuse the stored result for this long (0 = until the catalog changes)
+    AI_COMPARISON_CACHE_TTL_HOURS = float(os.getenv('AI_COMPARISON_CACHE_TTL_HOURS', '720'))
+    # Per-bike web research is reused for this long; lookups that found nothing are retried sooner
+    AI_RESEARCH_TTL_HOURS = float(os.getenv('AI_RESEARCH_TTL_HOURS', '336'))
+    AI_RESEARCH_NEGATIVE_TTL_HOURS = float(os.getenv('AI_RESEARCH_NEGATIVE_TTL_HOURS', '6'))
     
     # Email settings
     EMAIL_USER = os.getenv('EMAIL_USER')
@@ -88,6 +130,8 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     WTF_CSRF_ENABLED = False
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')  # Keep test runs isolated from the shared cache
+    COUNTERS_WRITE_BEHIND = False  # Counters are written before the request returns
 
 # Configuration dictionary
 config = {
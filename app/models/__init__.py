@@ -1,14 +1,14 @@
 # Models package
 from .models import (
     User, Brand, Source, Bike, BikeListing, BikePrice,
-    BikeSpecRaw, BikeSpecStd, BikeImage, BikeVariant,
-    CompareCount, Comparison,
+    BikeSpecRaw, BikeSpecStd, BikeImage, BikeVariant, BikeCatalogRow, BikeSimilar, DataVersion,
+    CompareCount, Comparison, ComparisonCacheEntry, ComparisonJob, BikeResearch,
     AvailabilityLead, ContactLead, StoreRequestLead, PurchaseClick, Guide, BlogPost
 )
 
 __all__ = [
     'User', 'Brand', 'Source', 'Bike', 'BikeListing', 'BikePrice',
-    'BikeSpecRaw', 'BikeSpecStd', 'BikeImage', 'BikeVariant',
-    'CompareCount', 'Comparison',
+    'BikeSpecRaw', 'BikeSpecStd', 'BikeImage', 'BikeVariant', 'BikeCatalogRow', 'BikeSimilar', 'DataVersion',
+    'CompareCount', 'Comparison', 'ComparisonCacheEntry', 'ComparisonJob', 'BikeResearch',
     'AvailabilityLead', 'ContactLead', 'StoreRequestLead', 'PurchaseClick', 'Guide', 'BlogPost'
 ]
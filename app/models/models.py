@@ -1,7 +1,7 @@
 from datetime import datetime
 import uuid
 from sqlalchemy import (
-    Column, Integer, BigInteger, String, Text, Boolean, DateTime,
+    Column, Integer, BigInteger, String, Text, Boolean, DateTime, Float,
     ForeignKey, UniqueConstraint, Index,
 )
 from sqlalchemy.dialects.mysql import CHAR, DECIMAL
@@ -10,6 +10,9 @@ from ..extensions import db
 
 Base = db.Model
 
+# Essential specs for filtering (the only raw specs Bike.to_dict includes in list view)
+LIST_VIEW_SPEC_KEYS = frozenset({'wh', 'frame_material', 'frame', 'motor_brand', 'motor', 'wheel_size'})
+
 
 # ---------------------------
 # Users
@@ -173,15 +176,12 @@ class Bike(Base):
         if include_specs and self.listings:
             # Get raw specs from the first listing
             if self.listings[0].raw_specs:
-                # Essential specs for filtering (used in list view)
-                essential_specs = {'wh', 'frame_material', 'frame', 'motor_brand', 'motor', 'wheel_size'}
-                
                 for raw_spec in self.listings[0].raw_specs:
                     # Use the raw spec key and value directly
                     if raw_spec.spec_value_raw:
                         spec_key = raw_spec.spec_key_raw
                         # In list_view mode, only include essential specs for filtering
-                        if not list_view or spec_key in essential_specs:
+                        if not list_view or spec_key in LIST_VIEW_SPEC_KEYS:
                             data[spec_key] = raw_spec.spec_value_raw
         
         # Gallery images as JSON string (template compatible)
@@ -378,6 +378,107 @@ class BikeVariant(Base):
         }
 
 
+# ---------------------------
+# Catalog snapshot (denormalized list-view rows)
+# ---------------------------
+class BikeCatalogRow(Base):
+    """One flat, precomputed list-view row per bike.
+
+    Rebuilt wholesale by ``app.services.catalog_service.rebuild_catalog_rows``
+    at the end of each data migration, so list pages can be served with a
+    single indexed SELECT instead of joining brand/listings/prices/raw_specs
+    and calling ``Bike.to_dict`` row by row.
+    """
+    __tablename__ = "bike_catalog_rows"
+    __table_args__ = (
+        Index("ix_bike_catalog_rows_category", "category"),
+        Index("ix_bike_catalog_rows_category_sub", "category", "sub_category"),
+        Index("ix_bike_catalog_rows_category_price", "category", "price_value"),
+        Index("ix_bike_catalog_rows_frame_material", "frame_material"),
+        Index("ix_bike_catalog_rows_motor_brand", "motor_brand"),
+        Index("ix_bike_catalog_rows_wh", "wh"),
+    )
+
+    bike_id = Column(BigInteger, ForeignKey("bikes.id", ondelete="CASCADE"), primary_key=True)
+    public_id = Column(String(255), nullable=False)  # slug, falling back to uuid
+    brand = Column(String(255))
+    model = Column(String(255))
+    year = Column(Integer)
+    category = Column(String(50))
+    sub_category = Column(String(50))
+    style = Column(String(50))
+    fork_length = Column(String(50))
+    image_url = Column(Text)
+    thumb_url = Column(Text)  # proxied WebP list thumbnail (see bike_list_thumb_url)
+    product_url = Column(String(500))
+    price = Column(String(32))  # latest original_price, as rendered by to_dict
+    disc_price = Column(String(32))  # latest disc_price, as rendered by to_dict
+    price_value = Column(Integer)  # parsed current price (disc_price, else price)
+    wh = Column(Integer)  # bike_specs_std 'wh' spec_numeric, else digit-only raw 'wh'
+    fork_mm = Column(Integer)  # bike_specs_std 'fork_length' spec_numeric, else first number of fork_length
+    frame_material = Column(String(20))  # 'carbon' / 'aluminium' / NULL
+    motor_brand = Column(String(50))
+    wheel_size = Column(Integer)
+    specs_json = Column(Text)  # essential raw specs, keyed exactly as in to_dict
+    built_at = Column(DateTime, default=datetime.utcnow)
+
+    def to_dict(self, include_thumb=False):
+        """Rebuild the ``Bike.to_dict(list_view=True, include_images=False)`` shape."""
+        import json as _json
+        data = {
+            'id': self.public_id,
+            'brand': self.brand,
+            'model': self.model,
+            'year': str(self.year) if self.year else None,
+            'image_url': self.image_url,
+            'sub_category': self.sub_category,
+            'category': self.category,
+            'style': self.style,
+            'fork_length': self.fork_length,
+            'product_url': self.product_url,
+            'price': self.price,
+            'disc_price': self.disc_price,
+        }
+        if self.specs_json:
+            try:
+                data.update(_json.loads(self.specs_json))
+            except (ValueError, TypeError):
+                pass
+        data['gallery_images_urls'] = None
+        if include_thumb:
+            data['list_image_url'] = self.thumb_url
+        return data
+
+
+class BikeSimilar(Base):
+    """Precomputed top-K similar bikes per bike (rank 0 = most similar).
+
+    Rebuilt with the catalog snapshot by
+    ``app.services.similarity_service.rebuild_similar_index`` so the
+    ``/similar_bikes`` endpoint is a single primary-key range read.
+    """
+    __tablename__ = "bike_similar"
+    bike_id = Column(BigInteger, ForeignKey("bikes.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    similar_bike_id = Column(BigInteger, ForeignKey("bikes.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)  # lower is more similar
+
+
+# ---------------------------
+# Data versions (cache validators)
+# ---------------------------
+class DataVersion(Base):
+    """Monotonic version counter per data scope ('catalog', 'content').
+
+    Bumped by migrations (catalog) and admin edits (blog/guides); page caches
+    derive their ETag / Last-Modified from it.
+    """
+    __tablename__ = "data_versions"
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # ---------------------------
 # Comparisons & Counts
 # ---------------------------
@@ -416,6 +517,52 @@ class Comparison(Base):
         }
 
 
+class ComparisonCacheEntry(Base):
+    """Content-addressed index of AI comparisons: one row per bike set / catalog version / prompt version."""
+    __tablename__ = "comparison_cache"
+
+    cache_key = Column(String(40), primary_key=True)  # see comparison_jobs.comparison_cache_key
+    comparison_id = Column(BigInteger, ForeignKey("comparisons.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    comparison = relationship("Comparison")
+
+
+class BikeResearch(Base):
+    """Web research for one brand + model + year, reused by every AI comparison (see app/services/bike_research.py).
+
+    ``answer`` is NULL for a lookup that found nothing (cached for a shorter time).
+    """
+    __tablename__ = "bike_research"
+
+    research_key = Column(String(40), primary_key=True)  # sha1 of the normalised brand|model|year
+    query = Column(String(255), nullable=False)
+    answer = Column(Text)
+    source = Column(String(20))  # openai_web, ddg
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ComparisonJob(Base):
+    """AI comparison queued by a visitor and run in the background (see app/services/comparison_jobs.py)."""
+    __tablename__ = "comparison_jobs"
+    __table_args__ = (
+        Index("ix_comparison_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(String(32), primary_key=True)  # random token; the client's handle on the job
+    status = Column(String(20), nullable=False, default="queued")  # queued / running / done / failed
+    stage = Column(String(20), nullable=True)  # while running: research / generating / saving
+    bike_ids = Column(Text, nullable=False)  # JSON array of bike IDs (slug or uuid), as in Comparison
+    comparison_id = Column(BigInteger, ForeignKey("comparisons.id", ondelete="SET NULL"), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    comparison = relationship("Comparison")
+
+
 # ---------------------------
 # Lead Tables
 # ---------------------------
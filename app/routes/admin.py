@@ -9,6 +9,7 @@ from app.models import (
     PurchaseClick, Source, Bike, Brand,
 )
 from app.utils.helpers import generate_slug_from_title
+from app.services.data_version import bump_data_version, CONTENT
 from datetime import datetime, timedelta
 import os
 import re
@@ -425,6 +426,7 @@ def guide_new():
         try:
             db.session.add(guide)
             db.session.commit()
+            bump_data_version(CONTENT)
             flash('המדריך נוצר בהצלחה', 'success')
             return redirect(url_for('admin.guides_list'))
         except Exception as e:
@@ -507,6 +509,7 @@ def guide_edit(guide_id):
         
         try:
             db.session.commit()
+            bump_data_version(CONTENT)
             flash('המדריך עודכן בהצלחה', 'success')
             return redirect(url_for('admin.guides_list'))
         except Exception as e:
@@ -526,6 +529,7 @@ def guide_delete(guide_id):
     try:
         db.session.delete(guide)
         db.session.commit()
+        bump_data_version(CONTENT)
         flash('המדריך נמחק בהצלחה', 'success')
     except Exception as e:
         db.session.rollback()
@@ -565,6 +569,7 @@ def guide_duplicate(guide_id):
     try:
         db.session.add(new_guide)
         db.session.commit()
+        bump_data_version(CONTENT)
         flash('המדריך שוכפל בהצלחה', 'success')
     except Exception as e:
         db.session.rollback()
@@ -591,6 +596,7 @@ def guide_toggle_publish(guide_id):
         guide.is_published = not guide.is_published
         guide.updated_at = datetime.utcnow()
         db.session.commit()
+        bump_data_version(CONTENT)
         
         status = "פורסם" if guide.is_published else "הוסר מפרסום"
         flash(f'המדריך {status} בהצלחה', 'success')
@@ -806,6 +812,7 @@ def blog_new():
         try:
             db.session.add(post)
             db.session.commit()
+            bump_data_version(CONTENT)
             flash('הפוסט נוצר בהצלחה', 'success')
             return redirect(url_for('admin.blog_list'))
         except Exception as e:
@@ -890,6 +897,7 @@ def blog_edit(post_id):
         
         try:
             db.session.commit()
+            bump_data_version(CONTENT)
             flash('הפוסט עודכן בהצלחה', 'success')
             return redirect(url_for('admin.blog_list'))
         except Exception as e:
@@ -909,6 +917,7 @@ def blog_delete(post_id):
     try:
         db.session.delete(post)
         db.session.commit()
+        bump_data_version(CONTENT)
         flash('הפוסט נמחק בהצלחה', 'success')
     except Exception as e:
         db.session.rollback()
@@ -949,6 +958,7 @@ def blog_duplicate(post_id):
     try:
         db.session.add(new_post)
         db.session.commit()
+        bump_data_version(CONTENT)
         flash('הפוסט שוכפל בהצלחה', 'success')
     except Exception as e:
         db.session.rollback()
@@ -989,6 +999,7 @@ def blog_toggle_publish(post_id):
         post.is_published = not post.is_published
         post.updated_at = datetime.utcnow()
         db.session.commit()
+        bump_data_version(CONTENT)
         
         status = "פורסם" if post.is_published else "הוסר מפרסום"
         flash(f'הפוסט {status} בהצלחה', 'success')
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
 from app.extensions import csrf, cache, db, limiter
-from app.models import Bike, BikeListing, PurchaseClick
+from app.models import Bike, BikeListing
 from app.utils.helpers import clean_bike_data_for_json
+from app.services.bike_loaders import bike_loader
+from app.services.bike_index import resolve_bike_id
+from app.services.counter_buffer import record_purchase_click
+from app.services.bike_detail_service import get_bike_detail_document, get_bike_detail_documents
+from app.services.data_version import get_data_version, CATALOG
 import hmac
 import hashlib
 import subprocess
@@ -32,11 +36,10 @@ def purchase_click():
         if not bike_key or not product_url:
             return jsonify({'success': False, 'error': 'Missing bike_id or product_url'}), 400
 
+        bike_pk = resolve_bike_id(bike_key)
         bike = db.session.query(Bike).options(
             db.joinedload(Bike.listings).joinedload(BikeListing.source)
-        ).filter(
-            (Bike.slug == bike_key) | (Bike.uuid == bike_key)
-        ).first()
+        ).filter(Bike.id == bike_pk).first() if bike_pk is not None else None
 
         if not bike:
             return jsonify({'success': False, 'error': 'Bike not found'}), 404
@@ -54,9 +57,7 @@ def purchase_click():
         if listing.source:
             importer = listing.source.importer
 
-        row = PurchaseClick(bike_id=bike.id, importer=importer, created_at=datetime.utcnow())
-        db.session.add(row)
-        db.session.commit()
+        record_purchase_click(bike.id, importer)
         return jsonify({'success': True})
     except Exception as e:
         logger.error(f"purchase_click error: {e}")
@@ -176,53 +177,114 @@ def github_webhook():
         logger.error(f"Webhook error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Browsers / proxies may reuse bike JSON this long; the ETag covers the rest
+BIKE_API_MAX_AGE = 300
+# Identifiers accepted per /api/bikes request
+MAX_BATCH_BIKES = 50
+# /api/bikes?fields= names that expand to several keys of the bike dict
+BIKE_FIELD_GROUPS = {
+    'price': ('price', 'disc_price'),
+    'images': ('image_url', 'gallery_images_urls'),
+}
+
+
+def _bike_etag(*parts):
+    """ETag for bike JSON: changes with the catalog data version and the request."""
+    version = get_data_version(CATALOG).version
+    raw = '|'.join([str(version), current_app.config.get('VERSION', ''), *parts])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _with_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={BIKE_API_MAX_AGE}'
+    return response
+
+
+def _not_modified(etag):
+    if request.if_none_match.contains(etag):
+        return _with_cache_headers(current_app.response_class(status=304), etag)
+    return None
+
+
+def _select_fields(bike_dict, fields):
+    """Subset of a bike dict for ``fields`` (``id`` is always kept)."""
+    if not fields:
+        return bike_dict
+    keys = ['id']
+    for field in fields:
+        keys.extend(BIKE_FIELD_GROUPS.get(field, (field,)))
+    return {key: bike_dict[key] for key in dict.fromkeys(keys) if key in bike_dict}
+
+
 @bp.route('/bike/<path:bike_id>')
 def get_bike_details(bike_id):
     """Get bike details by UUID or slug for AJAX requests"""
     try:
-        # Try to find bike by slug first (SEO-friendly), then by UUID (backward compatibility)
-        # Load with raw_specs relationship
-        bike = db.session.query(Bike).options(
-            db.joinedload(Bike.brand),
-            db.joinedload(Bike.listings).joinedload(BikeListing.raw_specs),
-            db.joinedload(Bike.listings).joinedload(BikeListing.prices),
-            db.joinedload(Bike.images)
-        ).filter(
-            (Bike.slug == bike_id) | (Bike.uuid == bike_id)
-        ).first()
-        
-        if not bike:
+        etag = _bike_etag('bike', bike_id)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        # Same cached document as the bike page (slug or UUID)
+        document = get_bike_detail_document(bike_id)
+        if not document:
             return jsonify({'error': 'Bike not found'}), 404
-        
-        # Convert to template-compatible format
-        bike_dict = bike.to_dict()
-        
+
         # Clean the bike data to ensure it's safe for JSON serialization
-        cleaned_bike_dict = clean_bike_data_for_json(bike_dict)
-        
-        # Debug logging
-        print(f"=== API DEBUG for bike {bike_id} ===")
-        print(f"Gallery field in dict: {bike_dict.get('gallery_images_urls')}")
-        print(f"Gallery field in cleaned: {cleaned_bike_dict.get('gallery_images_urls')}")
-        print(f"Raw specs count: {len(bike.listings[0].raw_specs) if bike.listings and bike.listings[0].raw_specs else 0}")
-        print("=== END API DEBUG ===")
-        
-        return jsonify(cleaned_bike_dict)
+        cleaned_bike_dict = clean_bike_data_for_json(document['context']['bike'])
+        return _with_cache_headers(jsonify(cleaned_bike_dict), etag)
         
     except Exception as e:
         print(f"Error getting bike details: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return jsonify({'error': 'Internal server error'}), 500
+
+@bp.route('/bikes')
+def get_bikes_batch():
+    """Details for several bikes at once: /api/bikes?ids=a,b,c[&fields=price,wh,images]
+
+    Returns ``{"bikes": {identifier: bike}, "missing": [identifiers]}``.
+    """
+    try:
+        bike_ids = list(dict.fromkeys(
+            bike_id.strip() for value in request.args.getlist('ids') for bike_id in value.split(',') if bike_id.strip()
+        ))
+        if not bike_ids:
+            return jsonify({'error': 'Missing ids'}), 400
+        if len(bike_ids) > MAX_BATCH_BIKES:
+            return jsonify({'error': f'At most {MAX_BATCH_BIKES} ids per request'}), 400
+        fields = [field.strip() for value in request.args.getlist('fields') for field in value.split(',') if field.strip()]
+
+        etag = _bike_etag('bikes', ','.join(bike_ids), ','.join(fields))
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        documents = get_bike_detail_documents(bike_ids)
+        bikes = {
+            bike_id: _select_fields(clean_bike_data_for_json(documents[bike_id]['context']['bike']), fields)
+            for bike_id in bike_ids if bike_id in documents
+        }
+        missing = [bike_id for bike_id in bike_ids if bike_id not in documents]
+        return _with_cache_headers(jsonify({'bikes': bikes, 'missing': missing}), etag)
+
+    except Exception as e:
+        print(f"Error getting bikes batch: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/v2/bike/<path:bike_id>')
 def get_bike_details_v2(bike_id):
     """Get bike details using NEW normalized format (for testing)"""
     try:
-        # Try to find bike by slug first (SEO-friendly), then by UUID (backward compatibility)
-        bike = db.session.query(Bike).filter(
-            (Bike.slug == bike_id) | (Bike.uuid == bike_id)
-        ).first()
+        # Slug (SEO-friendly) or UUID (backward compatibility) -> primary key
+        bike_pk = resolve_bike_id(bike_id)
+        bike = db.session.query(Bike).options(*bike_loader('compare')).filter(
+            Bike.id == bike_pk
+        ).first() if bike_pk is not None else None
         
         if not bike:
             return jsonify({'error': 'Bike not found'}), 404
@@ -243,7 +305,7 @@ def get_bike_details_v2(bike_id):
 
 @bp.route('/clear-cache')
 def clear_cache():
-    """Clear all caches for debugging"""
+    """Clear all caches for debugging (the cache backend is shared, so this reaches every worker)"""
     try:
         cache.clear()
         return jsonify({'message': 'Cache cleared successfully'})
@@ -1,11 +1,14 @@
 from flask import Blueprint, render_template, abort, request
 from app.extensions import db
 from app.models import BlogPost
+from app.services.data_version import CONTENT
+from app.utils.page_cache import cached_page
 import re
 
 bp = Blueprint('blog', __name__)
 
 @bp.route("/blog")
+@cached_page(CONTENT)
 def blog_list():
     """List all published blog posts"""
     posts = db.session.query(BlogPost).filter_by(is_published=True).order_by(BlogPost.created_at.desc()).all()
@@ -1,25 +1,20 @@
-from flask import Blueprint, render_template, request, jsonify, session, abort, url_for, redirect
-from app.extensions import db, csrf
-from app.models import Comparison, Bike, CompareCount
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, session, abort, url_for, redirect, stream_with_context
+from app.extensions import db, csrf, limiter
+from app.models import Comparison
+from app.services.bike_index import resolve_bike_id
 from app.services.bike_service import get_bikes_by_uuids
 from app.services.ai_service import create_ai_prompt, generate_comparison_with_ai_from_bikes
+from app.services.comparison_jobs import (
+    DONE, FAILED, FINISHED, RUNNING, comparison_cache_key, enqueue_comparison, find_cached_comparison, get_job,
+    get_job_partial, save_comparison
+)
+from app.services.counter_buffer import record_compare
 import os
 import json
-import secrets
-import string
+import time
 
 bp = Blueprint('compare', __name__)
 
-def generate_short_code(length=6):
-    """Generate a random short code for URL shortening"""
-    characters = string.ascii_letters + string.digits
-    while True:
-        code = ''.join(secrets.choice(characters) for _ in range(length))
-        # Check if code already exists
-        existing = db.session.query(Comparison).filter_by(short_code=code).first()
-        if not existing:
-            return code
-
 @bp.route('/api/compare_list')
 def api_compare_list():
     return jsonify({'compare_list': session.get('compare_list', [])})
@@ -75,28 +70,17 @@ def add_to_compare():
                 compare_list.append(normalized_bike_id)
                 save_compare_list(compare_list)
 
-                # ✅ Increment popularity count in database
+                # ✅ Increment popularity count (written to the database in batches)
                 try:
-                    # First, get the bike to convert UUID/slug to numeric ID
-                    bike = db.session.query(Bike).filter(
-                        (Bike.uuid == normalized_bike_id) | (Bike.slug == normalized_bike_id)
-                    ).first()
+                    # First, convert UUID/slug to numeric ID
+                    bike_pk = resolve_bike_id(normalized_bike_id)
                     
-                    if bike:
-                        # Find or create CompareCount record using numeric bike.id
-                        compare_count = db.session.query(CompareCount).filter_by(bike_id=bike.id).first()
-                        if compare_count:
-                            compare_count.count += 1
-                        else:
-                            compare_count = CompareCount(bike_id=bike.id, count=1)
-                            db.session.add(compare_count)
-                        db.session.commit()
-                        print(f"Updated compare count for bike {normalized_bike_id} (numeric ID: {bike.id}, count: {compare_count.count})")
+                    if bike_pk is not None:
+                        record_compare(bike_pk)
                     else:
                         print(f"Bike not found for UUID/slug: {normalized_bike_id}")
                 except Exception as e:
                     print(f"Error updating compare counts: {e}")
-                    db.session.rollback()
 
                 return jsonify({'success': True, 'compare_list': compare_list})
             else:
@@ -305,6 +289,150 @@ def clear_compare():
     session['compare_list'] = []
     return jsonify({'success': True})
 
+def _share_url(comparison):
+    """Share URL for a saved comparison - handle both development and production"""
+    try:
+        # Use short URL
+        share_url = request.host_url.rstrip('/') + url_for('compare.redirect_short_url', short_code=comparison.short_code)
+        print(f"Generated short share URL: {share_url}")
+    except Exception as e:
+        print(f"Error generating share URL: {e}")
+        # Fallback: use slug-based URL
+        try:
+            share_url = request.host_url.rstrip('/') + url_for('compare.view_comparison', slug=comparison.slug)
+        except:
+            share_url = url_for('compare.view_comparison', slug=comparison.slug, _external=True)
+    return share_url
+
+
+def _comparison_payload(comparison):
+    """The fields compare_ai_from_session returns for a saved comparison."""
+    return {
+        "success": True,
+        "data": json.loads(comparison.comparison_data),
+        "comparison_id": comparison.id,
+        "share_url": _share_url(comparison),
+    }
+
+
+def _refresh_requested():
+    """True when the client asked to regenerate instead of reusing a cached comparison."""
+    if request.args.get('refresh') in ('1', 'true'):
+        return True
+    body = request.get_json(silent=True)
+    return isinstance(body, dict) and bool(body.get('refresh'))
+
+
+def _cached_comparison(compare_list):
+    """``(stored comparison of the same bikes or None, cache key)``; None when a refresh was requested."""
+    cache_key = comparison_cache_key(compare_list)
+    if _refresh_requested():
+        return None, cache_key
+    return find_cached_comparison(cache_key), cache_key
+
+
+def _job_payload(job):
+    """JSON for a comparison job; finished jobs carry the same fields as compare_ai_from_session."""
+    payload = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "status_url": url_for('compare.compare_ai_job', job_id=job.id),
+    }
+    if current_app.config.get('AI_JOB_EVENTS', False):
+        payload["events_url"] = url_for('compare.compare_ai_job_events', job_id=job.id)
+    if job.status == DONE and job.comparison:
+        payload.update(_comparison_payload(job.comparison))
+    elif job.status == FAILED:
+        payload["error"] = job.error or "שגיאה ביצירת ההשוואה"
+    elif job.status == RUNNING:
+        # Parts of the answer already generated (streaming mode)
+        payload["partial"] = get_job_partial(job.id)
+    return payload
+
+
+@bp.route('/api/compare_ai_jobs', methods=['POST'])
+@csrf.exempt
+@limiter.limit("10 per minute; 60 per hour")
+def create_compare_ai_job():
+    """Queue an AI comparison of the session's compare list; returns the job at once (202).
+
+    If the same bikes were compared against the current catalog and prompt
+    version, the stored comparison is returned instead (200, ``cached: true``);
+    ``?refresh=1`` or ``{"refresh": true}`` regenerates it.
+    """
+    try:
+        compare_list = get_compare_list()
+        if len(compare_list) < 2:
+            return jsonify({"error": "צריך לבחור לפחות שני דגמים להשוואה."}), 400
+
+        comparison, _ = _cached_comparison(compare_list)
+        if comparison is not None:
+            payload = _comparison_payload(comparison)
+            payload.update({"status": DONE, "cached": True})
+            return jsonify(payload)
+
+        # A reload while the same comparison is still running re-attaches to it
+        job = get_job(session.get('compare_ai_job')) if session.get('compare_ai_job') else None
+        if job is None or job.status in FINISHED or json.loads(job.bike_ids) != compare_list:
+            job = enqueue_comparison(compare_list)
+            session['compare_ai_job'] = job.id
+
+        return jsonify(_job_payload(job)), 202
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error queueing AI comparison: {e}")
+        return jsonify({"error": "שגיאה ביצירת ההשוואה"}), 500
+
+
+@bp.route('/api/compare_ai_jobs/<job_id>')
+def compare_ai_job(job_id):
+    """Current state of an AI comparison job (for polling)."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    response = jsonify(_job_payload(job))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/api/compare_ai_jobs/<job_id>/events')
+def compare_ai_job_events(job_id):
+    """Server-sent events for a job: a 'progress' event per status/stage change, a
+    'partial' event per finished part of the answer while it is generated, then
+    one 'done' or 'failed' event with the full payload. Only served with ``AI_JOB_EVENTS``."""
+    if not current_app.config.get('AI_JOB_EVENTS', False) or get_job(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+    poll_seconds = current_app.config.get('AI_JOB_POLL_SECONDS', 1)
+    # Past the job timeout get_job reports it failed, so the stream always ends
+    deadline = time.time() + current_app.config.get('AI_JOB_TIMEOUT_SECONDS', 300) + 30
+
+    def stream():
+        last_state = None
+        sent_parts = 0
+        while time.time() < deadline:
+            # Start a fresh transaction each round so the worker thread's commits are visible,
+            # and give the connection back to the pool while we sleep
+            db.session.close()
+            job = get_job(job_id)
+            # Parts first, so they always arrive before the final event
+            parts = get_job_partial(job_id)
+            for part in parts[sent_parts:]:
+                yield f"event: partial\ndata: {json.dumps(part, ensure_ascii=False)}\n\n"
+            sent_parts = max(sent_parts, len(parts))
+            state = (job.status, job.stage)
+            if state != last_state:
+                last_state = state
+                event = job.status if job.status in FINISHED else 'progress'
+                yield f"event: {event}\ndata: {json.dumps(_job_payload(job), ensure_ascii=False)}\n\n"
+            if job.status in FINISHED:
+                return
+            time.sleep(poll_seconds)
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @bp.route('/api/compare_ai_from_session', methods=['GET'])
 def compare_ai_from_session():
     try:
@@ -324,6 +452,14 @@ def compare_ai_from_session():
         # Build AI result using async web research + Responses API
         # We no longer pass a plain prompt; instead we send the bikes list.
         # Kept create_ai_prompt import for backward compatibility if needed elsewhere.
+
+        # Same bikes already compared against this catalog / prompt version
+        comparison, cache_key = _cached_comparison(compare_list)
+        if comparison is not None:
+            print(f"AI comparison cache hit: comparison {comparison.id}")
+            response_data = _comparison_payload(comparison)
+            response_data["cached"] = True
+            return jsonify(response_data)
     except Exception as e:
         return jsonify({"error": "שגיאה בטעינת נתוני האופניים", "details": str(e)}), 500
 
@@ -341,35 +477,8 @@ def compare_ai_from_session():
         
         # Save to database
         try:
-            # Create new comparison record
-            comparison = Comparison()
-            comparison.bike_ids = json.dumps(compare_list)  # Store as JSON string
-            comparison.comparison_data = json.dumps(comparison_result)  # Store as JSON string
-            
-            # Generate slug (need to update method signature to not need session)
-            # For now, use a simple slug based on bike IDs
-            comparison.slug = '-vs-'.join(compare_list[:4])  # Limit to 4 bikes for URL
-            
-            # Generate short code for URL shortening
-            comparison.short_code = generate_short_code()
-            
-            db.session.add(comparison)
-            db.session.commit()
-            
-            # Create share URL using short code - handle both development and production
-            try:
-                # Use short URL
-                share_url = request.host_url.rstrip('/') + url_for('compare.redirect_short_url', short_code=comparison.short_code)
-                print(f"Generated short share URL: {share_url}")
-            except Exception as e:
-                print(f"Error generating share URL: {e}")
-                # Fallback: use slug-based URL
-                try:
-                    share_url = request.host_url.rstrip('/') + url_for('compare.view_comparison', slug=comparison.slug)
-                except:
-                    share_url = url_for('compare.view_comparison', slug=comparison.slug, _external=True)
-            
-            print(f"Final share URL: {share_url}")
+            comparison = save_comparison(compare_list, comparison_result, cache_key)
+            share_url = _share_url(comparison)
             
             # Create response data
             response_data = {
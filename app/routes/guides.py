@@ -1,12 +1,15 @@
 from flask import Blueprint, render_template, abort, url_for
 from app.extensions import db
 from app.models import Guide
+from app.services.data_version import CONTENT
+from app.utils.page_cache import cached_page
 import re
 
 bp = Blueprint('guides', __name__)
 
 
 @bp.route('/guides')
+@cached_page(CONTENT)
 def guides_list():
     """List all published guides"""
     guides = db.session.query(Guide).filter_by(is_published=True).order_by(
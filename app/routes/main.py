@@ -1,17 +1,24 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect
 from app.extensions import csrf, db
 from app.utils.security import sanitize_html_content
 import json
 import os
 import smtplib
 from email.message import EmailMessage
-from datetime import datetime, timedelta
-from app.models import Bike, Comparison, CompareCount, BikeListing, Source, AvailabilityLead, ContactLead, StoreRequestLead
+from datetime import datetime
+from app.models import Bike, AvailabilityLead, ContactLead, StoreRequestLead
 from app.services.bike_service import get_all_brands
+from app.services.bike_serializer import serialize_bikes
+from app.services.catalog_service import category_count, get_category_counts, sub_category_count
+from app.services.data_version import CATALOG, TOP_COMPARED
+from app.services.home_service import get_home_stats, get_top_compared
+from app.services.sitemap_service import render_sitemap_part, sitemap_index
+from app.utils.page_cache import cached_page
 
 bp = Blueprint('main', __name__)
 
 @bp.route("/")
+@cached_page(CATALOG, TOP_COMPARED, timeout=300)  # stats change between migrations
 def home():
     # Get only necessary data - don't load all bikes!
     brands = get_all_brands()
@@ -19,61 +26,21 @@ def home():
     # Calculate number of unique bike brands
     brand_count = len(brands)
     
-    # Get total bike count efficiently without loading all bikes
-    total_bikes_count = db.session.query(Bike).count()
-    
-    # Get total number of sources (stores/importers)
-    sources_count = db.session.query(Source).count()
+    # Bike, source and comparison counts in one query
+    stats = get_home_stats()
 
-    # Load compare counts from database
+    # Most compared bikes (cached projection with only the carousel fields)
     try:
-        # Get total number of comparisons
-        total_comparisons = db.session.query(Comparison).count()
-        
-        # Get top 10 most compared bikes that actually exist in the bikes table
-        top_compare_counts = db.session.query(CompareCount).join(Bike).options(
-            db.joinedload(CompareCount.bike).joinedload(Bike.brand),
-            db.joinedload(CompareCount.bike).joinedload(Bike.listings).joinedload(BikeListing.prices),
-            db.joinedload(CompareCount.bike).joinedload(Bike.standardized_specs),
-            db.joinedload(CompareCount.bike).joinedload(Bike.images)
-        ).order_by(CompareCount.count.desc()).limit(10).all()
-        
-        # Convert to template-compatible format
-        top_bikes = []
-        for cc in top_compare_counts:
-            bike = cc.bike
-            bike_dict = bike.to_dict()
-            top_bikes.append(bike_dict)
-
-        # Add fallback bikes if we don't have enough - load only what's needed
-        if len(top_bikes) < 10:
-            remaining_needed = 10 - len(top_bikes)
-            fallback_bikes_query = Bike.query.options(
-                db.joinedload(Bike.brand),
-                db.joinedload(Bike.listings).joinedload(BikeListing.prices),
-                db.joinedload(Bike.standardized_specs),
-                db.joinedload(Bike.images)
-            ).limit(remaining_needed).all()
-            
-            for bike in fallback_bikes_query:
-                top_bikes.append(bike.to_dict())
-
+        top_bikes = get_top_compared()['bikes']
     except Exception as e:
         print(f"Error loading compare counts: {e}")
         import traceback
         traceback.print_exc()
         # Load only 10 bikes for fallback instead of all bikes
-        fallback_bikes_query = Bike.query.options(
-            db.joinedload(Bike.brand),
-            db.joinedload(Bike.listings).joinedload(BikeListing.prices),
-            db.joinedload(Bike.standardized_specs),
-            db.joinedload(Bike.images)
-        ).limit(10).all()
-        
-        top_bikes = [bike.to_dict() for bike in fallback_bikes_query]
-        total_comparisons = 0
+        fallback_ids = [bike_id for (bike_id,) in db.session.query(Bike.id).order_by(Bike.id).limit(10).all()]
+        top_bikes = serialize_bikes(fallback_ids)
 
-    return render_template("home.html", bikes_count=total_bikes_count, brands=brands, top_bikes=top_bikes, total_comparisons=total_comparisons, brand_count=brand_count, sources_count=sources_count)
+    return render_template("home.html", bikes_count=stats['bikes_count'], brands=brands, top_bikes=top_bikes, total_comparisons=stats['total_comparisons'], brand_count=brand_count, sources_count=stats['sources_count'])
 
 @bp.route("/contact", methods=["POST"])
 def contact():
@@ -335,102 +302,26 @@ def find_store():
 
 @bp.route('/sitemap.xml', methods=['GET'])
 def sitemap():
-    from flask import Response, url_for
-    pages = []
-    now = datetime.now()
-    ten_days_ago = (datetime.now() - timedelta(days=10)).date().isoformat()
-
-    # Static pages
-    pages.append({
-        'loc': url_for('main.home', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '1.0'
-    })
-    pages.append({
-        'loc': url_for('main.categories', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '0.9'
-    })
-    pages.append({
-        'loc': url_for('bikes.bikes', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '0.8'
-    })
-    pages.append({
-        'loc': url_for('blog.blog_list', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '0.8'
-    })
-    
-    # Category pages (e.g., /electric, /mtb, /gravel)
-    valid_categories = ['electric', 'mtb', 'kids', 'city', 'road', 'gravel']
-    for category in valid_categories:
-        pages.append({
-            'loc': url_for('bikes.category_bikes', category=category, _external=True),
-            'lastmod': ten_days_ago,
-            'priority': '0.9'
-        })
-    
-    # Subcategory pages - Electric subcategories
-    pages.append({
-        'loc': url_for('main.electric_subcategories', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '0.85'
-    })
-    
-    # Subcategory pages - MTB subcategories
-    pages.append({
-        'loc': url_for('main.mtb_subcategories', _external=True),
-        'lastmod': ten_days_ago,
-        'priority': '0.85'
-    })
-
-    # Blog posts (from database)
-    from app.models import BlogPost
-    blog_posts = db.session.query(BlogPost).filter_by(is_published=True).all()
-    for post in blog_posts:
-        lastmod = post.updated_at.date().isoformat() if post.updated_at else (post.created_at.date().isoformat() if post.created_at else ten_days_ago)
-        pages.append({
-            'loc': url_for('blog.blog_post', slug=post.slug, _external=True),
-            'lastmod': lastmod,
-            'priority': '0.6'
-        })
-
-    # Individual bike pages - prefer slugs for SEO, fallback to UUID
-    # Use actual updated_at dates from database (fallback to created_at, then ten_days_ago)
-    bikes = db.session.query(Bike.slug, Bike.uuid, Bike.updated_at, Bike.created_at).all()
-    for bike_slug, bike_uuid, updated_at, created_at in bikes:
-        # Use slug if available, otherwise UUID
-        bike_id = bike_slug if bike_slug else bike_uuid
-        # Use updated_at if available, otherwise created_at, otherwise fallback
-        if updated_at:
-            lastmod = updated_at.date().isoformat()
-        elif created_at:
-            lastmod = created_at.date().isoformat()
-        else:
-            lastmod = ten_days_ago
-        pages.append({
-            'loc': url_for('bikes.bike_detail', bike_id=bike_id, _external=True),
-            'lastmod': lastmod,
-            'priority': '0.5'
-        })
+    """Sitemap index pointing at the per-type sitemaps (see sitemap_service)"""
+    from flask import Response
+    return Response(sitemap_index(), mimetype='application/xml')
 
-    # Add persistent comparison pages
+@bp.route('/sitemap-<kind>-<int:page>.xml', methods=['GET'])
+def sitemap_part(kind, page):
+    """One per-type sitemap (pages, bikes, blog, comparisons), streamed on a cache miss"""
+    from flask import Response, abort, stream_with_context
     try:
-        comparisons = db.session.query(Comparison).all()
-        for comparison in comparisons:
-            if comparison.slug:
-                pages.append({
-                    'loc': url_for('compare.view_comparison', slug=comparison.slug, _external=True),
-                    'lastmod': comparison.created_at.date().isoformat() if comparison.created_at else ten_days_ago,
-                    'priority': '0.7'
-                })
-    except:
-        pass
-
-    # Create XML string
-    sitemap_xml = render_template('sitemap.xml', pages=pages)
-    return Response(sitemap_xml, mimetype='application/xml')
+        xml = render_sitemap_part(kind, page)
+    except Exception as e:
+        print(f"Error building sitemap {kind}-{page}: {e}")
+        import traceback
+        traceback.print_exc()
+        abort(500)
+    if xml is None:
+        abort(404)
+    if not isinstance(xml, str):
+        xml = stream_with_context(xml)
+    return Response(xml, mimetype='application/xml')
 
 @bp.route('/privacy-policy')
 def privacy_policy():
@@ -448,34 +339,15 @@ def cookie_preferences():
 
 
 @bp.route('/electric-subcategories')
+@cached_page(CATALOG)
 def electric_subcategories():
     """Display Electric bike sub-category selection page"""
-    from app.extensions import db
-    from app.models import Bike
-    
-    # Electric MTB count
-    electric_mtb_count = db.session.query(Bike).filter(
-        Bike.category == 'electric',
-        Bike.sub_category == 'electric_mtb'
-    ).count()
-    
-    # Electric City count (including the one with space: "electric_ city")
-    electric_city_count = db.session.query(Bike).filter(
-        Bike.category == 'electric',
-        Bike.sub_category.in_(['electric_city', 'electric_ city'])
-    ).count()
-    
-    # Electric Gravel count
-    electric_gravel_count = db.session.query(Bike).filter(
-        Bike.category == 'electric',
-        Bike.sub_category == 'electric_gravel'
-    ).count()
-    
-    # Electric Road count
-    electric_road_count = db.session.query(Bike).filter(
-        Bike.category == 'electric',
-        Bike.sub_category == 'electric_road'
-    ).count()
+    counts = get_category_counts()
+    electric_mtb_count = sub_category_count('electric', 'electric_mtb', counts)
+    # Includes the "electric_ city" variant (folded in by the rollup)
+    electric_city_count = sub_category_count('electric', 'electric_city', counts)
+    electric_gravel_count = sub_category_count('electric', 'electric_gravel', counts)
+    electric_road_count = sub_category_count('electric', 'electric_road', counts)
     
     subcategories = [
         {
@@ -511,29 +383,19 @@ def electric_subcategories():
     return render_template("electric_subcategories.html", subcategories=subcategories)
 
 @bp.route('/mtb-subcategories')
+@cached_page(CATALOG)
 def mtb_subcategories():
     """Display MTB sub-category selection page (Full Suspension vs Hardtail)"""
-    from app.extensions import db
-    from app.models import Bike
+    counts = get_category_counts()
+    full_suspension_count = sub_category_count('mtb', 'full_suspension', counts)
+    hardtail_count = sub_category_count('mtb', 'hardtail', counts)
     
-    # Full suspension includes: full_suspension (the actual value in DB)
-    full_suspension_count = db.session.query(Bike).filter(
-        Bike.category == 'mtb',
-        Bike.sub_category == 'full_suspension'
-    ).count()
-    
-    # Hardtail - check what value exists in DB
-    hardtail_count = db.session.query(Bike).filter(
-        Bike.category == 'mtb',
-        Bike.sub_category == 'hardtail'
-    ).count()
-    
-    # If no hardtail, check for hardtail_mtb
+    # If no hardtail, count any hardtail variant (e.g. hardtail_mtb)
     if hardtail_count == 0:
-        hardtail_count = db.session.query(Bike).filter(
-            Bike.category == 'mtb',
-            Bike.sub_category.like('%hardtail%')
-        ).count()
+        hardtail_count = sum(
+            count for (category, sub_category), count in counts.items()
+            if category == 'mtb' and sub_category and 'hardtail' in sub_category.lower()
+        )
     
     subcategories = [
         {
@@ -555,18 +417,15 @@ def mtb_subcategories():
     return render_template("mtb_subcategories.html", subcategories=subcategories)
 
 @bp.route('/categories')
+@cached_page(CATALOG)
 def categories():
     """Display category selection page"""
-    from app.extensions import db
-    from app.models import Bike
-    
-    # Get all distinct categories with counts
-    category_data = db.session.query(
-        Bike.category,
-        db.func.count(Bike.id).label('count')
-    ).filter(
-        Bike.category.isnot(None)
-    ).group_by(Bike.category).all()
+    # Per-category totals from the cached (category, sub_category) rollup
+    counts = get_category_counts()
+    category_data = sorted(
+        (category, category_count(category, counts))
+        for category in {category for category, _ in counts if category is not None}
+    )
     
     # Map categories to Hebrew names and images
     category_info = {
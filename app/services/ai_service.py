@@ -1,21 +1,43 @@
 import os
 import json
 import asyncio
+import atexit
+import concurrent.futures
 import threading
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 try:
     import aiohttp  # type: ignore
 except Exception:
     aiohttp = None
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from app.services.bike_research import load_research, research_key, store_research
+from app.utils.json_stream import JsonFieldStream
+
+# Part of the AI comparison cache key: bump when the prompts, system messages,
+# model or output format change so stored comparisons are regenerated.
+PROMPT_VERSION = 1
 
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     print("WARNING: OPENAI_API_KEY not set in environment variables!")
 client = OpenAI(api_key=api_key) if api_key else None
 
+# Research I/O (web lookups) runs on one long-lived event loop per worker
+# process, with a pooled aiohttp session and one AsyncOpenAI client, so
+# comparisons reuse connections instead of paying loop setup and TLS
+# handshakes each time. Lookups are limited in number at once and spaced per
+# service (requests per second, 0 = unlimited).
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+AI_RESEARCH_CONCURRENCY = int(os.getenv("AI_RESEARCH_CONCURRENCY", "8"))
+AI_RESEARCH_TIMEOUT_SECONDS = float(os.getenv("AI_RESEARCH_TIMEOUT_SECONDS", "90"))
+_RATE_LIMITS = {
+    "openai": float(os.getenv("AI_OPENAI_RATE_PER_SECOND", "5")),
+    "duckduckgo": float(os.getenv("AI_DDG_RATE_PER_SECOND", "1")),
+}
+
 def _extract_all_bike_fields(bike: Dict[str, Any]) -> Dict[str, Any]:
     """Extract all fields from a bike, handling both flat and nested formats."""
     fields = {}
@@ -189,27 +211,111 @@ def create_ai_prompt(bikes_to_compare):
     
     return "\n\n".join(prompt)
 
+class _RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart. Used only on the I/O loop."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _IOLoop:
+    """Background event loop thread plus the clients and limits that live on it."""
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.http_session: Optional["aiohttp.ClientSession"] = None
+        self.openai: Optional[AsyncOpenAI] = None
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="ai-io-loop", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        # Created on the loop's thread so they bind to this loop on every Python version
+        self.semaphore = asyncio.Semaphore(AI_RESEARCH_CONCURRENCY)
+        self.limiters = {name: _RateLimiter(rate) for name, rate in _RATE_LIMITS.items()}
+        self._ready.set()
+        self.loop.run_forever()
+
+    def get_http_session(self) -> "aiohttp.ClientSession":
+        """Pooled aiohttp session (call on the loop)."""
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(limit=AI_HTTP_MAX_CONNECTIONS, ttl_dns_cache=300)
+            self.http_session = aiohttp.ClientSession(
+                connector=connector, headers={"User-Agent": "emtb_site/1.0"}
+            )
+        return self.http_session
+
+    def get_openai(self) -> Optional[AsyncOpenAI]:
+        """AsyncOpenAI client for web search (call on the loop)."""
+        if self.openai is None and api_key:
+            self.openai = AsyncOpenAI(api_key=api_key)
+        return self.openai
+
+    async def _aclose(self) -> None:
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        if self.openai is not None:
+            await self.openai.close()
+
+    def close(self) -> None:
+        if self.pid != os.getpid() or not self.loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), self.loop).result(timeout=5)
+        except Exception as e:
+            print(f"Error closing AI HTTP clients: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_io: Dict[str, Optional[_IOLoop]] = {"loop": None}
+_io_lock = threading.Lock()
+
+
+def _get_io_loop() -> _IOLoop:
+    """This process's I/O loop, started on first use (and again in a forked child)."""
+    io = _io["loop"]
+    if io is None or io.pid != os.getpid():
+        with _io_lock:
+            io = _io["loop"]
+            if io is None or io.pid != os.getpid():
+                io = _io["loop"] = _IOLoop()
+    return io
+
+
 async def _search_with_openai_web(bike_query: str) -> Optional[Dict[str, Any]]:
     """Use OpenAI Responses web_search tool for a single query.
 
     Returns a dict with 'query' and 'answer' text if successful, else None.
     """
-    if not client:
+    io = _get_io_loop()
+    openai_client = io.get_openai()
+    if not openai_client:
         return None
     try:
-        # Python 3.8 compatible: use run_in_executor instead of to_thread
-        import concurrent.futures
-        loop = asyncio.get_event_loop()
-        resp = await loop.run_in_executor(
-            None,
-            lambda: client.responses.create(
+        async with io.semaphore:
+            await io.limiters["openai"].wait()
+            resp = await openai_client.responses.create(
                 model="gpt-4o-mini",
                 input=(
                     f"בצע חיפוש אינטרנט קצר ומדויק על הדגם הבא: {bike_query}. "
                     "החזר סיכום קצר בעברית עם 3-5 נקודות עיקריות ומקורות."),
                 tools=[{"type": "web_search"}],
             )
-        )
         text = getattr(resp, "output_text", None)
         if text:
             return {"query": bike_query, "answer": text}
@@ -221,74 +327,94 @@ async def _search_with_openai_web(bike_query: str) -> Optional[Dict[str, Any]]:
 
 async def _search_with_ddg(session: "aiohttp.ClientSession", bike_query: str) -> Optional[Dict[str, Any]]:
     """DuckDuckGo Instant Answer API as a lightweight fallback."""
+    io = _get_io_loop()
     try:
         params = {"q": bike_query, "format": "json", "no_html": 1, "t": "emtb_site"}
-        async with session.get("https://api.duckduckgo.com/", params=params, timeout=aiohttp.ClientTimeout(total=12)) as r:
-            if r.status != 200:
-                return None
-            data = await r.json(content_type=None)
-            abstract = data.get("AbstractText") or data.get("Heading") or ""
-            related = []
-            for topic in data.get("RelatedTopics", [])[:5]:
-                if isinstance(topic, dict):
-                    txt = topic.get("Text")
-                    if txt:
-                        related.append(txt)
-            combined = (abstract + "\n" + "\n".join(related)).strip()
-            if combined:
-                return {"query": bike_query, "answer": combined}
-            return None
+        async with io.semaphore:
+            await io.limiters["duckduckgo"].wait()
+            async with session.get("https://api.duckduckgo.com/", params=params, timeout=aiohttp.ClientTimeout(total=12)) as r:
+                if r.status != 200:
+                    return None
+                data = await r.json(content_type=None)
+        abstract = data.get("AbstractText") or data.get("Heading") or ""
+        related = []
+        for topic in data.get("RelatedTopics", [])[:5]:
+            if isinstance(topic, dict):
+                txt = topic.get("Text")
+                if txt:
+                    related.append(txt)
+        combined = (abstract + "\n" + "\n".join(related)).strip()
+        if combined:
+            return {"query": bike_query, "answer": combined}
+        return None
     except Exception:
         return None
 
 
-async def _gather_bikes_research(bikes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Run per-bike research concurrently. Try OpenAI web_search first, then DDG fallback."""
-    queries: List[str] = []
-    for bike in bikes:
-        brand = bike.get("brand", "")
-        model = bike.get("model", "")
-        year = bike.get("year", "")
-        q = " ".join([str(x) for x in [brand, model, year] if x])
-        queries.append(q.strip() or "אופניים חשמליים דגם לא ידוע")
+def _research_query(bike: Dict[str, Any]) -> str:
+    brand = bike.get("brand", "")
+    model = bike.get("model", "")
+    year = bike.get("year", "")
+    q = " ".join([str(x) for x in [brand, model, year] if x])
+    return q.strip() or "אופניים חשמליים דגם לא ידוע"
+
 
-    # First try OpenAI web search concurrently (in threadpool since SDK is sync)
-    async def _openai_task(q: str) -> Optional[Dict[str, Any]]:
-        return await _search_with_openai_web(q)
+async def _research_queries(queries: List[str]) -> Dict[str, Any]:
+    """Run web research for each query concurrently. Try OpenAI web_search first, then DDG fallback.
 
-    openai_results = await asyncio.gather(*[_openai_task(q) for q in queries])
+    Returns ``{query: (result or None, source or None)}``.
+    """
+    queries = list(dict.fromkeys(queries))
+
+    # First try OpenAI web search concurrently
+    openai_results = await asyncio.gather(*[_search_with_openai_web(q) for q in queries])
+    results: Dict[str, Any] = {
+        q: (res, "openai_web" if res is not None else None) for q, res in zip(queries, openai_results)
+    }
 
     # For any missing results, fill via DDG concurrently
-    results: List[Optional[Dict[str, Any]]] = list(openai_results)
-    http_session: Optional["aiohttp.ClientSession"] = None
-    if aiohttp is None:
-        # aiohttp not available
-        ddg_results = [None for _ in results]
-    else:
-        http_session = aiohttp.ClientSession(headers={"User-Agent": "emtb_site/1.0"})
-    if http_session is not None:
-        async with http_session as http_session_ctx:
-            ddg_tasks = []
-            for idx, res in enumerate(results):
-                if res is None:
-                    ddg_tasks.append(_search_with_ddg(http_session_ctx, queries[idx]))
-                else:
-                    ddg_tasks.append(asyncio.sleep(0, result=None))
-            ddg_results = await asyncio.gather(*ddg_tasks)
-    else:
-        ddg_results = [None for _ in results]
-    for idx, res in enumerate(results):
-        if res is None and ddg_results[idx] is not None:
-            results[idx] = ddg_results[idx]
+    missing = [q for q in queries if results[q][0] is None]
+    if missing and aiohttp is not None:
+        http_session = _get_io_loop().get_http_session()
+        ddg_results = await asyncio.gather(*[_search_with_ddg(http_session, q) for q in missing])
+        for q, res in zip(missing, ddg_results):
+            if res is not None:
+                results[q] = (res, "ddg")
+    return results
+
+
+def research_bikes(bikes: List[Dict[str, Any]], refresh: bool = False) -> List[Dict[str, Any]]:
+    """Per-bike research for a comparison, aligned with ``bikes``.
+
+    Research is read from the bike research store (app/services/bike_research.py)
+    and only bikes without a fresh entry - or all of them with ``refresh`` - are
+    researched, concurrently; the new results (including "nothing found") are
+    stored for the next comparison.
+    """
+    queries = [_research_query(bike) for bike in bikes]
+    keys = [research_key(bike) for bike in bikes]
+    known = {} if refresh else load_research(keys)
+
+    to_fetch = [q for q, key in zip(queries, keys) if key is None or key not in known]
+    fetched: Dict[str, Any] = {}
+    if to_fetch:
+        fetched = _run_coroutine_blocking(_research_queries(to_fetch))
+        stored = {}
+        for q, key in zip(queries, keys):
+            if key and q in fetched:
+                stored[key] = (key, q) + tuple(fetched[q])
+        store_research(stored.values())
+    print(f"Bike research: {len(bikes) - len(to_fetch)} from store, {len(set(to_fetch))} researched")
 
     # Build final list aligned with bikes - include all bike data for research context
     final: List[Dict[str, Any]] = []
-    for idx, bike in enumerate(bikes):
+    for bike, q, key in zip(bikes, queries, keys):
+        result = fetched[q][0] if q in fetched else known.get(key)
         # Extract all fields from bike for research context
         bike_fields = _extract_all_bike_fields(bike)
         final.append({
             "bike": bike_fields,  # Include all fields, not just hardcoded ones
-            "research": results[idx] or {"query": None, "answer": ""}
+            "research": result or {"query": None, "answer": ""}
         })
     return final
 
@@ -594,60 +720,64 @@ def _parse_json_safely(text: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def _run_coroutine_blocking(coro: Any) -> Any:
-    """Run an async coroutine from sync code safely across environments.
+def _run_coroutine_blocking(coro: Any, timeout: Optional[float] = AI_RESEARCH_TIMEOUT_SECONDS) -> Any:
+    """Run an async coroutine from sync code on this process's I/O loop and wait for it.
 
-    Handles cases where an event loop is already running by delegating to a new thread.
+    Works whether or not the calling thread has its own event loop running;
+    raises ``concurrent.futures.TimeoutError`` (after cancelling) past ``timeout``.
     """
+    io = _get_io_loop()
     try:
-        return asyncio.run(coro)
-    except RuntimeError as e:
-        # If there's already a running loop (e.g., in some servers/notebooks)
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = None
-        if loop and loop.is_running():
-            result_container: Dict[str, Any] = {}
-            error_container: Dict[str, BaseException] = {}
-
-            def _runner() -> None:
-                try:
-                    local_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(local_loop)
-                    result = local_loop.run_until_complete(coro)
-                    result_container["result"] = result
-                except BaseException as exc:  # capture to raise after join
-                    error_container["exc"] = exc
-                finally:
-                    try:
-                        local_loop.close()
-                    except Exception:
-                        pass
-
-            thread = threading.Thread(target=_runner, daemon=True)
-            thread.start()
-            thread.join()
-            if "exc" in error_container:
-                raise error_container["exc"]
-            return result_container.get("result")
-        # No running loop: create one and run
-        if loop is None:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
-
-
-def generate_comparison_with_ai_from_bikes(bikes_to_compare: List[Dict[str, Any]]) -> Dict[str, Any]:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is io.loop:
+        coro.close()
+        raise RuntimeError("_run_coroutine_blocking called from the AI I/O loop itself; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, io.loop)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def _read_streamed_completion(stream: Any, on_partial: Callable[[tuple], None]) -> str:
+    """Collect a streamed chat completion, passing completed JSON fields to ``on_partial``."""
+    parser = JsonFieldStream()
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for event in parser.feed(delta):
+            try:
+                on_partial(event)
+            except Exception as e:
+                # Partial output is best effort; the full answer is still returned
+                print(f"Error forwarding partial AI comparison output: {e}")
+    return parser.text
+
+
+def generate_comparison_with_ai_from_bikes(bikes_to_compare: List[Dict[str, Any]],
+                                           progress: Optional[Callable[[str], None]] = None,
+                                           on_partial: Optional[Callable[[tuple], None]] = None) -> Dict[str, Any]:
     """Public entry: run async research per bike, then call Responses API for structured JSON output.
 
     Returns dict with intro, recommendation, bikes[], expert_tip. On error returns {"error": ...}.
+    ``progress`` (optional) is called with 'research' and then 'generating'.
+    With ``on_partial`` the completion is streamed and ``on_partial`` is called with
+    each ``JsonFieldStream`` event (``('field', 'intro', ...)``, ``('item', 'bikes', 0, {...})``)
+    as soon as that part of the answer is complete; the return value is the same.
     """
     if not client:
         return {"error": "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."}
     
+    if progress:
+        progress("research")
     try:
-        research: List[Dict[str, Any]] = _run_coroutine_blocking(_gather_bikes_research(bikes_to_compare))
+        research: List[Dict[str, Any]] = research_bikes(bikes_to_compare)
     except Exception as e:
         print(f"Error in async research: {e}")
         import traceback
@@ -664,6 +794,8 @@ def generate_comparison_with_ai_from_bikes(bikes_to_compare: List[Dict[str, Any]
     # Use Chat Completions API directly for better JSON support
     # (Responses API doesn't support response_format and is less reliable for JSON)
     print(f"Using Chat Completions API with prompt length: {len(prompt)}")
+    if progress:
+        progress("generating")
     try:
         completion = client.chat.completions.create(
             model="gpt-4o-mini",
@@ -679,8 +811,12 @@ def generate_comparison_with_ai_from_bikes(bikes_to_compare: List[Dict[str, Any]
             temperature=0.6,
             max_tokens=2000,  # Increased for longer responses
             response_format={"type": "json_object"},  # Force JSON format
+            stream=on_partial is not None,
         )
-        content = completion.choices[0].message.content.strip()
+        if on_partial is not None:
+            content = _read_streamed_completion(completion, on_partial).strip()
+        else:
+            content = completion.choices[0].message.content.strip()
         print(f"Chat Completions response length: {len(content)}")
         print(f"Chat Completions response preview: {content[:500]}")
         
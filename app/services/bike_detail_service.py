@@ -0,0 +1,247 @@
+"""
+Per-bike detail documents.
+
+The bike page used to rebuild everything on each view: scan raw specs for the
+rewritten description, sort the gallery, translate every spec key to Hebrew
+and regroup ``BikeVariant`` rows into a colors x sizes matrix. A detail
+document is all of that (the ``bike_detail.html`` context) computed once and
+cached per URL identifier and catalog data version, so a page view is a cache
+lookup plus the template render. The post-migration warm-up requests every
+bike page, which fills these documents ahead of traffic.
+"""
+
+import json
+
+from app.extensions import db
+from app.models import Bike
+from app.services.bike_index import resolve_bike_id, resolve_bike_ids
+from app.services.bike_loaders import bike_loader
+from app.services.data_version import get_data_version, CATALOG
+from app.utils.cache_tags import tagged_memoize, CATALOG_TAG
+from app.utils.helpers import parse_price, translate_spec_key_to_hebrew
+
+CATEGORY_HEBREW = {
+    'electric': 'חשמליים',
+    'mtb': 'אופני הרים',
+    'kids': 'אופני ילדים',
+    'city': 'אופני עיר',
+    'road': 'אופני כביש',
+    'gravel': 'אופני גראבל'
+}
+
+SUB_CATEGORY_HEBREW = {
+    'electric_mtb': 'אופני הרים חשמליים',
+    'electric_city': 'אופני עיר חשמליים',
+    'hardtail': 'הארדטייל',
+    'full_suspension': 'שיכוך מלא',
+    'city': 'אופני עיר',
+    'folding_city': 'אופני עיר מתקפלים',
+    'gravel': 'אופני גראבל',
+    'road': 'אופני כביש',
+    'time_trial': 'נגד השעון',
+    'kids': 'אופני ילדים',
+    'kids_mtb': 'אופני הרים לילדים',
+    'pushbike': 'אופני איזון'
+}
+
+# Price strings that mean "no price"
+_NO_PRICE = ('None', '', 'צור קשר')
+
+
+def _rewritten_description(bike, bike_dict):
+    rewritten_description = None
+
+    # First, try to get from raw_specs (check all listings)
+    for listing in bike.listings or []:
+        for raw_spec in listing.raw_specs or []:
+            # Check case-insensitively and also check for variations
+            spec_key_lower = raw_spec.spec_key_raw.lower().strip()
+            if spec_key_lower == 'rewritten_description' or spec_key_lower == 'rewritten description':
+                rewritten_description = raw_spec.spec_value_raw
+                break
+        if rewritten_description:
+            break
+
+    # If not found in raw_specs, try from bike.description
+    if not rewritten_description or not rewritten_description.strip():
+        rewritten_description = bike.description
+
+    # If still not found, try from bike_dict (in case it's stored there)
+    if (not rewritten_description or not rewritten_description.strip()) and bike_dict:
+        rewritten_description = bike_dict.get('rewritten_description') or bike_dict.get('description')
+    return rewritten_description
+
+
+def _variants_payload(variants):
+    """Colors (ordered by position, each with a sizes dict) + size order, or None."""
+    if not variants:
+        return None
+
+    colors_map = {}
+    size_order = []
+    for v in sorted(variants, key=lambda x: (x.position or 0, x.id)):
+        key = v.color_id or f"__label__:{v.color_label}"
+        if key not in colors_map:
+            gallery = []
+            if v.gallery_json:
+                try:
+                    gallery = json.loads(v.gallery_json) or []
+                except (ValueError, TypeError):
+                    gallery = []
+            colors_map[key] = {
+                "color_id": v.color_id or "",
+                "label": v.color_label or "",
+                "image_url": v.image_url,
+                "gallery_images_urls": gallery,
+                "is_default": bool(v.is_default_color),
+                "position": v.position or 0,
+                "sizes": {},
+            }
+        if v.size_label:
+            if v.size_label not in size_order:
+                size_order.append(v.size_label)
+            colors_map[key]["sizes"][v.size_label] = {
+                "sku": v.sku,
+                "stock": v.stock,
+                "in_stock": bool(v.in_stock),
+            }
+
+    colors_list = list(colors_map.values())
+    # Compute total_stock + in_stock per color from the child rows.
+    for c in colors_list:
+        if c["sizes"]:
+            total = sum(
+                (s.get("stock") or 0)
+                for s in c["sizes"].values()
+                if isinstance(s.get("stock"), int)
+            )
+            any_in = any(bool(s.get("in_stock")) for s in c["sizes"].values())
+        else:
+            total = 0
+            any_in = False
+        c["total_stock"] = total
+        c["in_stock"] = any_in or (total > 0)
+
+    # Pick a default color: is_default flag, else first in_stock, else first.
+    default_color_id = None
+    for c in colors_list:
+        if c["is_default"]:
+            default_color_id = c["color_id"]
+            break
+    if not default_color_id:
+        for c in colors_list:
+            if c["in_stock"]:
+                default_color_id = c["color_id"]
+                break
+    if not default_color_id and colors_list:
+        default_color_id = colors_list[0]["color_id"]
+
+    if not (colors_list or size_order):
+        return None
+    return {
+        "sizes": size_order,
+        "colors": colors_list,
+        "default_color_id": default_color_id,
+    }
+
+
+def build_bike_detail_document(bike):
+    """Everything ``bike_detail.html`` needs for one bike (loaded with the 'detail' profile)."""
+    bike_dict = bike.to_dict(include_specs=True, include_prices=True, include_images=True, flat_format=True, list_view=False)
+
+    # Main image first, then by position
+    gallery_images = [img.image_url for img in sorted(bike.images or [], key=lambda x: (not x.is_main, x.position))]
+
+    # Raw specs of the first listing, keys translated to Hebrew for display
+    raw_specs = {}
+    if bike.listings and bike.listings[0].raw_specs:
+        for raw_spec in bike.listings[0].raw_specs:
+            # rewritten_description is displayed separately
+            if raw_spec.spec_key_raw != 'rewritten_description':
+                raw_specs[translate_spec_key_to_hebrew(raw_spec.spec_key_raw)] = raw_spec.spec_value_raw
+
+    product_url = bike.listings[0].product_url if bike.listings else None
+
+    # to_dict returns 'price' as original_price and 'disc_price' as disc_price
+    original_price = bike_dict.get('price')
+    disc_price = bike_dict.get('disc_price')
+
+    # Numeric price for structured data
+    parsed_price = None
+    if disc_price and disc_price not in _NO_PRICE:
+        parsed_price = parse_price(disc_price)
+    elif original_price and original_price not in _NO_PRICE:
+        parsed_price = parse_price(original_price)
+
+    return {
+        'slug': bike.slug,
+        'uuid': bike.uuid,
+        'context': {
+            'bike': bike_dict,
+            'brand': bike.brand.name if bike.brand else None,
+            'model': bike.model,
+            'year': bike.year,
+            'category': bike.category,
+            'category_hebrew': CATEGORY_HEBREW.get(bike.category, bike.category) if bike.category else None,
+            'sub_category': bike.sub_category,
+            'sub_category_hebrew': SUB_CATEGORY_HEBREW.get(bike.sub_category, bike.sub_category) if bike.sub_category else None,
+            'original_price': original_price,
+            'disc_price': disc_price,
+            'main_image': bike_dict.get('image_url'),
+            'gallery_images': gallery_images,
+            'product_url': product_url,
+            'rewritten_description': _rewritten_description(bike, bike_dict),
+            'raw_specs': raw_specs,
+            'bike_id': bike.slug if bike.slug else bike.uuid,
+            'parsed_price': parsed_price,
+            'variants': _variants_payload(bike.variants),
+        },
+    }
+
+
+@tagged_memoize(timeout=3600, tags=[CATALOG_TAG])  # 1 hour
+def _detail_document(identifier, catalog_version):
+    bike_pk = resolve_bike_id(identifier)
+    if bike_pk is None:
+        return None
+    bike = db.session.query(Bike).options(*bike_loader('detail')).filter(Bike.id == bike_pk).first()
+    if not bike:
+        return None
+    return build_bike_detail_document(bike)
+
+
+def get_bike_detail_document(identifier):
+    """Cached detail document for a slug or uuid, or None if no such bike.
+
+    Returns ``{'slug', 'uuid', 'context'}``; ``context`` is the keyword
+    arguments for ``render_template('bike_detail.html', ...)``.
+    """
+    return _detail_document(identifier, get_data_version(CATALOG).version)
+
+
+def get_bike_detail_documents(identifiers):
+    """``{identifier: document}`` for many slugs / uuids; unknown identifiers are left out.
+
+    Cached documents are read in one round-trip and the misses are loaded
+    with a single primary-key ``IN`` query, then cached like
+    ``get_bike_detail_document`` would.
+    """
+    identifiers = list(dict.fromkeys(identifiers))
+    if not identifiers:
+        return {}
+    catalog_version = get_data_version(CATALOG).version
+    cached = _detail_document.get_many([(identifier, catalog_version) for identifier in identifiers])
+    documents = {identifier: document for identifier, document in zip(identifiers, cached) if document is not None}
+
+    missing = resolve_bike_ids(identifier for identifier in identifiers if identifier not in documents)
+    if missing:
+        bikes = db.session.query(Bike).options(*bike_loader('detail')).filter(
+            Bike.id.in_(set(missing.values()))
+        ).all()
+        built = {bike.id: build_bike_detail_document(bike) for bike in bikes}
+        for identifier, bike_pk in missing.items():
+            document = built.get(bike_pk)
+            if document:
+                documents[identifier] = document
+                _detail_document.store(document, identifier, catalog_version)
+    return documents
@@ -0,0 +1,133 @@
+"""
+In-memory bike identifier index.
+
+Routes receive bikes by slug (SEO URLs) or UUID (old links, compare lists)
+and used to resolve them with ``(Bike.slug == x) | (Bike.uuid == x)``, an OR
+across two unique indexes that MySQL often turns into a scan. Each worker
+instead keeps ``slug -> id``, ``uuid -> id`` and ``id -> public identifier``
+for the whole catalog (one small SELECT), built at boot and rebuilt when the
+catalog data version changes. Routes resolve the identifier here and then
+fetch the bike by primary key.
+
+Identifiers that are not in the index (e.g. a bike added since the last
+catalog rebuild) are looked up with two single-index queries and remembered.
+Identifiers with no bike at all (crawlers, stale links) are remembered as
+misses for ``MISS_SECONDS`` (or until the catalog version changes), so
+repeated 404s don't go to the database every time.
+"""
+
+import threading
+import time
+
+from app.extensions import db
+from app.models import Bike
+from app.services.data_version import get_data_version, CATALOG
+
+# How long an identifier with no bike is answered from memory
+MISS_SECONDS = 300
+# Misses remembered per worker; the set is emptied when full
+_MAX_MISSES = 10000
+
+
+class BikeIndex:
+    """slug / uuid -> bike id, and bike id -> slug (or uuid when there is no slug)."""
+
+    def __init__(self, rows):
+        self.by_slug = {}
+        self.by_uuid = {}
+        self.public_ids = {}
+        self.misses = {}  # identifier -> time.monotonic() when the miss expires
+        for bike_id, slug, uuid in rows:
+            self.add(bike_id, slug, uuid)
+
+    def add(self, bike_id, slug, uuid):
+        if slug:
+            self.by_slug[slug] = bike_id
+        if uuid:
+            self.by_uuid[uuid] = bike_id
+        self.public_ids[bike_id] = slug if slug else uuid
+        self.misses.pop(slug, None)
+        self.misses.pop(uuid, None)
+
+    def get(self, identifier):
+        # Slugs first, as the routes prefer them
+        bike_id = self.by_slug.get(identifier)
+        if bike_id is None:
+            bike_id = self.by_uuid.get(identifier)
+        return bike_id
+
+    def known_missing(self, identifier):
+        expires = self.misses.get(identifier)
+        return expires is not None and expires > time.monotonic()
+
+    def add_miss(self, identifier):
+        if len(self.misses) >= _MAX_MISSES:
+            self.misses.clear()
+        self.misses[identifier] = time.monotonic() + MISS_SECONDS
+
+
+def build_bike_index():
+    """Read every bike's id, slug and uuid. Must run inside an app context."""
+    return BikeIndex(db.session.query(Bike.id, Bike.slug, Bike.uuid).all())
+
+
+_current = {'version': None, 'index': None}
+_index_lock = threading.Lock()
+
+
+def get_bike_index():
+    """This worker's BikeIndex for the current catalog version."""
+    version = get_data_version(CATALOG).version
+    if _current['version'] == version:
+        return _current['index']
+    with _index_lock:
+        if _current['version'] != version:
+            _current['index'] = build_bike_index()
+            _current['version'] = version
+    return _current['index']
+
+
+def _lookup(index, identifier):
+    """Database fallback for an identifier the index doesn't know yet."""
+    for column in (Bike.slug, Bike.uuid):
+        row = db.session.query(Bike.id, Bike.slug, Bike.uuid).filter(column == identifier).first()
+        if row:
+            index.add(*row)
+            return row[0]
+    index.add_miss(identifier)
+    return None
+
+
+def resolve_bike_id(identifier):
+    """Bike id for a slug or uuid, or None if there is no such bike."""
+    if not identifier:
+        return None
+    index = get_bike_index()
+    bike_id = index.get(identifier)
+    if bike_id is None and not index.known_missing(identifier):
+        bike_id = _lookup(index, identifier)
+    return bike_id
+
+
+def resolve_bike_ids(identifiers):
+    """``{identifier: bike id}`` for many slugs / uuids, in input order; unknown ones are left out."""
+    identifiers = [identifier for identifier in dict.fromkeys(identifiers) if identifier]
+    index = get_bike_index()
+    missing = [identifier for identifier in identifiers
+               if index.get(identifier) is None and not index.known_missing(identifier)]
+    if missing:
+        # Same two single-index lookups as resolve_bike_id, batched
+        for column in (Bike.slug, Bike.uuid):
+            for row in db.session.query(Bike.id, Bike.slug, Bike.uuid).filter(column.in_(missing)).all():
+                index.add(*row)
+        for identifier in missing:
+            if index.get(identifier) is None:
+                index.add_miss(identifier)
+
+    resolved = {}
+    for identifier in identifiers:
+        bike_id = index.get(identifier)
+        if bike_id is not None:
+            resolved[identifier] = bike_id
+    return resolved
+
@@ -0,0 +1,78 @@
+"""
+Named ORM loader profiles for Bike queries.
+
+The old ``joinedload(listings).joinedload(prices)`` + ``joinedload(raw_specs)``
+(+ images / variants) chains returned one row per listing x price x spec x
+image, which SQLAlchemy then de-duplicated. These profiles load each
+collection with its own ``selectinload`` query, keep only the newest price
+row per listing, and skip ``Bike.description`` where nothing reads it.
+
+    bike = db.session.query(Bike).options(*bike_loader('detail')).filter(...).first()
+
+Profiles:
+    list     list-view rows (brand, first-listing specs, current price)
+    detail   the bike page (everything, including description and variants)
+    compare  to_dict() with gallery, for compare / AJAX bike details
+    similar  price + category only, for similarity scoring
+
+list and similar join the listings and their newest price onto the bike row
+(one row per listing) instead of issuing separate SELECTs, and list loads only
+the raw specs ``to_dict(list_view=True)`` keeps, so they fetch fewer rows than
+the old joinedload chains.
+
+Every profile uses the latest-price loader, so ``listing.prices`` holds just
+the newest row. That matches what ``Bike._to_dict_flat`` reads
+(``prices[-1]``); don't use these profiles for code that needs price history.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased, defer, joinedload, load_only, selectinload
+
+from app.models import Bike, BikeListing, BikePrice, BikeSpecRaw
+from app.models.models import LIST_VIEW_SPEC_KEYS
+
+# Bike columns the flat to_dict reads (everything but description/timestamps)
+_LIST_COLUMNS = (
+    Bike.id, Bike.uuid, Bike.slug, Bike.brand_id, Bike.model, Bike.year, Bike.category,
+    Bike.sub_category, Bike.style, Bike.fork_length, Bike.main_image_url,
+)
+
+
+def latest_price_only():
+    """``BikeListing.prices`` restricted to the newest row of each listing."""
+    newer = aliased(BikePrice)
+    latest_id = select(func.max(newer.id)).where(
+        newer.listing_id == BikePrice.listing_id
+    ).correlate(BikePrice).scalar_subquery()
+    return BikeListing.prices.and_(BikePrice.id == latest_id)
+
+
+def _listings(with_specs=True):
+    loader = selectinload(Bike.listings)
+    options = [selectinload(latest_price_only())]
+    if with_specs:
+        options.append(selectinload(BikeListing.raw_specs))
+    return loader.options(*options)
+
+
+def _joined_listings(with_list_specs=True):
+    """Listings + newest price joined (one row per listing); list-view raw specs selected separately."""
+    options = [joinedload(Bike.listings).joinedload(latest_price_only())]
+    if with_list_specs:
+        options.append(joinedload(Bike.listings).selectinload(
+            BikeListing.raw_specs.and_(BikeSpecRaw.spec_key_raw.in_(sorted(LIST_VIEW_SPEC_KEYS)))
+        ))
+    return options
+
+
+def bike_loader(profile):
+    """Loader options for a named profile (see module docstring)."""
+    if profile == 'list':
+        return [load_only(*_LIST_COLUMNS), joinedload(Bike.brand), *_joined_listings()]
+    if profile == 'detail':
+        return [joinedload(Bike.brand), _listings(), selectinload(Bike.images), selectinload(Bike.variants)]
+    if profile == 'compare':
+        return [defer(Bike.description), joinedload(Bike.brand), _listings(), selectinload(Bike.images)]
+    if profile == 'similar':
+        return [load_only(*_LIST_COLUMNS), joinedload(Bike.brand), *_joined_listings(with_list_specs=False)]
+    raise ValueError(f"Unknown bike loader profile '{profile}'")
@@ -0,0 +1,83 @@
+"""
+Persistent per-bike research store.
+
+Every AI comparison used to run web research (OpenAI web_search, then
+DuckDuckGo) for each bike in it, so a popular bike was researched again in
+every comparison that included it. Research now lives in the
+``bike_research`` table, keyed by the normalised brand + model + year:
+
+    - a found answer is reused for ``AI_RESEARCH_TTL_HOURS``;
+    - a lookup that found nothing is stored too (``answer`` NULL) and retried
+      after ``AI_RESEARCH_NEGATIVE_TTL_HOURS``, so a bike no source knows
+      about doesn't cost two web lookups per comparison.
+
+``ai_service`` reads and writes the store around its async research;
+``scripts/db/prefetch_bike_research.py`` fills it for the most-compared bikes
+offline. The store is skipped outside an app context.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+
+from app.extensions import db
+from app.models import BikeResearch
+
+
+def _normalise(value):
+    return ' '.join(str(value or '').split()).lower()
+
+
+def research_key(bike):
+    """Store key for a bike dict (brand / model / year), or None without brand and model."""
+    brand, model, year = (_normalise(bike.get(field)) for field in ('brand', 'model', 'year'))
+    if not (brand or model):
+        return None
+    return hashlib.sha1(f"{brand}|{model}|{year}".encode('utf-8')).hexdigest()
+
+
+def load_research(keys):
+    """``{key: result}`` for unexpired entries; ``result`` is ``{'query', 'answer'}``, or None
+    for a cached "nothing found". Keys without an entry are left out."""
+    keys = [key for key in dict.fromkeys(keys) if key]
+    if not keys or not has_app_context():
+        return {}
+    try:
+        rows = db.session.query(BikeResearch).filter(
+            BikeResearch.research_key.in_(keys), BikeResearch.expires_at > datetime.utcnow()
+        ).all()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error reading bike research cache: {e}")
+        return {}
+    return {
+        row.research_key: {"query": row.query, "answer": row.answer} if row.answer else None
+        for row in rows
+    }
+
+
+def store_research(entries):
+    """Save ``(key, query, result, source)`` tuples; ``result`` None records a failed lookup."""
+    entries = [entry for entry in entries if entry[0]]
+    if not entries or not has_app_context():
+        return
+    now = datetime.utcnow()
+    found_ttl = timedelta(hours=current_app.config.get('AI_RESEARCH_TTL_HOURS', 336))
+    missing_ttl = timedelta(hours=current_app.config.get('AI_RESEARCH_NEGATIVE_TTL_HOURS', 6))
+    try:
+        for key, query, result, source in entries:
+            answer = result.get("answer") if result else None
+            db.session.merge(BikeResearch(
+                research_key=key,
+                query=query[:255],
+                answer=answer or None,
+                source=source if answer else None,
+                fetched_at=now,
+                expires_at=now + (found_ttl if answer else missing_ttl),
+            ))
+        db.session.commit()
+    except Exception as e:
+        # e.g. another worker stored the same bike at the same moment; its row is as good as ours
+        db.session.rollback()
+        print(f"Error saving bike research cache: {e}")
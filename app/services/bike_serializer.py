@@ -0,0 +1,136 @@
+"""
+Columnar bulk serializer for bikes.
+
+Produces exactly the dict shape of ``Bike.to_dict(flat_format=True)`` for a
+whole result set from a handful of Core SELECTs (bikes+brand, listings,
+prices, raw specs, images) - no ORM identity map, no per-object attribute
+loading, no cartesian joinedload rows. Use it on hot list paths; keep
+``Bike.to_dict`` for single-object code.
+"""
+
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Bike, Brand, BikeListing, BikePrice, BikeSpecRaw, BikeImage
+
+# Same set Bike._to_dict_flat keeps in list_view mode
+ESSENTIAL_SPEC_KEYS = frozenset({'wh', 'frame_material', 'frame', 'motor_brand', 'motor', 'wheel_size'})
+
+# Keep IN (...) lists well below driver/database parameter limits
+_CHUNK_SIZE = 500
+
+_BIKE_COLUMNS = (
+    Bike.id, Bike.slug, Bike.uuid, Brand.name, Bike.model, Bike.year, Bike.main_image_url,
+    Bike.sub_category, Bike.category, Bike.style, Bike.fork_length,
+)
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _CHUNK_SIZE):
+        yield values[start:start + _CHUNK_SIZE]
+
+
+def _rows(statement_for_chunk, ids):
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(db.session.execute(statement_for_chunk(chunk)).all())
+    return rows
+
+
+def _text(value):
+    return str(value) if value else None
+
+
+def serialize_bikes(bike_ids, include_specs=True, include_prices=True, include_images=True, list_view=False):
+    """Flat bike dicts for ``bike_ids``, in the same order (unknown ids are skipped).
+
+    Mirrors ``Bike._to_dict_flat``: first listing (lowest id) supplies
+    product_url and raw specs, its newest price row supplies price/disc_price,
+    and the gallery is ordered main image first, then by position.
+    """
+    bike_ids = list(bike_ids)
+    if not bike_ids:
+        return []
+
+    bike_rows = _rows(lambda chunk: select(*_BIKE_COLUMNS).outerjoin(Brand, Bike.brand_id == Brand.id)
+                      .where(Bike.id.in_(chunk)), bike_ids)
+
+    # First listing per bike
+    first_listing = {}
+    product_urls = {}
+    if include_prices or include_specs:
+        listing_rows = _rows(lambda chunk: select(BikeListing.bike_id, BikeListing.id, BikeListing.product_url)
+                             .where(BikeListing.bike_id.in_(chunk)).order_by(BikeListing.id), bike_ids)
+        for bike_id, listing_id, product_url in listing_rows:
+            if bike_id not in first_listing:
+                first_listing[bike_id] = listing_id
+                product_urls[bike_id] = product_url
+    listing_ids = list(first_listing.values())
+
+    # Newest price row per listing (ascending id scan, last one wins)
+    latest_price = {}
+    if include_prices and listing_ids:
+        price_rows = _rows(lambda chunk: select(BikePrice.listing_id, BikePrice.original_price, BikePrice.disc_price)
+                           .where(BikePrice.listing_id.in_(chunk)).order_by(BikePrice.id), listing_ids)
+        for listing_id, original_price, disc_price in price_rows:
+            latest_price[listing_id] = (original_price, disc_price)
+
+    specs_by_listing = defaultdict(list)
+    if include_specs and listing_ids:
+        def spec_statement(chunk):
+            statement = select(BikeSpecRaw.listing_id, BikeSpecRaw.spec_key_raw, BikeSpecRaw.spec_value_raw) \
+                .where(BikeSpecRaw.listing_id.in_(chunk))
+            if list_view:
+                statement = statement.where(BikeSpecRaw.spec_key_raw.in_(ESSENTIAL_SPEC_KEYS))
+            return statement.order_by(BikeSpecRaw.id)
+        for listing_id, key, value in _rows(spec_statement, listing_ids):
+            # Re-check in Python: the SQL IN may match case-insensitively (MySQL collation)
+            if value and (not list_view or key in ESSENTIAL_SPEC_KEYS):
+                specs_by_listing[listing_id].append((key, value))
+
+    gallery = defaultdict(list)
+    if include_images and not list_view:
+        image_rows = _rows(lambda chunk: select(BikeImage.bike_id, BikeImage.image_url, BikeImage.is_main, BikeImage.position)
+                           .where(BikeImage.bike_id.in_(chunk)).order_by(BikeImage.id), bike_ids)
+        for bike_id, image_url, is_main, position in image_rows:
+            gallery[bike_id].append((not is_main, position, image_url))
+
+    by_id = {}
+    for bike_id, slug, uuid, brand_name, model, year, main_image_url, sub_category, category, style, fork_length in bike_rows:
+        data = {
+            'id': slug if slug else uuid,
+            'brand': brand_name,
+            'model': _text(model),
+            'year': _text(year),
+            'image_url': _text(main_image_url),
+            'sub_category': _text(sub_category),
+            'category': _text(category),
+            'style': _text(style),
+            'fork_length': _text(fork_length),
+            'product_url': None,
+            'price': None,
+            'disc_price': None,
+        }
+        listing_id = first_listing.get(bike_id)
+        if include_prices and listing_id is not None:
+            data['product_url'] = product_urls[bike_id]
+            original_price, disc_price = latest_price.get(listing_id, (None, None))
+            data['price'] = _text(original_price)
+            data['disc_price'] = _text(disc_price)
+        if include_specs and listing_id is not None:
+            for key, value in specs_by_listing.get(listing_id, ()):
+                data[key] = value
+        images = gallery.get(bike_id)
+        if images:
+            # Stable sort keeps id order for ties, like sorted(self.images, ...)
+            images.sort(key=lambda image: (image[0], image[1]))
+            data['gallery_images_urls'] = json.dumps([image[2] for image in images])
+        else:
+            data['gallery_images_urls'] = None
+        by_id[bike_id] = data
+
+    return [by_id[bike_id] for bike_id in bike_ids if bike_id in by_id]
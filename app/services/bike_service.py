@@ -3,10 +3,12 @@ New bike service that works with the normalized MySQL database schema.
 Provides backward compatibility with the old flat structure.
 """
 
-from app.extensions import cache, db
+from app.extensions import db
 from app.models import Bike, Brand, BikeListing, BikePrice, BikeSpecStd, BikeSpecRaw, BikeImage
 from app.utils.helpers import clean_bike_data_for_json
-from sqlalchemy import or_
+from app.services.bike_index import resolve_bike_ids
+from app.services.bike_loaders import bike_loader
+from app.utils.cache_tags import tagged_memoize, BRANDS_TAG, CATALOG_TAG
 import json
 
 
@@ -27,7 +29,7 @@ def get_bike_serializer():
 # Use bike.to_dict() method instead which is defined in the Bike model
 
 
-@cache.memoize(timeout=1800)  # Cache for 30 minutes (brands change rarely)
+@tagged_memoize(timeout=1800, tags=[BRANDS_TAG, CATALOG_TAG])  # Cache for 30 minutes (brands change rarely)
 def get_all_brands():
     """Get all unique brands from database"""
     try:
@@ -38,7 +40,7 @@ def get_all_brands():
         return []
 
 
-@cache.memoize(timeout=1800)  # Cache for 30 minutes (sub-categories change rarely)
+@tagged_memoize(timeout=1800, tags=[CATALOG_TAG])  # Cache for 30 minutes (sub-categories change rarely)
 def get_all_sub_categories():
     """Get all unique sub-categories from database"""
     try:
@@ -88,7 +90,7 @@ def get_sub_categories_by_category(category):
         return []
 
 
-@cache.memoize(timeout=1800)  # Cache for 30 minutes
+@tagged_memoize(timeout=1800, tags=[CATALOG_TAG])  # Cache for 30 minutes
 def get_all_styles():
     """Get all unique styles from database"""
     try:
@@ -125,64 +127,18 @@ def get_styles_by_category(category):
 def get_wheel_sizes_by_category(category):
     """Get unique wheel sizes for bikes in a specific category (kids only).
     Returns empty list for non-kids categories.
-    Queries both bike_specs_std and bike_specs_raw - production may have data in
-    raw specs only (from listings) while std specs come from bike-level migration."""
+    Read from the cached catalog facets (typed wheel_size column on the
+    snapshot) instead of scanning bike_specs_raw by normalized key."""
     if category != 'kids':
         return []
-    try:
-        from sqlalchemy import func
-        values_set = set()
-
-        # 1. Query BikeSpecStd (bike-level standardized specs)
-        std_results = db.session.query(BikeSpecStd.spec_value).join(Bike).filter(
-            Bike.category == 'kids',
-            BikeSpecStd.spec_name == 'wheel_size',
-            BikeSpecStd.spec_value.isnot(None),
-            BikeSpecStd.spec_value != ''
-        ).distinct().all()
-
-        # 2. Query BikeSpecRaw (listing-level raw specs) - production often has data here
-        raw_results = db.session.query(BikeSpecRaw.spec_value_raw).join(
-            BikeListing, BikeSpecRaw.listing_id == BikeListing.id
-        ).join(Bike, BikeListing.bike_id == Bike.id).filter(
-            Bike.category == 'kids',
-            func.lower(func.replace(BikeSpecRaw.spec_key_raw, ' ', '_')) == 'wheel_size',
-            BikeSpecRaw.spec_value_raw.isnot(None),
-            BikeSpecRaw.spec_value_raw != ''
-        ).distinct().all()
-
-        def parse_value(val):
-            try:
-                return int(float(str(val).strip()))
-            except (ValueError, TypeError):
-                return None
-
-        for (val,) in std_results:
-            n = parse_value(val)
-            if n is not None:
-                values_set.add(n)
-        for (val,) in raw_results:
-            n = parse_value(val)
-            if n is not None:
-                values_set.add(n)
-
-        # Ensure standard kids sizes (12-26") are always available in filter
-        values_set.update([12, 14, 16, 18, 20, 24, 26])
-        return sorted(values_set)
-    except Exception as e:
-        print(f"Error loading wheel sizes for category {category}: {e}")
-        return []
+    from app.services.facet_service import get_facets, wheel_size_options
+    return wheel_size_options(get_facets({'category': category}), category)
 
 
 def get_bike_by_uuid(uuid):
     """Get a single bike by UUID"""
     try:
-        bike = Bike.query.options(
-            db.joinedload(Bike.brand),
-            db.joinedload(Bike.listings).joinedload(BikeListing.prices),
-            db.joinedload(Bike.standardized_specs),
-            db.joinedload(Bike.images)
-        ).filter_by(uuid=uuid).first()
+        bike = Bike.query.options(*bike_loader('compare')).filter_by(uuid=uuid).first()
         if bike:
             return bike.to_dict()
         return None
@@ -194,14 +150,10 @@ def get_bike_by_uuid(uuid):
 def get_bikes_by_uuids(uuids):
     """Get multiple bikes by their UUIDs or slugs"""
     try:
-        bikes = Bike.query.options(
-            db.joinedload(Bike.brand),
-            db.joinedload(Bike.listings).joinedload(BikeListing.prices),
-            db.joinedload(Bike.standardized_specs),
-            db.joinedload(Bike.images)
-        ).filter(
-            or_(Bike.uuid.in_(uuids), Bike.slug.in_(uuids))
-        ).all()
+        bike_pks = set(resolve_bike_ids(uuids).values())
+        if not bike_pks:
+            return []
+        bikes = Bike.query.options(*bike_loader('compare')).filter(Bike.id.in_(bike_pks)).all()
         return [bike.to_dict() for bike in bikes]
     except Exception as e:
         print(f"Error loading bikes: {e}")
@@ -0,0 +1,115 @@
+"""
+Cache warm-up after a data migration or at worker boot.
+
+Requests every list page and bike detail page through the Flask test client
+(in parallel) so the shared cache already holds the category rows, brand /
+style lists and per-page data before the first real visitor arrives. Only
+useful with a shared cache backend (see CACHE_TYPE in app/config.py); with
+the per-process SimpleCache it just warms the calling process.
+
+Page and sitemap entries are keyed on the request host, so the requests are
+sent as the public site (``WARMUP_BASE_URL``, else ``SERVER_NAME``);
+without either they warm ``localhost`` entries that real traffic never reads.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.extensions import db
+from app.models import Bike
+from app.utils.cache_lock import acquire_lock, release_lock
+
+# Pages that every visitor path goes through
+LIST_ROUTES = ['/', '/bikes', '/categories', '/electric-subcategories', '/mtb-subcategories']
+
+_BOOT_LOCK_KEY = 'warmup:boot'
+# A boot warm-up that takes longer than this may be joined by another worker's
+_BOOT_LOCK_SECONDS = 1800
+
+
+def _base_urls(app):
+    """Public site URL(s) to send the warm-up requests to."""
+    configured = app.config.get('WARMUP_BASE_URL')
+    if configured:
+        return [url.strip().rstrip('/') for url in configured.split(',') if url.strip()]
+    if app.config.get('SERVER_NAME'):
+        return [f"{app.config.get('PREFERRED_URL_SCHEME', 'http')}://{app.config['SERVER_NAME']}"]
+    print("Cache warm-up: WARMUP_BASE_URL / SERVER_NAME not set, warming http://localhost "
+          "(page entries are per host, so visitors won't read these)")
+    return ['http://localhost']
+
+
+def _warm_routes(app):
+    """All routes to warm: static list pages, one page per category, every bike page."""
+    with app.app_context():
+        categories = [c for (c,) in db.session.query(Bike.category).distinct() if c]
+        bike_ids = [slug or uuid for slug, uuid in db.session.query(Bike.slug, Bike.uuid)]
+    return LIST_ROUTES + [f'/{category}' for category in sorted(categories)] + \
+        [f'/bike/{bike_id}' for bike_id in bike_ids if bike_id]
+
+
+def _warm_services(app):
+    """Direct service calls for cached loaders that no single page covers."""
+    from app.services.bike_service import get_all_brands, get_all_sub_categories, get_all_styles
+    with app.app_context():
+        get_all_brands()
+        get_all_sub_categories()
+        get_all_styles()
+
+
+def warm_caches(app, max_workers=8, include_bikes=True, base_url=None):
+    """Request every cacheable page once per public site URL.
+
+    Returns a list of (route, status, seconds).
+    """
+    started = time.time()
+    _warm_services(app)
+
+    routes = _warm_routes(app)
+    if not include_bikes:
+        routes = [r for r in routes if not r.startswith('/bike/')]
+    base_urls = [base_url.rstrip('/')] if base_url else _base_urls(app)
+
+    def fetch(target):
+        base, route = target
+        t0 = time.time()
+        try:
+            status = app.test_client().get(route, base_url=base).status_code
+        except Exception as e:
+            print(f"   Warm-up failed for {base}{route}: {e}")
+            status = 500
+        label = route if len(base_urls) == 1 else base + route
+        return label, status, time.time() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(fetch, [(base, route) for base in base_urls for route in routes]))
+
+    failed = [r for r in results if r[1] >= 400]
+    print(f"Cache warm-up: {len(results)} routes in {time.time() - started:.1f}s ({len(failed)} failed)")
+    for route, status, seconds in sorted(results, key=lambda r: r[2], reverse=True)[:15]:
+        print(f"   {seconds:6.3f}s  {status}  {route}")
+    for route, status, _ in failed:
+        print(f"   ❌ {status} {route}")
+    return results
+
+
+def warm_caches_in_background(app, max_workers=4):
+    """Start a warm-up thread at worker boot; only one worker at a time does the work."""
+    def run():
+        with app.app_context():
+            # All workers share the cache, so the first one to boot warms it for everyone.
+            token = acquire_lock(_BOOT_LOCK_KEY, _BOOT_LOCK_SECONDS)
+        if token is None:
+            return
+        try:
+            warm_caches(app, max_workers=max_workers)
+        except Exception as e:
+            print(f"Cache warm-up at boot failed: {e}")
+        finally:
+            with app.app_context():
+                release_lock(_BOOT_LOCK_KEY, token)
+
+    thread = threading.Thread(target=run, name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,454 @@
+"""
+Catalog snapshot service.
+
+List pages (``/<category>``, ``/bikes``) used to rebuild every row with a
+four-way joinedload and ``Bike.to_dict(list_view=True)`` per bike. The data
+only changes when the scrape pipeline re-migrates, so we precompute one flat
+``bike_catalog_rows`` row per bike at migration time and serve list views with
+a single indexed SELECT.
+
+If the snapshot has never been built (fresh database, table just created),
+the loaders fall back to the original ORM path so pages keep working.
+"""
+
+import base64
+import binascii
+import json
+import re
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, inspect, or_
+
+from app.extensions import db
+from app.models import Bike, BikeCatalogRow, BikeSpecStd, CompareCount
+from app.services.bike_loaders import bike_loader
+from app.services.data_version import bump_data_version, get_data_version, CATALOG
+from app.services.feature_store import build_feature_store, get_feature_store, save_feature_store
+from app.services.similarity_service import rebuild_similar_index
+from app.utils.bike_images import bike_list_thumb_url
+from app.utils.helpers import parse_price, get_frame_material, get_motor_brand
+from app.utils.cache_tags import tagged_memoize, invalidate_tags, category_tag, BRANDS_TAG, CATALOG_TAG
+
+# Raw spec keys kept on list rows (same set Bike._to_dict_flat uses for list_view)
+LIST_VIEW_SPEC_KEYS = ('wh', 'frame_material', 'frame', 'motor_brand', 'motor', 'wheel_size')
+
+# Top-level keys of the list-view dict that are real columns, not raw specs
+_BASE_KEYS = {
+    'id', 'brand', 'model', 'year', 'image_url', 'sub_category', 'category',
+    'style', 'fork_length', 'product_url', 'price', 'disc_price', 'gallery_images_urls',
+}
+
+
+# Data-quality variants of sub-category values, folded into the canonical one
+SUB_CATEGORY_ALIASES = {'electric_ city': 'electric_city'}
+
+
+def expand_sub_categories(sub_categories):
+    """Add the known ``'electric_ city'`` data-quality variant next to ``electric_city``."""
+    expanded = []
+    for subcat in sub_categories:
+        expanded.append(subcat)
+        if subcat == 'electric_city':
+            expanded.append('electric_ city')  # Handle data quality issue
+    return expanded
+
+
+def _parse_int(value):
+    try:
+        return int(float(str(value).strip()))
+    except (ValueError, TypeError):
+        return None
+
+
+def _first_int(value):
+    numbers = re.findall(r'\d+', str(value)) if value else []
+    return int(numbers[0]) if numbers else None
+
+
+def _load_numeric_specs():
+    """{(bike_id, spec_name): float} for the typed bike_specs_std values the snapshot uses."""
+    rows = db.session.query(
+        BikeSpecStd.bike_id, BikeSpecStd.spec_name, BikeSpecStd.spec_numeric
+    ).filter(
+        BikeSpecStd.spec_name.in_(['wh', 'fork_length', 'wheel_size']),
+        BikeSpecStd.spec_numeric.isnot(None)
+    ).all()
+    return {(bike_id, name): float(value) for bike_id, name, value in rows}
+
+
+def _catalog_row_from_bike(bike, numeric_specs=None):
+    """Build a BikeCatalogRow from a fully loaded Bike (needs a request context for thumb URLs)."""
+    numeric_specs = numeric_specs or {}
+    data = bike.to_dict(list_view=True, include_images=False)
+    specs = {k: v for k, v in data.items() if k not in _BASE_KEYS}
+
+    price_str = data.get('disc_price') or data.get('price')
+    wh_str = data.get('wh')
+    wh = numeric_specs.get((bike.id, 'wh'))
+    if wh is None and wh_str and str(wh_str).isdigit():
+        wh = int(wh_str)
+    fork_mm = numeric_specs.get((bike.id, 'fork_length'))
+    if fork_mm is None:
+        fork_mm = _first_int(bike.fork_length)
+    wheel_size = _parse_int(data['wheel_size']) if data.get('wheel_size') else None
+    if wheel_size is None:
+        wheel_size = numeric_specs.get((bike.id, 'wheel_size'))
+    return BikeCatalogRow(
+        bike_id=bike.id,
+        public_id=data['id'],
+        brand=data.get('brand'),
+        model=data.get('model'),
+        year=bike.year,
+        category=data.get('category'),
+        sub_category=data.get('sub_category'),
+        style=data.get('style'),
+        fork_length=data.get('fork_length'),
+        image_url=data.get('image_url'),
+        thumb_url=bike_list_thumb_url(data.get('image_url')),
+        product_url=data.get('product_url'),
+        price=data.get('price'),
+        disc_price=data.get('disc_price'),
+        price_value=parse_price(price_str),
+        wh=int(wh) if wh is not None else None,
+        fork_mm=int(fork_mm) if fork_mm is not None else None,
+        frame_material=get_frame_material(data),
+        motor_brand=get_motor_brand(data),
+        wheel_size=int(wheel_size) if wheel_size is not None else None,
+        specs_json=json.dumps(specs, ensure_ascii=False) if specs else None,
+        built_at=datetime.utcnow(),
+    )
+
+
+def rebuild_catalog_rows():
+    """Rebuild the whole ``bike_catalog_rows`` snapshot. Must run inside an app context.
+
+    Returns the number of rows written.
+    """
+    bikes = db.session.query(Bike).options(*bike_loader('list')).all()
+
+    numeric_specs = _load_numeric_specs()
+
+    # url_for() needs a request context; thumb URLs are relative paths anyway.
+    with current_app.test_request_context():
+        rows = [_catalog_row_from_bike(bike, numeric_specs) for bike in bikes]
+
+    try:
+        db.session.query(BikeCatalogRow).delete()
+        db.session.add_all(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    features = build_feature_store()
+    try:
+        rebuild_similar_index(features)
+    except Exception as e:
+        # Derived data only; the endpoint rebuilds it on demand when empty
+        print(f"Could not rebuild similar-bikes index: {e}")
+
+    # Everything derived from the catalog is stale now, in every worker.
+    categories = {row.category for row in rows if row.category}
+    invalidate_tags(CATALOG_TAG, BRANDS_TAG, *(category_tag(c) for c in categories))
+    version = bump_data_version(CATALOG)
+    if version is not None:
+        try:
+            save_feature_store(features, version.version)
+        except Exception as e:
+            # Workers build it themselves on first use
+            print(f"Could not save feature store: {e}")
+    return len(rows)
+
+
+def catalog_snapshot_built():
+    """True once ``rebuild_catalog_rows`` has populated the snapshot."""
+    return db.session.query(BikeCatalogRow.bike_id).first() is not None
+
+
+def ensure_catalog_table():
+    """Create ``bike_catalog_rows``, or recreate it when its columns drifted from the model.
+
+    The table only holds derived data, so dropping it is safe; callers
+    rebuild it right afterwards.
+    """
+    table = BikeCatalogRow.__table__
+    inspector = inspect(db.engine)
+    if table.name in inspector.get_table_names():
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        if existing == set(table.columns.keys()):
+            return False
+        table.drop(db.engine)
+    table.create(db.engine)
+    return True
+
+
+_snapshot_lock = threading.Lock()
+
+
+def ensure_catalog_snapshot():
+    """Build the snapshot on first use if the migration hasn't done it yet."""
+    if catalog_snapshot_built():
+        return
+    with _snapshot_lock:
+        if not catalog_snapshot_built():
+            print("bike_catalog_rows is empty - building catalog snapshot on demand")
+            rebuild_catalog_rows()
+
+
+def _legacy_category_query(category=None, sub_categories=None):
+    query = db.session.query(Bike).options(*bike_loader('list'))
+    if category:
+        query = query.filter(Bike.category == category)
+    if sub_categories:
+        query = query.filter(Bike.sub_category.in_(expand_sub_categories(sub_categories)))
+    return query
+
+
+def get_catalog_rows(category=None, sub_categories=None, include_thumb=False):
+    """List-view dicts for a category and/or sub-categories, read from the snapshot.
+
+    Falls back to the joined ORM query when the snapshot hasn't been built yet.
+    """
+    query = db.session.query(BikeCatalogRow)
+    if category:
+        query = query.filter(BikeCatalogRow.category == category)
+    if sub_categories:
+        query = query.filter(BikeCatalogRow.sub_category.in_(expand_sub_categories(sub_categories)))
+    rows = query.order_by(BikeCatalogRow.bike_id).all()
+
+    if rows or catalog_snapshot_built():
+        return [row.to_dict(include_thumb=include_thumb) for row in rows]
+
+    bikes = _legacy_category_query(category, sub_categories).all()
+    result = [bike.to_dict(list_view=True, include_images=False) for bike in bikes]
+    if include_thumb:
+        for b in result:
+            b['list_image_url'] = bike_list_thumb_url(b.get('image_url'))
+    return result
+
+
+def parse_catalog_filters(args):
+    """Read the /api/filter_bikes query-string filters into a plain dict."""
+    return {
+        'q': args.get("q", "").strip().lower(),
+        'min_price': args.get("min_price", type=int),
+        'max_price': args.get("max_price", type=int),
+        'years': args.getlist("year", type=int),
+        'brands': args.getlist("brand"),
+        'min_battery': args.get("min_battery", type=int),
+        'max_battery': args.get("max_battery", type=int),
+        'min_fork': args.get("min_fork", type=int),
+        'max_fork': args.get("max_fork", type=int),
+        'frame_material': args.get("frame_material", type=str),
+        'motor_brands': args.getlist("motor_brand", type=str),
+        'sub_categories': args.getlist("sub_category", type=str),
+        'styles': args.getlist("style", type=str),
+        'has_discount': args.get("has_discount", type=str) == "true",
+        'category': args.get("category", type=str),
+    }
+
+
+def _range_filter(column, low, high, zero_is_unknown=False):
+    """Bounds on a typed column; rows with no value (unknown) always pass, as before."""
+    conditions = []
+    if low is not None:
+        conditions.append(column >= low)
+    if high is not None:
+        conditions.append(column <= high)
+    if not conditions:
+        return None
+    unknown = [column.is_(None)]
+    if zero_is_unknown:
+        unknown.append(column == 0)
+    return or_(*unknown, db.and_(*conditions))
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filtered_catalog_query(filters, columns=None):
+    """SELECT over bike_catalog_rows with every /api/filter_bikes predicate applied in SQL.
+
+    Semantics match the old Python-side loop: bikes whose price, battery, fork
+    or frame material is unknown are kept, motor brand and discount are strict.
+    ``FeatureStore.mask`` applies the same predicates in memory; keep the two
+    in step (tests/test_catalog_filters.py checks they agree).
+    """
+    query = db.session.query(*(columns or [BikeCatalogRow]))
+    C = BikeCatalogRow
+
+    if filters.get('q'):
+        # Literal substring match (as FeatureStore.mask): % and _ in the query are not wildcards
+        pattern = '%' + _escape_like(filters['q']) + '%'
+        query = query.filter(or_(C.model.ilike(pattern, escape='\\'), C.brand.ilike(pattern, escape='\\')))
+    if filters.get('years'):
+        query = query.filter(or_(C.year.in_(filters['years']), C.year.is_(None)))
+    if filters.get('brands'):
+        query = query.filter(C.brand.in_(filters['brands']))
+
+    for condition in (
+        _range_filter(C.price_value, filters.get('min_price'), filters.get('max_price')),
+        _range_filter(C.wh, filters.get('min_battery'), filters.get('max_battery'), zero_is_unknown=True),
+        _range_filter(C.fork_mm, filters.get('min_fork'), filters.get('max_fork'), zero_is_unknown=True),
+    ):
+        if condition is not None:
+            query = query.filter(condition)
+
+    if filters.get('frame_material'):
+        query = query.filter(or_(C.frame_material.is_(None), C.frame_material == filters['frame_material']))
+    if filters.get('motor_brands'):
+        query = query.filter(C.motor_brand.in_(filters['motor_brands']))
+    if filters.get('has_discount'):
+        query = query.filter(C.disc_price.isnot(None), C.disc_price != '')
+    if filters.get('sub_categories'):
+        query = query.filter(C.sub_category.in_(expand_sub_categories(filters['sub_categories'])))
+    if filters.get('styles'):
+        query = query.filter(C.style.in_(filters['styles']))
+    if filters.get('category'):
+        query = query.filter(C.category == filters['category'])
+    return query
+
+
+# Cursor-mode sort orders: name -> descending?  Ties always break on bike_id.
+CATALOG_SORTS = {
+    'id': False,
+    'price_asc': False,
+    'price_desc': True,
+    'year_desc': True,
+    'year_asc': False,
+    'popularity': True,
+}
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that are malformed or were issued for a different sort."""
+
+
+def encode_cursor(sort, key, bike_id):
+    payload = json.dumps([sort, key, bike_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Return (sort_key, bike_id) from an opaque cursor, or raise InvalidCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, key, bike_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, bike_id = int(key), int(bike_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return key, bike_id
+
+
+def filtered_catalog_ids(filters):
+    """Bike ids matching ``filters``, in id order (boolean mask over the feature store)."""
+    store = get_feature_store()
+    return store.ids[store.mask(filters)].tolist()
+
+
+def _feature_page_after(store, filters, sort, cursor, limit):
+    """``catalog_page_after`` for the id / price / year sorts, without SQL."""
+    descending = CATALOG_SORTS[sort]
+    if sort == 'id':
+        key = store.ids
+    else:
+        key = store.sort_key('price_value' if sort.startswith('price') else 'year', descending)
+    rows = store.order(store.mask(filters), key, descending)
+
+    if cursor:
+        cursor_key, last_id = decode_cursor(cursor, sort)
+        row_keys = key[rows]
+        past_key = row_keys < cursor_key if descending else row_keys > cursor_key
+        rows = rows[past_key | ((row_keys == cursor_key) & (store.ids[rows] > last_id))]
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and len(page):
+        last = page[-1]
+        next_cursor = encode_cursor(sort, int(key[last]), int(store.ids[last]))
+    return store.ids[page].tolist(), next_cursor
+
+
+def catalog_page_after(filters, sort='id', cursor=None, limit=24):
+    """Keyset page over the filtered snapshot.
+
+    Returns ``(bike_ids, next_cursor)``; only ``limit + 1`` rows are read, so
+    deep scroll positions cost the same as the first page. ``next_cursor`` is
+    None on the last page.
+    """
+    if sort not in CATALOG_SORTS:
+        raise InvalidCursor(f"Unknown sort '{sort}'")
+    if sort != 'popularity':
+        # Catalog-only sorts run over the in-memory feature arrays
+        return _feature_page_after(get_feature_store(), filters, sort, cursor, limit)
+
+    # Popularity needs compare_counts, so it is the one sort done in SQL (descending)
+    C = BikeCatalogRow
+    sort_expr = func.coalesce(CompareCount.count, 0)
+    query = filtered_catalog_query(filters, columns=[C.bike_id, sort_expr.label('sort_key')]) \
+        .outerjoin(CompareCount, CompareCount.bike_id == C.bike_id)
+
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort)
+        query = query.filter(or_(sort_expr < key, db.and_(sort_expr == key, C.bike_id > last_id)))
+
+    rows = query.order_by(sort_expr.desc(), C.bike_id.asc()).limit(limit + 1).all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor(sort, int(last.sort_key), last.bike_id)
+    return [row.bike_id for row in page], next_cursor
+
+
+@tagged_memoize(timeout=600, tags=lambda category: [CATALOG_TAG, category_tag(category)])  # 10 minutes
+def load_category_bikes(category):
+    """Serialized list-view rows (with thumbnail URLs) for a category page."""
+    return get_catalog_rows(category=category, include_thumb=True)
+
+
+@tagged_memoize(timeout=1800, tags=[CATALOG_TAG])
+def _category_counts(catalog_version):
+    rows = db.session.query(
+        Bike.category, Bike.sub_category, func.count(Bike.id)
+    ).group_by(Bike.category, Bike.sub_category).all()
+    counts = {}
+    for category, sub_category, count in rows:
+        key = (category, SUB_CATEGORY_ALIASES.get(sub_category, sub_category))
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def get_category_counts():
+    """``{(category, sub_category): bike count}`` for the whole catalog.
+
+    One GROUP BY, cached until the catalog version changes; known
+    sub-category typos (``SUB_CATEGORY_ALIASES``) are folded in.
+    """
+    return _category_counts(get_data_version(CATALOG).version)
+
+
+def category_count(category, counts=None):
+    """Bikes in ``category`` (all sub-categories)."""
+    counts = get_category_counts() if counts is None else counts
+    return sum(count for (cat, _), count in counts.items() if cat == category)
+
+
+def sub_category_count(category, sub_category, counts=None):
+    """Bikes in one ``(category, sub_category)`` cell."""
+    counts = get_category_counts() if counts is None else counts
+    return counts.get((category, sub_category), 0)
+
+
+def catalog_bike_count():
+    """Total bikes in the catalog (navbar), or None if the rollup can't be read."""
+    try:
+        return sum(get_category_counts().values())
+    except Exception as e:
+        print(f"Error reading catalog counts: {e}")
+        return None
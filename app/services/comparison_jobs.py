@@ -0,0 +1,234 @@
+"""
+Background AI comparisons.
+
+An AI comparison (per-bike web research, then a chat completion of up to
+2000 tokens) takes tens of seconds. Running it inside the request held a
+gunicorn worker for that long. Now the request only inserts a
+``comparison_jobs`` row and returns its id, and a small thread pool in the
+worker runs research + generation and saves the result as a
+``Comparison``. Clients poll ``/api/compare_ai_jobs/<id>``; with
+``AI_JOB_EVENTS`` (threaded / async workers only - each open stream holds a
+worker thread) they follow ``/api/compare_ai_jobs/<id>/events`` (server-sent
+events) instead.
+
+A job moves queued -> running (stage: research, generating, saving) ->
+done / failed. The pool lives in the worker that accepted the job; if that
+worker dies, the job is reported as failed once it is older than
+``AI_JOB_TIMEOUT_SECONDS`` so clients stop waiting.
+
+Results are content-addressed: ``comparison_cache_key`` hashes the sorted
+internal ids of the bikes (so any order, slug or uuid gives the same key),
+the catalog data version and ``ai_service.PROMPT_VERSION``. A repeat
+comparison within ``AI_COMPARISON_CACHE_TTL_HOURS`` gets the stored
+``Comparison`` - same data, same share URL - without research or a
+completion; ``refresh`` forces a new one.
+
+With ``AI_STREAM_COMPARISONS`` the completion is streamed: each part of the
+answer (intro, every ``bikes[i]`` entry, expert tip...) is published to the
+shared cache as soon as it is complete, and the status payload (``partial``)
+and the events stream (a ``partial`` event) pass it on, so visitors start
+reading long before the job is done.
+
+The OpenAI SDK reads ``OPENAI_BASE_URL``, so pointing it at a local
+stand-in server runs the whole pipeline without the real API.
+"""
+
+import hashlib
+import json
+import secrets
+import string
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import cache, db
+from app.models import Comparison, ComparisonCacheEntry, ComparisonJob
+from app.services.ai_service import PROMPT_VERSION, generate_comparison_with_ai_from_bikes
+from app.services.bike_index import resolve_bike_ids
+from app.services.bike_service import get_bikes_by_uuids
+from app.services.data_version import get_data_version, CATALOG
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+NOT_ENOUGH_BIKES_ERROR = "לא נמצאו מספיק דגמים להשוואה. נסה לבחור דגמים אחרים."
+TIMED_OUT_ERROR = "יצירת ההשוואה ארכה זמן רב מדי. נסה שוב."
+# Shown for any other failure; the details (API errors, exception text) only go to the log
+GENERATION_ERROR = "אירעה שגיאה ביצירת ההשוואה. נסה שוב מאוחר יותר."
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def generate_short_code(length=6):
+    """Generate a random short code for URL shortening"""
+    characters = string.ascii_letters + string.digits
+    while True:
+        code = ''.join(secrets.choice(characters) for _ in range(length))
+        # Check if code already exists
+        existing = db.session.query(Comparison).filter_by(short_code=code).first()
+        if not existing:
+            return code
+
+
+def comparison_cache_key(compare_list):
+    """Cache key for comparing these bikes, or None if any of them is unknown."""
+    resolved = resolve_bike_ids(compare_list)
+    if len(resolved) < len(set(compare_list)):
+        return None
+    bike_ids = ','.join(str(bike_id) for bike_id in sorted(set(resolved.values())))
+    raw = f"{PROMPT_VERSION}|{get_data_version(CATALOG).version}|{bike_ids}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def find_cached_comparison(cache_key):
+    """The stored ``Comparison`` for ``cache_key`` if it is within the TTL, else None."""
+    if not cache_key:
+        return None
+    entry = db.session.get(ComparisonCacheEntry, cache_key)
+    if entry is None:
+        return None
+    ttl_hours = current_app.config.get('AI_COMPARISON_CACHE_TTL_HOURS', 720)
+    if ttl_hours and entry.created_at < datetime.utcnow() - timedelta(hours=ttl_hours):
+        return None
+    return entry.comparison
+
+
+def save_comparison(compare_list, comparison_result, cache_key=None):
+    """Store an AI comparison result (and its cache entry) and return the new ``Comparison``."""
+    comparison = Comparison()
+    comparison.bike_ids = json.dumps(compare_list)  # Store as JSON string
+    comparison.comparison_data = json.dumps(comparison_result)  # Store as JSON string
+    # Generate short code for URL shortening
+    comparison.short_code = generate_short_code()
+    # Simple slug based on bike IDs, limited to 4 bikes for URL; a refreshed or
+    # re-generated comparison of the same bikes gets its short code appended
+    slug = '-vs-'.join(compare_list[:4])
+    if db.session.query(Comparison.id).filter_by(slug=slug).first():
+        slug = f"{slug}-{comparison.short_code}"
+    comparison.slug = slug
+    db.session.add(comparison)
+    db.session.flush()
+    if cache_key:
+        db.session.merge(ComparisonCacheEntry(
+            cache_key=cache_key, comparison_id=comparison.id, created_at=datetime.utcnow()
+        ))
+    db.session.commit()
+    return comparison
+
+
+def _partial_key(job_id):
+    return f'ai_job_partial:{job_id}'
+
+
+def get_job_partial(job_id):
+    """Parts of the answer published so far, in order: ``{'field', 'value'}`` or
+    ``{'field', 'index', 'value'}`` for an entry of a list field such as ``bikes``."""
+    return cache.get(_partial_key(job_id)) or []
+
+
+def _partial_publisher(app, job_id):
+    """``on_partial`` callback for the AI service that appends to the job's published parts."""
+    parts = []
+    timeout = app.config.get('AI_JOB_TIMEOUT_SECONDS', 300) + 60
+
+    def publish(event):
+        if event[0] == 'item':
+            parts.append({'field': event[1], 'index': event[2], 'value': event[3]})
+        else:
+            parts.append({'field': event[1], 'value': event[2]})
+        # Single writer (this job), so rewriting the whole list is safe
+        cache.set(_partial_key(job_id), list(parts), timeout=timeout)
+
+    return publish
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config.get('AI_JOB_WORKERS', 4), thread_name_prefix='ai-compare'
+                )
+    return _executor
+
+
+def _update_job(job_id, **values):
+    db.session.query(ComparisonJob).filter_by(id=job_id).update(values)
+    db.session.commit()
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        # Claim the job; a job that is no longer queued (e.g. timed out) is skipped
+        claimed = db.session.query(ComparisonJob).filter_by(id=job_id, status=QUEUED).update(
+            {'status': RUNNING, 'stage': 'research', 'started_at': datetime.utcnow()}
+        )
+        db.session.commit()
+        if not claimed:
+            return
+
+        comparison_id = None
+        error = None
+        try:
+            compare_list = json.loads(db.session.get(ComparisonJob, job_id).bike_ids)
+            cache_key = comparison_cache_key(compare_list)
+            bikes_to_compare = get_bikes_by_uuids(compare_list)
+            if len(bikes_to_compare) < 2:
+                error = NOT_ENOUGH_BIKES_ERROR
+            else:
+                print(f"Starting AI comparison job {job_id} for {len(bikes_to_compare)} bikes")
+                on_partial = _partial_publisher(app, job_id) if app.config.get('AI_STREAM_COMPARISONS', True) else None
+                result = generate_comparison_with_ai_from_bikes(
+                    bikes_to_compare, progress=lambda stage: _update_job(job_id, stage=stage), on_partial=on_partial
+                )
+                if "error" in result:
+                    print(f"AI comparison job {job_id} failed: {result['error']}")
+                    error = GENERATION_ERROR
+                else:
+                    _update_job(job_id, stage='saving')
+                    comparison_id = save_comparison(compare_list, result, cache_key).id
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error in AI comparison job {job_id}: {e}")
+            traceback.print_exc()
+            error = GENERATION_ERROR
+
+        try:
+            _update_job(job_id, status=FAILED if error else DONE, stage=None, error=error,
+                        comparison_id=comparison_id, finished_at=datetime.utcnow())
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error finishing AI comparison job {job_id}: {e}")
+
+
+def enqueue_comparison(compare_list):
+    """Create a job for ``compare_list`` (bike slugs / uuids), start it and return it."""
+    job = ComparisonJob(id=secrets.token_hex(16), status=QUEUED, bike_ids=json.dumps(compare_list))
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    _get_executor(app).submit(_run_job, app, job.id)
+    return job
+
+
+def get_job(job_id):
+    """The job with ``job_id`` or None; unfinished jobs past the timeout are marked failed."""
+    job = db.session.get(ComparisonJob, job_id)
+    if job is None or job.status in FINISHED:
+        return job
+    timeout = current_app.config.get('AI_JOB_TIMEOUT_SECONDS', 300)
+    if job.created_at < datetime.utcnow() - timedelta(seconds=timeout):
+        job.status = FAILED
+        job.stage = None
+        job.error = TIMED_OUT_ERROR
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
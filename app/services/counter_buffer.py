@@ -0,0 +1,294 @@
+"""
+Write-behind buffer for compare counts and purchase clicks.
+
+``add_to_compare`` and ``purchase_click`` used to write (and commit) inside
+the visitor's request, so popular bikes serialised on the ``compare_counts``
+row lock. Now the request only appends one JSON line to this worker's spool
+file (``counters-<pid>.spool`` in ``COUNTER_SPOOL_DIR``). Every
+``COUNTER_FLUSH_SECONDS`` a background thread (started by ``create_app``):
+
+    1. renames the spool to a ``.batch`` file (new events go to a fresh spool),
+    2. sums the compare increments per bike and collects the click rows,
+    3. writes them in one transaction - a single upsert for ``compare_counts``
+       (INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT elsewhere)
+       and a bulk INSERT for ``purchase_clicks`` - and
+    4. deletes the batch file after the commit.
+
+Nothing is lost if a worker dies: its spool and any unfinished batch stay on
+disk and the next flush in any worker claims them (files of processes that
+are no longer running). A crash between the commit and step 4 replays that
+batch, so delivery is at-least-once.
+
+With ``COUNTERS_WRITE_BEHIND = False`` (testing) each event is flushed before
+the request returns.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import Bike, CompareCount, PurchaseClick
+
+_SPOOL_PATTERN = 'counters-{pid}.spool'
+_BATCH_PATTERN = 'counters-{pid}-{stamp}.batch'
+
+# Bike ids per upsert statement
+_UPSERT_BATCH = 1000
+
+_lock = threading.Lock()  # guards the spool file handle
+_flush_lock = threading.Lock()  # one flush at a time per worker
+_state = {'file': None, 'flusher': None, 'pid': None}
+
+
+def _spool_dir(app=None):
+    return (app or current_app).config['COUNTER_SPOOL_DIR']
+
+
+def _append(event):
+    """Append one event to this worker's spool (one write per line, flushed to the OS)."""
+    line = json.dumps(event, separators=(',', ':')) + '\n'
+    with _lock:
+        if _state['file'] is None:
+            directory = _spool_dir()
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, _SPOOL_PATTERN.format(pid=os.getpid()))
+            _state['file'] = open(path, 'a', encoding='utf-8')
+        _state['file'].write(line)
+        _state['file'].flush()
+
+
+def _record(event):
+    _append(event)
+    if current_app.config.get('COUNTERS_WRITE_BEHIND', True):
+        # Started by create_app; this only matters in a worker forked after boot (gunicorn --preload)
+        start_counter_flusher(current_app._get_current_object())
+    else:
+        flush_counters()
+
+
+def record_compare(bike_id):
+    """Count one add-to-compare for ``bike_id`` (internal id)."""
+    _record({'e': 'compare', 'bike_id': bike_id})
+
+
+def record_purchase_click(bike_id, importer=None):
+    """Record one outbound purchase click, timestamped now."""
+    _record({'e': 'click', 'bike_id': bike_id, 'importer': importer, 'at': datetime.utcnow().isoformat()})
+
+
+def _rotate_spool(directory):
+    """Move this worker's spool aside as a batch file; returns its path or None if empty."""
+    path = os.path.join(directory, _SPOOL_PATTERN.format(pid=os.getpid()))
+    with _lock:
+        if _state['file'] is not None:
+            _state['file'].close()
+            _state['file'] = None
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        batch = os.path.join(directory, _BATCH_PATTERN.format(pid=os.getpid(), stamp=time.time_ns()))
+        os.replace(path, batch)
+        return batch
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _file_pid(path):
+    try:
+        return int(os.path.basename(path).split('-')[1].split('.')[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _claim_batches(directory):
+    """This worker's batch files plus spools / batches left by processes that are gone.
+
+    Claiming renames the file to this worker's pid, so only one worker replays it.
+    """
+    pid = os.getpid()
+    batches = []
+    for path in sorted(glob.glob(os.path.join(directory, 'counters-*'))):
+        owner = _file_pid(path)
+        if owner is None or (owner != pid and _pid_alive(owner)):
+            continue
+        if owner == pid and path.endswith('.batch'):
+            batches.append(path)
+            continue
+        if owner == pid:
+            continue  # our live spool; rotated separately
+        claimed = os.path.join(directory, _BATCH_PATTERN.format(pid=pid, stamp=time.time_ns()))
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue  # another worker claimed it first
+        print(f"Replaying counter spool left by process {owner}: {os.path.basename(path)}")
+        batches.append(claimed)
+    return batches
+
+
+def _read_batch(path):
+    """(compare increments per bike id, click rows) from a batch file.
+
+    Lines that aren't a complete, well-formed event are skipped: one bad line
+    must not fail the whole batch, or it would be retried forever.
+    """
+    compares = Counter()
+    clicks = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # partial last line from a crash
+            if not isinstance(event, dict):
+                continue
+            try:
+                if event.get('e') == 'compare':
+                    compares[event['bike_id']] += 1
+                elif event.get('e') == 'click':
+                    clicks.append({
+                        'bike_id': event['bike_id'],
+                        'importer': event.get('importer'),
+                        'created_at': datetime.fromisoformat(event['at']),
+                    })
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping malformed counter event in {os.path.basename(path)}: {e!r}")
+    return compares, clicks
+
+
+def _upsert_compare_counts(increments):
+    """Add ``{bike_id: n}`` to compare_counts in one statement per chunk."""
+    dialect = db.engine.dialect.name
+    rows = [{'bike_id': bike_id, 'count': n} for bike_id, n in increments.items()]
+    for start in range(0, len(rows), _UPSERT_BATCH):
+        chunk = rows[start:start + _UPSERT_BATCH]
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+            statement = mysql_insert(CompareCount).values(chunk)
+            statement = statement.on_duplicate_key_update(count=CompareCount.count + statement.inserted.count)
+        elif dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as upsert_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as upsert_insert
+            statement = upsert_insert(CompareCount).values(chunk)
+            statement = statement.on_conflict_do_update(
+                index_elements=[CompareCount.bike_id],
+                set_={'count': CompareCount.count + statement.excluded.count},
+            )
+        else:
+            for row in chunk:
+                updated = db.session.query(CompareCount).filter_by(bike_id=row['bike_id']) \
+                    .update({CompareCount.count: CompareCount.count + row['count']})
+                if not updated:
+                    db.session.add(CompareCount(**row))
+            continue
+        db.session.execute(statement)
+
+
+def _write_batch(compares, clicks):
+    """Write one batch in a single transaction.
+
+    Returns ``(compare increments written, clicks written, new counts of the compared bikes)``.
+    """
+    bike_ids = set(compares) | {click['bike_id'] for click in clicks}
+    # Bikes deleted since the event was spooled would fail the foreign keys
+    existing = set()
+    if bike_ids:
+        existing = {bike_id for (bike_id,) in db.session.query(Bike.id).filter(Bike.id.in_(list(bike_ids)))}
+    compares = Counter({bike_id: n for bike_id, n in compares.items() if bike_id in existing})
+    clicks = [click for click in clicks if click['bike_id'] in existing]
+
+    if compares:
+        _upsert_compare_counts(compares)
+    if clicks:
+        db.session.execute(insert(PurchaseClick), clicks)
+    db.session.commit()
+
+    counts = {}
+    if compares:
+        counts = dict(db.session.query(CompareCount.bike_id, CompareCount.count)
+                      .filter(CompareCount.bike_id.in_(list(compares))).all())
+    return sum(compares.values()), len(clicks), counts
+
+
+def flush_counters(app=None):
+    """Write every pending batch to the database. Must run inside an app context.
+
+    Returns ``(compare increments, clicks)`` written.
+    """
+    from app.services.home_service import note_compare_count
+
+    directory = _spool_dir(app)
+    if not os.path.isdir(directory):
+        return 0, 0
+
+    written = [0, 0]
+    with _flush_lock:
+        _rotate_spool(directory)
+        for path in _claim_batches(directory):
+            try:
+                compares, clicks = _read_batch(path)
+                compares_written, clicks_written, counts = _write_batch(compares, clicks)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error flushing counters from {os.path.basename(path)} (will retry): {e}")
+                continue
+            os.remove(path)
+            written[0] += compares_written
+            written[1] += clicks_written
+            for bike_id, count in counts.items():
+                note_compare_count(bike_id, count)
+    return tuple(written)
+
+
+def start_counter_flusher(app):
+    """Start this worker's flush thread (once per process).
+
+    Called by ``create_app``, so a worker also replays the spools of dead
+    workers before it records anything itself.
+    """
+    if _state['pid'] == os.getpid():
+        return
+    with _lock:
+        if _state['pid'] == os.getpid():
+            return
+        interval = app.config.get('COUNTER_FLUSH_SECONDS', 5)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    with app.app_context():
+                        flush_counters(app)
+                except Exception as e:
+                    print(f"Error in counter flush thread: {e}")
+
+        def flush_at_exit():
+            try:
+                with app.app_context():
+                    flush_counters(app)
+            except Exception as e:
+                print(f"Error flushing counters at exit (spool kept for replay): {e}")
+
+        thread = threading.Thread(target=run, name='counter-flusher', daemon=True)
+        thread.start()
+        atexit.register(flush_at_exit)
+        _state['flusher'] = thread
+        _state['pid'] = os.getpid()
@@ -0,0 +1,65 @@
+"""
+Data version counters used as cache validators.
+
+``catalog`` is bumped whenever bike data is re-migrated (the catalog snapshot
+rebuild), ``content`` whenever an admin edits blog posts or guides,
+``top_compared`` whenever the homepage's "most compared" carousel changes
+(``home_service.note_compare_count``). Readers
+get the current value from the shared cache, so checking a version on a hot
+request path does not touch the database.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+from app.extensions import cache, db
+from app.models import DataVersion
+
+CATALOG = 'catalog'
+CONTENT = 'content'
+TOP_COMPARED = 'top_compared'
+
+_CACHE_PREFIX = 'dataversion:'
+# Safety net for per-process cache backends, where a bump made by another
+# process (e.g. the migration script) can't reach this worker's cache.
+_CACHE_SECONDS = 60
+
+Version = namedtuple('Version', ['version', 'updated_at'])
+
+_EPOCH = datetime(2000, 1, 1)
+
+
+def get_data_version(name):
+    """Current ``Version(version, updated_at)`` for a scope (0 / epoch if never bumped)."""
+    key = _CACHE_PREFIX + name
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        row = db.session.get(DataVersion, name)
+        current = Version(row.version, row.updated_at) if row else Version(0, _EPOCH)
+    except Exception as e:
+        print(f"Error loading data version '{name}': {e}")
+        return Version(0, _EPOCH)
+    cache.set(key, current, timeout=_CACHE_SECONDS)
+    return current
+
+
+def bump_data_version(name):
+    """Increment a scope's version (commits on its own). Returns the new Version."""
+    try:
+        row = db.session.get(DataVersion, name)
+        if row is None:
+            row = DataVersion(name=name, version=0)
+            db.session.add(row)
+        row.version = (row.version or 0) + 1
+        row.updated_at = datetime.utcnow().replace(microsecond=0)
+        db.session.commit()
+        current = Version(row.version, row.updated_at)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error bumping data version '{name}': {e}")
+        cache.delete(_CACHE_PREFIX + name)
+        return None
+    cache.set(_CACHE_PREFIX + name, current, timeout=_CACHE_SECONDS)
+    return current
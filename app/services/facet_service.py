@@ -0,0 +1,119 @@
+"""
+Facet counts for the catalog filters.
+
+One grouped SELECT over ``bike_catalog_rows`` yields every facet (brand,
+sub-category, style, wheel size, frame material, motor brand, year) with a
+per-value bike count, for a category or any /api/filter_bikes filter set.
+
+Only the base facets - a category and at most one sub-category - are cached
+(invalidated with the catalog). Free text and ranges would create an
+unbounded number of keys and crowd the tag versions out of the shared cache,
+so filter sets with them are computed on each request.
+"""
+
+from collections import Counter
+
+from sqlalchemy import func
+
+from app.models import BikeCatalogRow
+from app.services.catalog_service import ensure_catalog_snapshot, filtered_catalog_query
+from app.utils.cache_tags import tagged_memoize, category_tag, CATALOG_TAG
+
+FACET_COLUMNS = (
+    ('brands', BikeCatalogRow.brand),
+    ('sub_categories', BikeCatalogRow.sub_category),
+    ('styles', BikeCatalogRow.style),
+    ('wheel_sizes', BikeCatalogRow.wheel_size),
+    ('frame_materials', BikeCatalogRow.frame_material),
+    ('motor_brands', BikeCatalogRow.motor_brand),
+    ('years', BikeCatalogRow.year),
+)
+
+# Placeholder values the filter UI never offers
+_IGNORED_VALUES = (None, '', 'unknown')
+
+# Kids wheel sizes always offered in the filter, even if no bike has them yet
+STANDARD_KIDS_WHEEL_SIZES = (12, 14, 16, 18, 20, 24, 26)
+
+
+def _sort_key(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _normalize_filters(filters):
+    """Hashable, order-independent form of a filter dict (empty filters dropped)."""
+    normalized = []
+    for name, value in sorted((filters or {}).items()):
+        if value in (None, '', [], False):
+            continue
+        normalized.append((name, tuple(value) if isinstance(value, list) else value))
+    return tuple(normalized)
+
+
+def _facet_tags(normalized):
+    category = dict(normalized).get('category')
+    return [CATALOG_TAG, category_tag(category)] if category else [CATALOG_TAG]
+
+
+def _is_base_filter_set(normalized):
+    """True for a category and / or a single sub-category - a small, bounded key space."""
+    names = dict(normalized)
+    if set(names) - {'category', 'sub_categories'}:
+        return False
+    return len(names.get('sub_categories', ())) <= 1
+
+
+def _compute_facets(normalized):
+    ensure_catalog_snapshot()
+    filters = {name: list(value) if isinstance(value, tuple) else value for name, value in normalized}
+    columns = [column for _, column in FACET_COLUMNS]
+    rows = filtered_catalog_query(
+        filters, columns=columns + [func.count(BikeCatalogRow.bike_id)]
+    ).group_by(*columns).all()
+
+    counts = {name: Counter() for name, _ in FACET_COLUMNS}
+    total = 0
+    for row in rows:
+        bike_count = row[-1]
+        total += bike_count
+        for index, (name, _) in enumerate(FACET_COLUMNS):
+            if row[index] not in _IGNORED_VALUES:
+                counts[name][row[index]] += bike_count
+
+    facets = {
+        name: [{'value': value, 'count': count}
+               for value, count in sorted(counter.items(), key=lambda item: _sort_key(item[0]))]
+        for name, counter in counts.items()
+    }
+    facets['total'] = total
+    return facets
+
+
+_cached_facets = tagged_memoize(timeout=1800, tags=_facet_tags)(_compute_facets)
+
+
+def get_facets(filters=None):
+    """All facets with counts for bikes matching ``filters`` (see parse_catalog_filters).
+
+    Returns ``{'brands': [{'value': ..., 'count': n}, ...], ..., 'total': n}``.
+    """
+    try:
+        normalized = _normalize_filters(filters)
+        if _is_base_filter_set(normalized):
+            return _cached_facets(normalized)
+        return _compute_facets(normalized)
+    except Exception as e:
+        print(f"Error computing facets: {e}")
+        return {name: [] for name, _ in FACET_COLUMNS} | {'total': 0}
+
+
+def facet_values(facets, name):
+    """Just the values of one facet, in display order."""
+    return [entry['value'] for entry in facets.get(name, [])]
+
+
+def wheel_size_options(facets, category):
+    """Wheel-size filter options: kids only, always including the standard sizes."""
+    if category != 'kids':
+        return []
+    return sorted(set(facet_values(facets, 'wheel_sizes')) | set(STANDARD_KIDS_WHEEL_SIZES))
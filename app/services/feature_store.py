@@ -0,0 +1,231 @@
+"""
+Numeric feature store over the catalog.
+
+One row per bike, held as NumPy column arrays: prices (original, discounted,
+current, discount %), wh, fork mm, wheel size, year, plus integer codes for
+category, sub-category, brand, style, frame material and motor brand. The
+columns are read from ``bike_catalog_rows``, which the snapshot rebuild
+fills from ``bike_specs_std`` / ``bike_specs_raw`` in one pass, so nothing
+here re-parses spec strings.
+
+Filtering (``mask``), sorting (``order``) and the similar-bikes build work
+on whole columns at once. The store is persisted as
+``catalog-features-v<N>.npz`` (N = catalog data version) in
+``FEATURE_STORE_DIR``. Each worker keeps the current version in memory and
+reloads it when the catalog version changes.
+
+Unknown numbers are NaN and unknown labels are code -1.
+"""
+
+import glob
+import os
+import threading
+
+import numpy as np
+from flask import current_app
+
+from app.extensions import db
+from app.models import BikeCatalogRow
+from app.services.data_version import get_data_version, CATALOG
+from app.utils.helpers import parse_price
+
+NUMERIC_COLUMNS = ('price', 'disc_price', 'price_value', 'discount_pct', 'wh', 'fork_mm', 'wheel_size', 'year')
+CODE_COLUMNS = ('category', 'sub_category', 'brand', 'style', 'frame_material', 'motor_brand')
+
+_FILE_PATTERN = 'catalog-features-v{version}.npz'
+
+
+def _numbers(values):
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def _encode(values):
+    """(codes, labels): labels in first-seen order; None / '' map to -1."""
+    lookup = {}
+    codes = np.array([lookup.setdefault(value, len(lookup)) if value else -1 for value in values], dtype=np.int32)
+    return codes, np.array(list(lookup), dtype=str)
+
+
+class FeatureStore:
+    """Column arrays for every bike in the catalog snapshot, in bike id order."""
+
+    def __init__(self, arrays):
+        self.ids = arrays['ids']
+        self.numeric = {name: arrays[name] for name in NUMERIC_COLUMNS}
+        self.codes = {name: arrays[name] for name in CODE_COLUMNS}
+        self.labels = {name: arrays[name + '_labels'] for name in CODE_COLUMNS}
+        self.has_discount = arrays['has_discount']
+        self.search_text = arrays['search_text']  # lowercased "model\nbrand"
+
+    def __len__(self):
+        return len(self.ids)
+
+    def arrays(self):
+        data = {'ids': self.ids, 'has_discount': self.has_discount, 'search_text': self.search_text}
+        data.update(self.numeric)
+        data.update(self.codes)
+        data.update({name + '_labels': labels for name, labels in self.labels.items()})
+        return data
+
+    def code_in(self, name, values):
+        """Mask of rows whose ``name`` label is one of ``values``."""
+        wanted = np.flatnonzero(np.isin(self.labels[name], list(values)))
+        return np.isin(self.codes[name], wanted)
+
+    def _range(self, name, low, high, zero_is_unknown=False):
+        column = self.numeric[name]
+        unknown = np.isnan(column)
+        if zero_is_unknown:
+            unknown |= column == 0
+        inside = np.ones(len(column), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if low is not None:
+                inside &= column >= low
+            if high is not None:
+                inside &= column <= high
+        return unknown | inside
+
+    def mask(self, filters):
+        """Boolean mask for a ``parse_catalog_filters`` dict.
+
+        Same semantics as ``catalog_service.filtered_catalog_query``: unknown
+        price, battery, fork, year and frame material pass, while brand,
+        motor brand, style, sub-category and discount must match.
+        """
+        from app.services.catalog_service import expand_sub_categories
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        if filters.get('q'):
+            mask &= np.char.find(self.search_text, filters['q'].lower()) >= 0
+        if filters.get('years'):
+            year = self.numeric['year']
+            mask &= np.isnan(year) | np.isin(year, filters['years'])
+        if filters.get('brands'):
+            mask &= self.code_in('brand', filters['brands'])
+        if filters.get('min_price') is not None or filters.get('max_price') is not None:
+            mask &= self._range('price_value', filters.get('min_price'), filters.get('max_price'))
+        if filters.get('min_battery') is not None or filters.get('max_battery') is not None:
+            mask &= self._range('wh', filters.get('min_battery'), filters.get('max_battery'), zero_is_unknown=True)
+        if filters.get('min_fork') is not None or filters.get('max_fork') is not None:
+            mask &= self._range('fork_mm', filters.get('min_fork'), filters.get('max_fork'), zero_is_unknown=True)
+        if filters.get('frame_material'):
+            mask &= (self.codes['frame_material'] < 0) | self.code_in('frame_material', [filters['frame_material']])
+        if filters.get('motor_brands'):
+            mask &= self.code_in('motor_brand', filters['motor_brands'])
+        if filters.get('has_discount'):
+            mask &= self.has_discount
+        if filters.get('sub_categories'):
+            mask &= self.code_in('sub_category', expand_sub_categories(filters['sub_categories']))
+        if filters.get('styles'):
+            mask &= self.code_in('style', filters['styles'])
+        if filters.get('category'):
+            mask &= self.code_in('category', [filters['category']])
+        return mask
+
+    def sort_key(self, name, descending):
+        """Integer sort key for a numeric column, unknowns pushed to the end (as in SQL)."""
+        column = self.numeric[name]
+        sentinel = -1 if descending else 2147483647
+        return np.where(np.isnan(column), sentinel, column).astype(np.int64)
+
+    def order(self, mask, key, descending):
+        """Row indexes of ``mask`` sorted by ``key`` (asc/desc), ties by bike id."""
+        rows = np.flatnonzero(mask)
+        # rows are already in bike id order, so a stable sort keeps id ties ascending
+        order = np.argsort(-key[rows] if descending else key[rows], kind='stable')
+        return rows[order]
+
+
+def build_feature_store():
+    """Read the catalog snapshot into a new FeatureStore. Must run inside an app context."""
+    C = BikeCatalogRow
+    rows = db.session.query(
+        C.bike_id, C.price, C.disc_price, C.price_value, C.wh, C.fork_mm, C.wheel_size, C.year,
+        C.category, C.sub_category, C.brand, C.style, C.frame_material, C.motor_brand, C.model,
+    ).order_by(C.bike_id).all()
+
+    columns = list(zip(*rows)) if rows else [()] * 15
+    (ids, price, disc_price, price_value, wh, fork_mm, wheel_size, year,
+     category, sub_category, brand, style, frame_material, motor_brand, model) = columns
+
+    arrays = {
+        'ids': np.array(ids, dtype=np.int64),
+        'price': _numbers(parse_price(value) for value in price),
+        'disc_price': _numbers(parse_price(value) for value in disc_price),
+        'price_value': _numbers(price_value),
+        'wh': _numbers(wh),
+        'fork_mm': _numbers(fork_mm),
+        'wheel_size': _numbers(wheel_size),
+        'year': _numbers(year),
+        'has_discount': np.array([bool(value) for value in disc_price], dtype=bool),
+        'search_text': np.array([f"{m or ''}\n{b or ''}".lower() for m, b in zip(model, brand)], dtype=str),
+    }
+    original, discounted = arrays['price'], arrays['disc_price']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discounted_rows = (original > 0) & (discounted > 0) & (discounted < original)
+        arrays['discount_pct'] = np.where(discounted_rows, (original - discounted) / original * 100, 0.0)
+    for name, values in zip(CODE_COLUMNS, (category, sub_category, brand, style, frame_material, motor_brand)):
+        arrays[name], arrays[name + '_labels'] = _encode(values)
+    return FeatureStore(arrays)
+
+
+def _store_dir():
+    return current_app.config.get('FEATURE_STORE_DIR') or current_app.config['CACHE_DIR']
+
+
+def save_feature_store(store, version):
+    """Write ``store`` as the .npz for catalog ``version`` and remove older files."""
+    directory = _store_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _FILE_PATTERN.format(version=version))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **store.arrays())
+    os.replace(tmp_path, path)  # atomic: workers never read a half-written file
+
+    for old in glob.glob(os.path.join(directory, _FILE_PATTERN.format(version='*'))):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+def _load(version):
+    path = os.path.join(_store_dir(), _FILE_PATTERN.format(version=version))
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return FeatureStore({name: data[name] for name in data.files})
+
+
+_current = {'version': None, 'store': None}
+_store_lock = threading.Lock()
+
+
+def get_feature_store():
+    """This worker's FeatureStore for the current catalog version.
+
+    Loads the persisted .npz, or builds it from the snapshot (and saves it)
+    if no worker has done so for this version yet.
+    """
+    version = get_data_version(CATALOG).version
+    if _current['version'] == version:
+        return _current['store']
+    with _store_lock:
+        if _current['version'] != version:
+            store = None
+            try:
+                store = _load(version)
+            except Exception as e:
+                print(f"Error loading feature store v{version}: {e}")
+            if store is None:
+                store = build_feature_store()
+                try:
+                    save_feature_store(store, version)
+                except Exception as e:
+                    print(f"Error saving feature store v{version}: {e}")
+            _current['store'] = store
+            _current['version'] = version
+    return _current['store']
@@ -0,0 +1,90 @@
+"""
+Homepage data.
+
+``get_home_stats`` reads the bike / source / comparison counters in one
+round trip. ``get_top_compared`` is the "most compared" carousel as a small
+cached projection of ``bike_catalog_rows`` - only the fields the carousel
+renders. It refreshes every few minutes, or right away when a compare pushes
+a bike that isn't shown past the carousel's lowest count
+(``note_compare_count``), which also bumps the ``top_compared`` data version
+so the cached homepage is rendered again.
+"""
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Bike, BikeCatalogRow, CompareCount, Comparison, Source
+from app.services.catalog_service import ensure_catalog_snapshot
+from app.services.data_version import bump_data_version, TOP_COMPARED
+from app.utils.cache_tags import tagged_memoize, invalidate_tags, CATALOG_TAG, TOP_COMPARED_TAG
+
+TOP_COMPARED_LIMIT = 10
+
+_CAROUSEL_COLUMNS = (
+    BikeCatalogRow.bike_id, BikeCatalogRow.public_id, BikeCatalogRow.brand, BikeCatalogRow.model,
+    BikeCatalogRow.image_url, BikeCatalogRow.price, BikeCatalogRow.disc_price,
+)
+
+
+def get_home_stats():
+    """``{'bikes_count', 'sources_count', 'total_comparisons'}`` from a single SELECT."""
+    bikes_count, sources_count, total_comparisons = db.session.execute(select(
+        select(func.count(Bike.id)).scalar_subquery(),
+        select(func.count(Source.id)).scalar_subquery(),
+        select(func.count(Comparison.id)).scalar_subquery(),
+    )).one()
+    return {
+        'bikes_count': bikes_count,
+        'sources_count': sources_count,
+        'total_comparisons': total_comparisons,
+    }
+
+
+def _carousel_item(row):
+    return {
+        'id': row.public_id,
+        'brand': row.brand,
+        'model': row.model,
+        'image_url': row.image_url,
+        'price': row.price,
+        'disc_price': row.disc_price,
+    }
+
+
+@tagged_memoize(timeout=600, tags=[CATALOG_TAG, TOP_COMPARED_TAG])  # 10 minutes
+def get_top_compared(limit=TOP_COMPARED_LIMIT):
+    """Most compared bikes, padded with the first catalog bikes when there are too few.
+
+    Returns ``{'bikes': [carousel dicts], 'ids': [bike ids], 'min_count': n}``;
+    ``min_count`` is the lowest compare count shown (0 when padded).
+    """
+    ensure_catalog_snapshot()
+    rows = db.session.query(*_CAROUSEL_COLUMNS, CompareCount.count).join(
+        CompareCount, CompareCount.bike_id == BikeCatalogRow.bike_id
+    ).order_by(CompareCount.count.desc(), BikeCatalogRow.bike_id).limit(limit).all()
+
+    ids = [row.bike_id for row in rows]
+    bikes = [_carousel_item(row) for row in rows]
+    min_count = rows[-1].count if len(rows) == limit else 0
+
+    if len(rows) < limit:
+        padding = db.session.query(*_CAROUSEL_COLUMNS)
+        if ids:
+            padding = padding.filter(BikeCatalogRow.bike_id.notin_(ids))
+        for row in padding.order_by(BikeCatalogRow.bike_id).limit(limit - len(rows)).all():
+            ids.append(row.bike_id)
+            bikes.append(_carousel_item(row))
+
+    return {'bikes': bikes, 'ids': ids, 'min_count': min_count}
+
+
+def note_compare_count(bike_id, count):
+    """Refresh the carousel if a bike that isn't shown now out-ranks the last one shown."""
+    try:
+        top = get_top_compared()
+        if bike_id not in top['ids'] and count > top['min_count']:
+            invalidate_tags(TOP_COMPARED_TAG)
+            # The homepage is page-cached on this version; the tag alone wouldn't reach it
+            bump_data_version(TOP_COMPARED)
+    except Exception as e:
+        print(f"Error checking top compared bikes: {e}")
@@ -0,0 +1,174 @@
+"""
+Precomputed similar-bikes index.
+
+``/similar_bikes/<id>`` used to load every bike of the category, serialize it
+and score it in Python on each request. The scores only depend on catalog
+data, so we compute every bike's top-K neighbours once per catalog rebuild
+(vectorized with NumPy over the feature store columns) and store them
+in ``bike_similar``; the endpoint then reads K ids by primary key.
+
+Score (lower is more similar), against bikes of the same category:
+    0.7  * relative price distance (candidates outside ±50% are excluded)
+    0.3  * sub_category mismatch
+    0.1  * relative battery (wh) distance, capped at 1
+    0.05 * frame material / motor brand / wheel size mismatch (each)
+Unknown values never count as a mismatch. Ties keep bike id order.
+"""
+
+import threading
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import BikeSimilar
+from app.services.feature_store import build_feature_store
+
+# Neighbours kept per bike (the carousel shows 9, 3 at a time)
+SIMILAR_BIKES_K = 9
+
+PRICE_WEIGHT = 0.7
+SUB_CATEGORY_WEIGHT = 0.3
+WH_WEIGHT = 0.1
+FRAME_WEIGHT = 0.05
+MOTOR_WEIGHT = 0.05
+WHEEL_WEIGHT = 0.05
+
+# Candidates must be priced within this band around the bike's own price
+PRICE_BAND = (0.5, 1.5)
+
+# Query rows scored per block; bounds the score matrix to _BLOCK x category size
+_BLOCK = 512
+
+_INSERT_BATCH = 5000
+
+
+def _unknown_zero(values):
+    """Copy of a feature column with 0 treated as unknown (NaN)."""
+    return np.where(values == 0, np.nan, values)
+
+
+def _columns(store):
+    return {
+        'ids': store.ids,
+        'category': store.codes['category'],
+        'sub_category': store.codes['sub_category'],
+        'price': _unknown_zero(store.numeric['price_value']),
+        'wh': _unknown_zero(store.numeric['wh']),
+        'frame': store.codes['frame_material'],
+        'motor': store.codes['motor_brand'],
+        'wheel': _unknown_zero(store.numeric['wheel_size']),
+    }
+
+
+def _mismatch(query, candidates):
+    """1.0 where both values are known and differ, else 0.0."""
+    q = query[:, None]
+    c = candidates[None, :]
+    return ((q >= 0) & (c >= 0) & (q != c)).astype(np.float64)
+
+
+def _score_block(cols, query, candidates):
+    """Score matrix (len(query) x len(candidates)); +inf marks excluded pairs."""
+    price_q = cols['price'][query][:, None]
+    price_c = cols['price'][candidates][None, :]
+    priced = ~np.isnan(price_q)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price_term = np.where(priced, np.abs(price_c - price_q) / price_q, 0.0)
+        in_band = (price_c >= price_q * PRICE_BAND[0]) & (price_c <= price_q * PRICE_BAND[1])
+        valid = ~priced | in_band  # NaN candidate prices fail the band check
+
+        wh_q = cols['wh'][query][:, None]
+        wh_c = cols['wh'][candidates][None, :]
+        wh_term = np.nan_to_num(np.minimum(np.abs(wh_c - wh_q) / wh_q, 1.0), nan=0.0)
+
+        wheel_q = cols['wheel'][query][:, None]
+        wheel_c = cols['wheel'][candidates][None, :]
+        wheel_term = (wheel_q != wheel_c) & ~np.isnan(wheel_q) & ~np.isnan(wheel_c)
+
+    sub_q = cols['sub_category'][query][:, None]
+    sub_match = (sub_q >= 0) & (sub_q == cols['sub_category'][candidates][None, :])
+
+    valid &= cols['ids'][query][:, None] != cols['ids'][candidates][None, :]
+
+    score = price_term * PRICE_WEIGHT + (~sub_match) * SUB_CATEGORY_WEIGHT
+    score = score + wh_term * WH_WEIGHT
+    score = score + _mismatch(cols['frame'][query], cols['frame'][candidates]) * FRAME_WEIGHT
+    score = score + _mismatch(cols['motor'][query], cols['motor'][candidates]) * MOTOR_WEIGHT
+    score = score + wheel_term * WHEEL_WEIGHT
+    score[~valid] = np.inf
+    return score
+
+
+def _neighbours(cols, query, candidates, k):
+    """Yield (bike_id, rank, similar_bike_id, score) for every bike in ``query``."""
+    for start in range(0, len(query), _BLOCK):
+        block = query[start:start + _BLOCK]
+        score = _score_block(cols, block, candidates)
+        order = np.argsort(score, axis=1, kind='stable')[:, :k]
+        top = np.take_along_axis(score, order, axis=1)
+        for row, bike_index in enumerate(block):
+            bike_id = int(cols['ids'][bike_index])
+            for rank in range(order.shape[1]):
+                if not np.isfinite(top[row, rank]):
+                    break
+                yield bike_id, rank, int(cols['ids'][candidates[order[row, rank]]]), float(top[row, rank])
+
+
+def rebuild_similar_index(store=None, k=SIMILAR_BIKES_K):
+    """Recompute ``bike_similar`` from the catalog features. Must run inside an app context.
+
+    Bikes are compared within their category; bikes without a category are
+    compared against the whole catalog. Returns the number of rows written.
+    """
+    if store is None:
+        store = build_feature_store()
+    cols = _columns(store)
+    rows = []
+    if len(store):
+        everyone = np.arange(len(cols['ids']))
+        categories = cols['category']
+        for code in np.unique(categories):
+            members = np.flatnonzero(categories == code)
+            candidates = everyone if code < 0 else members
+            rows.extend(
+                {'bike_id': bike_id, 'rank': rank, 'similar_bike_id': similar_id, 'score': score}
+                for bike_id, rank, similar_id, score in _neighbours(cols, members, candidates, k)
+            )
+
+    try:
+        db.session.query(BikeSimilar).delete()
+        for start in range(0, len(rows), _INSERT_BATCH):
+            db.session.execute(insert(BikeSimilar), rows[start:start + _INSERT_BATCH])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def similar_index_built():
+    """True once ``rebuild_similar_index`` has written any rows."""
+    return db.session.query(BikeSimilar.bike_id).first() is not None
+
+
+_index_lock = threading.Lock()
+
+
+def ensure_similar_index():
+    """Build the index on first use if the catalog rebuild hasn't done it yet."""
+    if similar_index_built():
+        return
+    with _index_lock:
+        if not similar_index_built():
+            print("bike_similar is empty - building similar-bikes index on demand")
+            rebuild_similar_index()
+
+
+def similar_bike_ids(bike_id, limit=SIMILAR_BIKES_K):
+    """Ids of the most similar bikes to ``bike_id`` (internal id), best first."""
+    rows = db.session.query(BikeSimilar.similar_bike_id).filter(
+        BikeSimilar.bike_id == bike_id
+    ).order_by(BikeSimilar.rank).limit(limit).all()
+    return [similar_id for (similar_id,) in rows]
@@ -0,0 +1,204 @@
+"""
+Sitemap index plus per-type sitemaps.
+
+``/sitemap.xml`` is a sitemap index that points at one or more sitemaps per
+type. Each sitemap holds at most ``SITEMAP_MAX_URLS`` URLs:
+
+    /sitemap-pages-1.xml         home, categories, list pages
+    /sitemap-bikes-<n>.xml       bike pages
+    /sitemap-blog-<n>.xml        published blog posts
+    /sitemap-comparisons-<n>.xml shared AI comparisons
+
+The rows are read with column-only SELECTs (no blog ``content``, no
+comparison JSON) and the XML is streamed. Each rendered part is cached under
+a watermark of its table: row count plus max(updated_at / created_at / id).
+A part is therefore regenerated only when its rows change.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from flask import request, url_for
+from sqlalchemy import func
+
+from app.extensions import cache, db
+from app.models import Bike, BlogPost, Comparison
+
+# Sitemap protocol limit per file
+SITEMAP_MAX_URLS = 50000
+
+SITEMAP_TYPES = ('pages', 'bikes', 'blog', 'comparisons')
+
+# Rendered parts are keyed on the watermark, so this only bounds cache size
+_PART_CACHE_SECONDS = 24 * 3600
+# Watermarks are re-read at most this often (crawlers fetch every part at once)
+_WATERMARK_CACHE_SECONDS = 60
+
+# URLs rendered per streamed chunk
+_CHUNK_URLS = 500
+
+VALID_CATEGORIES = ['electric', 'mtb', 'kids', 'city', 'road', 'gravel']
+
+_URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = '</urlset>\n'
+
+
+def _ten_days_ago():
+    return (datetime.now() - timedelta(days=10)).date().isoformat()
+
+
+def _lastmod(*candidates, default):
+    for value in candidates:
+        if value:
+            return value.date().isoformat()
+    return default
+
+
+def _url_xml(loc, lastmod, priority):
+    return f'\t<url>\n\t\t<loc>{escape(loc)}</loc>\n\t\t<lastmod>{lastmod}</lastmod>\n\t\t<priority>{priority}</priority>\n\t</url>\n'
+
+
+def _watermark_row(kind):
+    """Row count and change markers for one sitemap type (one aggregate query)."""
+    if kind == 'pages':
+        # Static pages: lastmod is relative to today, so the day is the watermark
+        return 1, datetime.now().date()
+    if kind == 'bikes':
+        return db.session.query(func.count(Bike.id), func.max(Bike.updated_at), func.max(Bike.created_at)).one()
+    if kind == 'blog':
+        return db.session.query(
+            func.count(BlogPost.id), func.max(BlogPost.updated_at), func.max(BlogPost.created_at)
+        ).filter(BlogPost.is_published.is_(True)).one()
+    if kind == 'comparisons':
+        return db.session.query(
+            func.count(Comparison.id), func.max(Comparison.id), func.max(Comparison.created_at)
+        ).filter(Comparison.slug.isnot(None), Comparison.slug != '').one()
+    raise ValueError(f"Unknown sitemap type '{kind}'")
+
+
+def sitemap_watermark(kind):
+    """``(url_count, watermark, lastmod)`` for a sitemap type, cached briefly."""
+    key = f'sitemap:watermark:{kind}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    row = tuple(_watermark_row(kind))
+    count = row[0] or 0
+    watermark = hashlib.sha1(repr(row).encode('utf-8')).hexdigest()[:16]
+    dates = [value for value in row[1:] if isinstance(value, datetime)]
+    lastmod = max(dates).date().isoformat() if dates else datetime.now().date().isoformat()
+    result = (count, watermark, lastmod)
+    cache.set(key, result, timeout=_WATERMARK_CACHE_SECONDS)
+    return result
+
+
+def sitemap_page_count(kind):
+    count = sitemap_watermark(kind)[0]
+    return (count + SITEMAP_MAX_URLS - 1) // SITEMAP_MAX_URLS
+
+
+def _static_urls():
+    ten_days_ago = _ten_days_ago()
+    yield url_for('main.home', _external=True), ten_days_ago, '1.0'
+    yield url_for('main.categories', _external=True), ten_days_ago, '0.9'
+    yield url_for('bikes.bikes', _external=True), ten_days_ago, '0.8'
+    yield url_for('blog.blog_list', _external=True), ten_days_ago, '0.8'
+    # Category pages (e.g., /electric, /mtb, /gravel)
+    for category in VALID_CATEGORIES:
+        yield url_for('bikes.category_bikes', category=category, _external=True), ten_days_ago, '0.9'
+    yield url_for('main.electric_subcategories', _external=True), ten_days_ago, '0.85'
+    yield url_for('main.mtb_subcategories', _external=True), ten_days_ago, '0.85'
+
+
+def _page_rows(query, id_column, page):
+    return query.order_by(id_column).offset((page - 1) * SITEMAP_MAX_URLS).limit(SITEMAP_MAX_URLS) \
+        .execution_options(yield_per=1000)
+
+
+def _bike_urls(page):
+    ten_days_ago = _ten_days_ago()
+    rows = _page_rows(db.session.query(Bike.slug, Bike.uuid, Bike.updated_at, Bike.created_at), Bike.id, page)
+    for slug, uuid, updated_at, created_at in rows:
+        # Prefer slugs for SEO, fall back to UUID
+        yield (url_for('bikes.bike_detail', bike_id=slug if slug else uuid, _external=True),
+               _lastmod(updated_at, created_at, default=ten_days_ago), '0.5')
+
+
+def _blog_urls(page):
+    ten_days_ago = _ten_days_ago()
+    query = db.session.query(BlogPost.slug, BlogPost.updated_at, BlogPost.created_at) \
+        .filter(BlogPost.is_published.is_(True))
+    for slug, updated_at, created_at in _page_rows(query, BlogPost.id, page):
+        yield (url_for('blog.blog_post', slug=slug, _external=True),
+               _lastmod(updated_at, created_at, default=ten_days_ago), '0.6')
+
+
+def _comparison_urls(page):
+    ten_days_ago = _ten_days_ago()
+    query = db.session.query(Comparison.slug, Comparison.created_at) \
+        .filter(Comparison.slug.isnot(None), Comparison.slug != '')
+    for slug, created_at in _page_rows(query, Comparison.id, page):
+        yield (url_for('compare.view_comparison', slug=slug, _external=True),
+               _lastmod(created_at, default=ten_days_ago), '0.7')
+
+
+_URL_SOURCES = {
+    'pages': lambda page: _static_urls(),
+    'bikes': _bike_urls,
+    'blog': _blog_urls,
+    'comparisons': _comparison_urls,
+}
+
+
+def _render_urlset(kind, page):
+    yield _URLSET_OPEN
+    chunk = []
+    for loc, lastmod, priority in _URL_SOURCES[kind](page):
+        chunk.append(_url_xml(loc, lastmod, priority))
+        if len(chunk) >= _CHUNK_URLS:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+    yield _URLSET_CLOSE
+
+
+def render_sitemap_part(kind, page):
+    """XML for one sitemap part: a cached string, or a generator that caches when done.
+
+    Returns None for unknown types or pages past the end.
+    """
+    if kind not in SITEMAP_TYPES or page < 1 or page > max(sitemap_page_count(kind), 1):
+        return None
+    watermark = sitemap_watermark(kind)[1]
+    # Absolute URLs depend on the host the crawler used
+    key = f'sitemap:part:{kind}:{page}:{watermark}:{request.host_url}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def stream():
+        parts = []
+        for text in _render_urlset(kind, page):
+            parts.append(text)
+            yield text
+        cache.set(key, ''.join(parts), timeout=_PART_CACHE_SECONDS)
+
+    return stream()
+
+
+def sitemap_index():
+    """Sitemap index XML listing every non-empty part."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for kind in SITEMAP_TYPES:
+        lastmod = sitemap_watermark(kind)[2]
+        for page in range(1, sitemap_page_count(kind) + 1):
+            loc = url_for('main.sitemap_part', kind=kind, page=page, _external=True)
+            lines.append(f'\t<sitemap>\n\t\t<loc>{escape(loc)}</loc>\n\t\t<lastmod>{lastmod}</lastmod>\n\t</sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    return ''.join(lines)
@@ -0,0 +1,122 @@
+"""
+Short-lived cross-worker locks that really expire.
+
+``cache.add(key, ..., timeout=n)`` is not a lock on the default
+``FileSystemCache``: ``add`` only checks whether the file exists, not whether
+it has expired (and not atomically), so a lock left by a worker that died
+mid-compute is never released. These locks are:
+
+    - Redis backend (``CACHE_REDIS_URL``): ``SET key token NX PX timeout``
+      (expired by Redis), released with an atomic compare-and-delete script;
+    - otherwise: a file created with ``O_CREAT | O_EXCL`` under
+      ``CACHE_DIR/locks``; a lock file older than its timeout is broken by
+      the next caller.
+
+``acquire_lock`` returns a token (or None if the lock is held);
+``release_lock`` only removes the lock if it still holds that token.
+"""
+
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+from flask import current_app
+
+# Delete the lock only if it still holds our token, in one step: a GET then DEL
+# could delete a lock that expired and was taken by another worker in between.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_redis_clients = {}
+_redis_lock = threading.Lock()
+
+
+def _redis_client():
+    """(Redis client, key prefix) when the cache runs on Redis, else (None, '').
+
+    The client is our own, built from ``CACHE_REDIS_URL`` (the cache backend
+    doesn't expose its client publicly); one per URL per process.
+    """
+    config = current_app.config
+    url = config.get('CACHE_REDIS_URL')
+    if not url or config.get('CACHE_TYPE') != 'RedisCache':
+        return None, ''
+    with _redis_lock:
+        if url not in _redis_clients:
+            import redis
+            _redis_clients[url] = redis.Redis.from_url(url)
+    return _redis_clients[url], config.get('CACHE_KEY_PREFIX') or ''
+
+
+def _lock_path(name):
+    directory = os.path.join(current_app.config.get('CACHE_DIR') or tempfile.gettempdir(), 'locks')
+    os.makedirs(directory, exist_ok=True)
+    # Names are cache keys (may contain ':' and '/'); hex keeps them filesystem-safe
+    return os.path.join(directory, name.encode('utf-8').hex()[:200] + '.lock')
+
+
+def _read_token(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def acquire_lock(name, timeout):
+    """Take the lock ``name`` for at most ``timeout`` seconds; returns a token or None."""
+    token = secrets.token_hex(8)
+    client, prefix = _redis_client()
+    if client is not None:
+        return token if client.set(f'{prefix}lock:{name}', token, nx=True, px=int(timeout * 1000)) else None
+
+    path = _lock_path(name)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                expired = os.path.getmtime(path) < time.time() - timeout
+            except OSError:
+                continue  # released meanwhile; try again
+            if not expired:
+                return None
+            # Left by a holder that died (or overran): break it, unless someone else just did
+            stale = f'{path}.{token}.stale'
+            try:
+                os.rename(path, stale)
+            except OSError:
+                return None
+            if os.path.getmtime(stale) >= time.time() - timeout:
+                # We raced another breaker and moved its fresh lock: put it back
+                os.replace(stale, path)
+                return None
+            os.remove(stale)
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+        return token
+    return None
+
+
+def release_lock(name, token):
+    """Release the lock ``name`` if ``token`` still holds it."""
+    if token is None:
+        return
+    client, prefix = _redis_client()
+    if client is not None:
+        client.eval(_RELEASE_SCRIPT, 1, f'{prefix}lock:{name}', token)
+        return
+
+    path = _lock_path(name)
+    if _read_token(path) == token:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,171 @@
+"""
+Tag-based invalidation on top of the shared flask-caching backend.
+
+Each tag (``catalog``, ``brands``, ``category:electric``, ``top_compared``) has a
+version token stored in the cache itself. Cache keys produced by
+``tagged_memoize`` embed the current versions of their tags, so bumping a tag
+with ``invalidate_tags`` orphans every entry that carried it - in every worker,
+because the versions live in the shared backend. Orphaned entries simply
+expire with their timeout.
+
+``tagged_memoize`` also keeps expiry boundaries from stampeding the database
+pool: one caller recomputes (single-flight, stale-while-revalidate, with a
+probabilistic early refresh) while the others are served the previous value.
+"""
+
+import functools
+import hashlib
+import math
+import random
+import time
+
+from app.extensions import cache
+from app.utils.cache_lock import acquire_lock, release_lock
+
+# Applied to everything derived from the bike catalog; a migration bumps it.
+CATALOG_TAG = 'catalog'
+BRANDS_TAG = 'brands'
+# Homepage top-compared carousel; bumped when compare counts reshuffle it.
+TOP_COMPARED_TAG = 'top_compared'
+
+_TAG_PREFIX = 'tagver:'
+
+
+def category_tag(category):
+    return f'category:{category}'
+
+
+def _new_version():
+    return format(time.time_ns(), 'x')
+
+
+def tag_versions(tags):
+    """Current version token for each tag, creating missing ones."""
+    keys = [_TAG_PREFIX + tag for tag in tags]
+    versions = cache.get_many(*keys) if keys else []
+    result = []
+    for key, version in zip(keys, versions):
+        if version is None:
+            # A missing version (never set, or evicted) must never match an
+            # older key, so start from a fresh token rather than a constant.
+            cache.add(key, _new_version(), timeout=0)
+            version = cache.get(key)
+        result.append(version)
+    return result
+
+
+def invalidate_tags(*tags):
+    """Invalidate every cached entry carrying any of ``tags`` (across workers)."""
+    if tags:
+        cache.set_many({_TAG_PREFIX + tag: _new_version() for tag in tags}, timeout=0)
+
+
+def _store(key, value, started, timeout, stale_ttl):
+    """Cache ``value`` with its soft expiry and how long it took to compute."""
+    now = time.time()
+    entry = (value, now + timeout, now - started)
+    cache.set(key, entry, timeout=timeout + stale_ttl)
+
+
+def _should_refresh(expires_at, compute_seconds, beta):
+    """Probabilistic early refresh ("XFetch"): the closer to expiry and the more
+    expensive the value, the likelier one reader refreshes it ahead of time."""
+    jitter = -compute_seconds * beta * math.log(max(random.random(), 1e-12))
+    return time.time() + jitter >= expires_at
+
+
+def tagged_memoize(timeout, tags, stale_ttl=None, lock_timeout=30, beta=1.0):
+    """Like ``cache.memoize`` but keyed on tag versions, with stampede protection.
+
+    ``tags`` is a list of tag names or a callable receiving the function's
+    arguments and returning one. ``None`` results are not cached.
+
+    Entries stay in the backend for ``timeout + stale_ttl`` seconds. Once past
+    ``timeout`` (or chosen for early refresh), a single caller - across threads
+    and workers, via ``cache_lock`` (expires after ``lock_timeout`` even if its
+    holder dies) - recomputes while everyone else keeps getting the stale
+    value. On a cold miss the other callers wait for the lock holder instead
+    of all hitting the database.
+
+    Batch callers can use ``func.get_many(arg_tuples)`` (cached values or
+    None, one backend round-trip) and ``func.store(value, *args)`` to fill
+    the misses they computed together.
+    """
+    if stale_ttl is None:
+        stale_ttl = timeout
+
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def _compute_and_store(key, args, kwargs):
+            started = time.time()
+            value = func(*args, **kwargs)
+            if value is not None:
+                _store(key, value, started, timeout, stale_ttl)
+            return value
+
+        def _key(args, kwargs, versions=None):
+            if versions is None:
+                versions = tag_versions(tags(*args, **kwargs) if callable(tags) else tags)
+            arg_hash = hashlib.sha1(repr((args, sorted(kwargs.items()))).encode('utf-8')).hexdigest()
+            return f'memo:{name}:{arg_hash}:' + '.'.join(versions)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _key(args, kwargs)
+
+            entry = cache.get(key)
+            if entry is not None:
+                value, expires_at, compute_seconds = entry
+                if not _should_refresh(expires_at, compute_seconds, beta):
+                    return value
+                # Stale or due for early refresh: one caller recomputes,
+                # the rest serve what we have.
+                token = acquire_lock(key, lock_timeout)
+                if token is None:
+                    return value
+                try:
+                    return _compute_and_store(key, args, kwargs)
+                except Exception as e:
+                    print(f"Error refreshing {name}, serving stale value: {e}")
+                    return value
+                finally:
+                    release_lock(key, token)
+
+            # Cold miss: wait for whoever holds the lock rather than piling on.
+            deadline = time.time() + lock_timeout
+            token = acquire_lock(key, lock_timeout)
+            while token is None:
+                if time.time() >= deadline:
+                    # Holder is stuck; compute (and store) ourselves
+                    return _compute_and_store(key, args, kwargs)
+                time.sleep(0.05)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry[0]
+                token = acquire_lock(key, lock_timeout)
+            try:
+                entry = cache.get(key)  # Filled while we were acquiring the lock
+                if entry is not None:
+                    return entry[0]
+                return _compute_and_store(key, args, kwargs)
+            finally:
+                release_lock(key, token)
+
+        def get_many(calls):
+            """Cached value (stale included) or None for each tuple of positional args."""
+            # Fixed tags: read their versions once for the whole batch
+            versions = None if callable(tags) else tag_versions(tags)
+            keys = [_key(tuple(args), {}, versions) for args in calls]
+            entries = cache.get_many(*keys) if keys else []
+            return [entry[0] if entry is not None else None for entry in entries]
+
+        def store(value, *args):
+            if value is not None:
+                _store(_key(args, {}), value, time.time(), timeout, stale_ttl)
+
+        wrapper.uncached = func
+        wrapper.get_many = get_many
+        wrapper.store = store
+        return wrapper
+    return decorator
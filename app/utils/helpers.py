@@ -1,6 +1,8 @@
 import os
 from functools import lru_cache
 
+from app.utils.spec_translations import translate_spec_key
+
 
 @lru_cache(maxsize=64)
 def _read_static_file_cached(static_root: str, relpath: str, mtime: float) -> str:
@@ -111,6 +113,32 @@ def parse_price(price_str):
     except (ValueError, TypeError):
         return None
 
+# Standardized specs that also get a typed spec_numeric value (spec_name -> unit)
+NUMERIC_SPEC_UNITS = {
+    'wh': 'Wh',
+    'fork_length': 'mm',
+    'wheel_size': 'inch',
+    'weight': 'kg',
+}
+
+def parse_spec_numeric(value):
+    """Extract the first number from a spec value ("23,8 kg" -> 23.8, "29'" -> 29.0).
+
+    Returns None when the value has no number in it.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    import re
+    match = re.search(r'\d+(?:[.,]\d+)?', str(value))
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(',', '.'))
+    except ValueError:
+        return None
+
 def get_frame_material(bike):
     """
     Determine frame material from bike data.
@@ -157,172 +185,9 @@ def get_motor_brand(bike):
 def translate_spec_key_to_hebrew(key):
     """
     Translate English spec key to Hebrew for display.
-    Based on the translation dictionary used in bikes.js
+    Uses the shared registry in app.utils.spec_translations (also served to bikes.js)
     """
-    # Comprehensive translation dictionary (English -> Hebrew)
-    translations = {
-        'brand': 'מותג',
-        'model': 'דגם',
-        'year': 'שנה',
-        'bike_type': 'סוג אופניים',
-        'bike_series': 'סדרה',
-        'price': 'מחיר',
-        'disc_price': 'מחיר מבצע',
-        'motor': 'מנוע',
-        'battery': 'סוללה',
-        'wh': '(WH) סוללה',
-        'fork': 'בולם קדמי',
-        'rear_shock': 'בולם אחורי',
-        'shock': 'בולם',
-        'frame': 'שלדה',
-        'tires': 'צמיגים',
-        'brakes': 'בלמים',
-        'weight': 'משקל',
-        'wheel_size': 'גודל גלגלים',
-        'sub_category': 'סוג אופניים',
-        'size': 'מידה',
-        'sizes': 'מידות',
-        'sku': 'מק"ט',
-        'gear_count': 'מספר הילוכים',
-        'number_of_gears': 'מספר הילוכים',
-        'front_brake': 'ברקס קידמי',
-        'rear_brake': 'ברקס אחורי',
-        'front_tire': 'צמיג קדמי',
-        'rear_tire': 'צמיג אחורי',
-        'saddle': 'אוכף',
-        'pedals': 'דוושות',
-        'charger': 'מטען',
-        'screen': 'מסך',
-        'extras': 'תוספות',
-        'additionals': 'תוספות',
-        'rear_der': 'מעביר אחורי',
-        'shifter': 'שיפטר',
-        'shifters': 'שיפטרים',
-        'crank_set': 'קראנק',
-        'crankset': 'קראנק',
-        'crank': 'קראנק',
-        'chain': 'שרשרת',
-        'chainring': 'גלגל שיניים',
-        'chainset': 'קראנק',
-        'chainstay': 'זרוע אחורית',
-        'cassette': 'קסטה',
-        'rotors': 'רוטורים',
-        'rotor': 'רוטור',
-        'handlebar': 'כידון',
-        'handelbar': 'כידון',
-        'bar': 'כידון',
-        'seat_post': 'מוט אוכף',
-        'seatpost': 'מוט אוכף',
-        'seatpost_clamp': 'מהדק מוט אוכף',
-        'stem': 'סטם',
-        'lights': 'תאורה',
-        'lighting': 'תאורה',
-        'wheels': 'גלגלים',
-        'wheelset': 'סט גלגלים',
-        'wheelbase': 'בסיס גלגלים',
-        'rims': 'חישוקים',
-        'spokes': 'חישורים',
-        'front_hub': 'ציר קדמי',
-        'rear_hub': 'ציר אחורי',
-        'hub': 'רכזת',
-        'hubs': 'רכזות',
-        'headset': 'הד סט',
-        'head_tube': 'צינור היגוי',
-        'remote': 'שלט',
-        'fork_length': 'אורך בולמים',
-        'chain_guide': 'מדריך שרשרת',
-        'chainguide': 'מדריך שרשרת',
-        'tubes': 'פנימיות',
-        'front_wheel': 'גלגל קדמי',
-        'rear_wheel': 'גלגל אחורי',
-        'rear_derailleur': 'מעביר אחורי',
-        'rear derailleur': 'מעביר אחורי',
-        'front_derailleur': 'מעביר קדמי',
-        'front derailleur': 'מעביר קדמי',
-        'derailleur': 'מעביר',
-        'mech': 'מעביר',
-        'bb': 'בראקט תחתון',
-        'bottom_bracket': 'בראקט תחתון',
-        'battery_capacity': 'קיבולת סוללה',
-        'front_wheel_size': 'גודל גלגל קדמי',
-        'rear_wheel_size': 'גודל גלגל אחורי',
-        'battery_watts_per_hour': 'סוללה (WH)',
-        'rear_wheel_maxtravel': 'מהלך מקסימלי אחורי',
-        'brake_lever': 'ידית בלם',
-        'brake_levers': 'ידיות בלם',
-        'brake levers': 'ידיות בלם',
-        'clamp': 'מהדק',
-        'seat_clamp': 'מהדק אוכף',
-        'front_axle': 'ציר קדמי',
-        'rear_axle': 'ציר אחורי',
-        'axle': 'ציר',
-        'category': 'קטגוריה',
-        'style': 'סגנון',
-        'suspension': 'מתלה',
-        'groupset': 'קבוצת העברה',
-        'drivetrain': 'מערכת הינע',
-        'display': 'תצוגה',
-        'controller': 'בקר',
-        'control_system': 'מערכת בקרה',
-        'accessories': 'אביזרים',
-        'grips': 'גריפים',
-        'grip': 'גריפ',
-        'seat': 'אוכף',
-        'tire': 'צמיג',
-        'tyres': 'צמיגים',
-        'valve': 'ונטיל',
-        'speed': 'מהירות',
-        'speeds': 'הילוכים',
-        'gears': 'הילוכים',
-        'color': 'צבע',
-        'colours': 'צבעים',
-        'colors': 'צבעים',
-        'material': 'חומר',
-        'travel': 'מהלך',
-        'trail': 'טרייל',
-        'seat angle': 'זווית אוכף',
-        'bottom bracket drop': 'ירידת בראקט',
-        'front guide': 'מדריך קדמי',
-        'diameter': 'קוטר',
-        'width': 'רוחב',
-        'length': 'אורך',
-        'height': 'גובה',
-        'angle': 'זווית',
-        'reach': 'ריץ\'',
-        'stack': 'סטאק',
-        'range': 'טווח',
-        'torque': 'מומנט',
-        'power': 'עוצמה',
-        'voltage': 'מתח',
-        'amperage': 'עוצמת זרם',
-        'charge_time': 'זמן טעינה',
-        'charging_time': 'זמן טעינה',
-        'rim_tape': 'סרט חישוק',
-        'handlebar_tape': 'סרט כידון',
-        'drive_system': 'מערכת הינע',
-        'finish_color': 'גימור / צבע',
-        'max_weight': 'משקל מקסימלי',
-        'weight_limit': 'מגבלת משקל',
-    }
-    
-    # Normalize key: lowercase and replace underscores/spaces
-    normalized_key = key.lower().strip().replace('_', ' ').replace('-', ' ')
-    
-    # Try exact match first
-    if key in translations:
-        return translations[key]
-    
-    # Try normalized match
-    if normalized_key in translations:
-        return translations[normalized_key]
-    
-    # Try matching with spaces replaced by underscores
-    key_with_underscores = normalized_key.replace(' ', '_')
-    if key_with_underscores in translations:
-        return translations[key_with_underscores]
-    
-    # If no translation found, return original key (might already be in Hebrew)
-    return key
+    return translate_spec_key(key)
 
 def generate_slug_from_title(title):
     """Generate SEO-friendly slug from title (English only)
@@ -0,0 +1,121 @@
+"""
+Incremental parsing of a JSON object that arrives in pieces (a streamed completion).
+
+``JsonFieldStream`` is fed text chunks and reports each top-level field of the
+object as soon as its value is complete, and each element of a top-level array
+as soon as that element is complete, without re-parsing the text received so
+far. For ``{"intro": "...", "bikes": [{...}, {...}], "expert_tip": "..."}`` it
+yields, in order::
+
+    ('field', 'intro', '...')
+    ('item', 'bikes', 0, {...})
+    ('item', 'bikes', 1, {...})
+    ('field', 'expert_tip', '...')
+
+Top-level arrays are reported only through their items. Anything before the
+first ``{`` (e.g. a markdown fence) is skipped; a value that doesn't parse is
+skipped, so the caller should still parse the full text at the end.
+"""
+
+import json
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonFieldStream:
+    """Feed text with ``feed(chunk)``; each call returns the events completed by that chunk."""
+
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._started = False
+        self._stack = []  # containers: {'array': bool, 'key': str, 'index': int, 'expect_key': bool}
+        self._in_string = False
+        self._escape = False
+        self._token_start = None  # start of the string / number / literal being read
+        self._string_is_key = False
+        self._container_starts = []
+
+    def feed(self, chunk):
+        self.text += chunk
+        events = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._open(i, array=False)
+                continue
+            if not self._stack:
+                break  # root object closed; ignore trailing text
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        try:
+                            self._stack[-1]['key'] = json.loads(text[self._token_start:i + 1])
+                        except ValueError:
+                            self._stack[-1]['key'] = None
+                        self._stack[-1]['expect_key'] = False
+                    else:
+                        self._complete(self._token_start, i + 1, events)
+                    self._token_start = None
+                continue
+
+            if self._token_start is not None and (char in _WHITESPACE or char in ',]}'):
+                # End of a number / true / false / null
+                self._complete(self._token_start, i, events)
+                self._token_start = None
+
+            if char == '"':
+                self._in_string = True
+                self._token_start = i
+                top = self._stack[-1]
+                self._string_is_key = not top['array'] and top['expect_key']
+            elif char in '{[':
+                self._open(i, array=char == '[')
+            elif char in '}]':
+                start = self._container_starts.pop()
+                self._stack.pop()
+                if self._stack:
+                    self._complete(start, i + 1, events)
+            elif char == ',':
+                top = self._stack[-1]
+                if top['array']:
+                    top['index'] += 1
+                else:
+                    top['expect_key'] = True
+            elif char not in _WHITESPACE and char != ':' and self._token_start is None:
+                self._token_start = i
+        self._pos = len(text)
+        return events
+
+    def _open(self, index, array):
+        self._stack.append({'array': array, 'key': None, 'index': 0, 'expect_key': not array})
+        self._container_starts.append(index)
+
+    def _complete(self, start, end, events):
+        """A value spanning ``text[start:end]`` just finished inside ``self._stack[-1]``."""
+        depth = len(self._stack)
+        if depth == 1:
+            if self._stack[0]['array']:
+                return
+            key = self._stack[0]['key']
+            if self.text[start] == '[':
+                return  # reported item by item
+            kind = ('field', key)
+        elif depth == 2 and not self._stack[0]['array'] and self._stack[1]['array']:
+            kind = ('item', self._stack[0]['key'], self._stack[1]['index'])
+        else:
+            return
+        try:
+            value = json.loads(self.text[start:end])
+        except ValueError:
+            return
+        events.append(kind + (value,))
@@ -0,0 +1,97 @@
+"""
+Rendered-page cache for catalog and content pages.
+
+``cached_page`` stores the rendered HTML keyed on host + path + normalized
+query string + the data versions the page depends on + whether the visitor
+has answered the cookie-consent modal (``layout.html`` only renders the modal
+and its CSS without the consent cookie), and answers If-None-Match with 304
+before the view runs - no database query, no Jinja. If-Modified-Since alone
+is not enough for a 304: Last-Modified only moves with the data, while the
+ETag also changes with the time bucket (compare counts, CSRF token expiry).
+
+Pages that embed a CSRF token are cached with a placeholder that is replaced
+by the visitor's own token on the way out. The token is tied to the session,
+so the session's CSRF secret is part of the ETag and responses are
+``Cache-Control: private``.
+"""
+
+import functools
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from flask import current_app, g, make_response, request, session
+from flask_wtf.csrf import generate_csrf
+
+from app.extensions import cache
+from app.services.data_version import get_data_version
+
+_CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF_TOKEN__'
+# Set by the consent modal; layout.html checks it to decide whether to render the modal
+_CONSENT_COOKIE = 'rideal_cookie_consent'
+
+
+def _page_key(scopes, timeout):
+    """(cache key base, Last-Modified) for the current request."""
+    versions = [(scope, get_data_version(scope)) for scope in scopes]
+    # Pages also show time-dependent data (compare counts) and carry CSRF
+    # tokens that expire, so every entry/ETag lives at most one ``timeout``.
+    bucket = int(time.time() // timeout)
+    # Only a data change moves Last-Modified; the time bucket is in the key / ETag
+    last_modified = max(v.updated_at for _, v in versions).replace(microsecond=0)
+
+    query = urlencode(sorted(request.args.items(multi=True)))
+    consent = '1' if request.cookies.get(_CONSENT_COOKIE) else '0'
+    base = '|'.join([
+        request.host, request.path, query,
+        ','.join(f'{scope}:{v.version}' for scope, v in versions),
+        current_app.config.get('VERSION', ''), str(bucket), f'consent:{consent}',
+    ])
+    return base, last_modified
+
+
+def _not_modified(etag):
+    return bool(request.if_none_match) and request.if_none_match.contains(etag)
+
+
+def _finish(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def cached_page(*scopes, timeout=1800):
+    """Cache a GET view's rendered HTML per data version of ``scopes``."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or current_app.debug:
+                return view(*args, **kwargs)
+
+            base, last_modified = _page_key(scopes, timeout)
+            etag = hashlib.sha1(f"{base}|{session.get('csrf_token', '')}".encode('utf-8')).hexdigest()
+            if _not_modified(etag):
+                return _finish(current_app.response_class(status=304), etag, last_modified)
+
+            key = 'page:' + hashlib.sha1(base.encode('utf-8')).hexdigest()
+            body = cache.get(key)
+            if body is not None:
+                if _CSRF_PLACEHOLDER in body:
+                    body = body.replace(_CSRF_PLACEHOLDER, generate_csrf())
+                response = current_app.response_class(body, mimetype='text/html')
+                return _finish(response, etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.mimetype != 'text/html':
+                return response
+            body = response.get_data(as_text=True)
+            token = g.get('csrf_token')  # set by flask_wtf if the template called csrf_token()
+            cache.set(key, body.replace(token, _CSRF_PLACEHOLDER) if token else body, timeout=timeout)
+            # The session may have just received its CSRF secret while rendering
+            etag = hashlib.sha1(f"{base}|{session.get('csrf_token', '')}".encode('utf-8')).hexdigest()
+            return _finish(response, etag, last_modified)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,205 @@
+"""
+Spec-key translation registry (English spec key -> Hebrew display label).
+
+The single source for spec labels: the Python side looks keys up through
+``translate_spec_key``, and ``static/data/spec_translations.json`` - generated
+from this module by ``scripts/generate_spec_translations.py`` - carries the
+same table to ``static/js/bikes.js``. Lookups are normalized (case, spaces,
+underscores, hyphens), so ``Rear-Derailleur``, ``rear_derailleur`` and
+``rear derailleur`` all match.
+
+After editing ``SPEC_KEY_TRANSLATIONS``, regenerate the JSON asset; its URL
+carries ``SPEC_TRANSLATIONS_VERSION`` so browsers pick up the new file.
+"""
+
+import hashlib
+import json
+import os
+from types import MappingProxyType
+
+SPEC_TRANSLATIONS_ASSET = 'data/spec_translations.json'  # relative to static/
+
+SPEC_KEY_TRANSLATIONS = MappingProxyType({
+    'brand': 'מותג',
+    'model': 'דגם',
+    'year': 'שנה',
+    'bike_type': 'סוג אופניים',
+    'bike_series': 'סדרה',
+    'price': 'מחיר',
+    'disc_price': 'מחיר מבצע',
+    'motor': 'מנוע',
+    'battery': 'סוללה',
+    'wh': '(WH) סוללה',
+    'fork': 'בולם קדמי',
+    'rear_shock': 'בולם אחורי',
+    'shock': 'בולם',
+    'frame': 'שלדה',
+    'tires': 'צמיגים',
+    'brakes': 'בלמים',
+    'weight': 'משקל',
+    'wheel_size': 'גודל גלגלים',
+    'sub_category': 'סוג אופניים',
+    'size': 'מידה',
+    'sizes': 'מידות',
+    'sku': 'מק"ט',
+    'gear_count': 'מספר הילוכים',
+    'number_of_gears': 'מספר הילוכים',
+    'front_brake': 'ברקס קידמי',
+    'rear_brake': 'ברקס אחורי',
+    'front_tire': 'צמיג קדמי',
+    'rear_tire': 'צמיג אחורי',
+    'saddle': 'אוכף',
+    'pedals': 'דוושות',
+    'charger': 'מטען',
+    'screen': 'מסך',
+    'extras': 'תוספות',
+    'additionals': 'תוספות',
+    'rear_der': 'מעביר אחורי',
+    'shifter': 'שיפטר',
+    'shifters': 'שיפטרים',
+    'crank_set': 'קראנק',
+    'crankset': 'קראנק',
+    'crank': 'קראנק',
+    'chain': 'שרשרת',
+    'chainring': 'גלגל שיניים',
+    'chainset': 'קראנק',
+    'chainstay': 'זרוע אחורית',
+    'cassette': 'קסטה',
+    'rotors': 'רוטורים',
+    'rotor': 'רוטור',
+    'handlebar': 'כידון',
+    'handelbar': 'כידון',
+    'bar': 'כידון',
+    'seat_post': 'מוט אוכף',
+    'seatpost': 'מוט אוכף',
+    'seatpost_clamp': 'מהדק מוט אוכף',
+    'stem': 'סטם',
+    'lights': 'תאורה',
+    'lighting': 'תאורה',
+    'wheels': 'גלגלים',
+    'wheelset': 'סט גלגלים',
+    'wheelbase': 'בסיס גלגלים',
+    'rims': 'חישוקים',
+    'spokes': 'חישורים',
+    'front_hub': 'ציר קדמי',
+    'rear_hub': 'ציר אחורי',
+    'hub': 'רכזת',
+    'hubs': 'רכזות',
+    'headset': 'הד סט',
+    'head_tube': 'צינור היגוי',
+    'remote': 'שלט',
+    'fork_length': 'אורך בולמים',
+    'chain_guide': 'מדריך שרשרת',
+    'chainguide': 'מדריך שרשרת',
+    'tubes': 'פנימיות',
+    'front_wheel': 'גלגל קדמי',
+    'rear_wheel': 'גלגל אחורי',
+    'rear_derailleur': 'מעביר אחורי',
+    'rear derailleur': 'מעביר אחורי',
+    'front_derailleur': 'מעביר קדמי',
+    'front derailleur': 'מעביר קדמי',
+    'derailleur': 'מעביר',
+    'mech': 'מעביר',
+    'bb': 'בראקט תחתון',
+    'bottom_bracket': 'בראקט תחתון',
+    'battery_capacity': 'קיבולת סוללה',
+    'front_wheel_size': 'גודל גלגל קדמי',
+    'rear_wheel_size': 'גודל גלגל אחורי',
+    'battery_watts_per_hour': 'סוללה (WH)',
+    'rear_wheel_maxtravel': 'מהלך מקסימלי אחורי',
+    'brake_lever': 'ידית בלם',
+    'brake_levers': 'ידיות בלם',
+    'brake levers': 'ידיות בלם',
+    'clamp': 'מהדק',
+    'seat_clamp': 'מהדק אוכף',
+    'front_axle': 'ציר קדמי',
+    'rear_axle': 'ציר אחורי',
+    'axle': 'ציר',
+    'category': 'קטגוריה',
+    'style': 'סגנון',
+    'suspension': 'מתלה',
+    'groupset': 'קבוצת העברה',
+    'drivetrain': 'מערכת הינע',
+    'display': 'תצוגה',
+    'controller': 'בקר',
+    'control_system': 'מערכת בקרה',
+    'accessories': 'אביזרים',
+    'grips': 'גריפים',
+    'grip': 'גריפ',
+    'seat': 'אוכף',
+    'tire': 'צמיג',
+    'tyres': 'צמיגים',
+    'valve': 'ונטיל',
+    'speed': 'מהירות',
+    'speeds': 'הילוכים',
+    'gears': 'הילוכים',
+    'color': 'צבע',
+    'colours': 'צבעים',
+    'colors': 'צבעים',
+    'material': 'חומר',
+    'travel': 'מהלך',
+    'trail': 'טרייל',
+    'seat angle': 'זווית אוכף',
+    'bottom bracket drop': 'ירידת בראקט',
+    'front guide': 'מדריך קדמי',
+    'diameter': 'קוטר',
+    'width': 'רוחב',
+    'length': 'אורך',
+    'height': 'גובה',
+    'angle': 'זווית',
+    'reach': 'ריץ\'',
+    'stack': 'סטאק',
+    'range': 'טווח',
+    'torque': 'מומנט',
+    'power': 'עוצמה',
+    'voltage': 'מתח',
+    'amperage': 'עוצמת זרם',
+    'charge_time': 'זמן טעינה',
+    'charging_time': 'זמן טעינה',
+    'rim_tape': 'סרט חישוק',
+    'handlebar_tape': 'סרט כידון',
+    'drive_system': 'מערכת הינע',
+    'finish_color': 'גימור / צבע',
+    'max_weight': 'משקל מקסימלי',
+    'weight_limit': 'מגבלת משקל',
+})
+
+
+def normalize_spec_key(key):
+    """Lowercase, treat ``_`` / ``-`` as spaces and collapse whitespace."""
+    return ' '.join(str(key).lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def _normalized_table():
+    table = {}
+    for key, label in SPEC_KEY_TRANSLATIONS.items():
+        table.setdefault(normalize_spec_key(key), label)
+    return MappingProxyType(dict(sorted(table.items())))
+
+
+# normalized key -> label; built once at import
+NORMALIZED_SPEC_TRANSLATIONS = _normalized_table()
+
+SPEC_TRANSLATIONS_VERSION = hashlib.sha1(
+    json.dumps(dict(NORMALIZED_SPEC_TRANSLATIONS), ensure_ascii=False, sort_keys=True).encode('utf-8')
+).hexdigest()[:12]
+
+
+def translate_spec_key(key):
+    """Hebrew label for a spec key, or the key itself (it may already be Hebrew)."""
+    return NORMALIZED_SPEC_TRANSLATIONS.get(normalize_spec_key(key), key)
+
+
+def spec_translations_payload():
+    """The JSON asset's content: ``{'version': ..., 'translations': {normalized key: label}}``."""
+    return {'version': SPEC_TRANSLATIONS_VERSION, 'translations': dict(NORMALIZED_SPEC_TRANSLATIONS)}
+
+
+def write_spec_translations_asset(static_folder):
+    """Write the JSON asset under ``static_folder``. Returns its path."""
+    path = os.path.join(static_folder, SPEC_TRANSLATIONS_ASSET)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(spec_translations_payload(), f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write('\n')
+    return path
@@ -0,0 +1,80 @@
+"""
+Benchmark: bulk columnar serializer vs. per-row Bike.to_dict
+
+Serializes the same bikes both ways (ORM joinedload + to_dict, and
+app.services.bike_serializer.serialize_bikes), checks the dicts are
+identical, and prints the per-bike cost of each path.
+
+    python scripts/benchmark_serializer.py [--limit 500] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.extensions import db
+from app.models import Bike, BikeListing
+from app.services.bike_serializer import serialize_bikes
+
+MODES = {
+    'full': dict(),
+    'list_view': dict(list_view=True, include_images=False),
+    'prices_only': dict(include_specs=False, include_images=False),
+}
+
+
+def orm_path(bike_ids, **kwargs):
+    bikes = db.session.query(Bike).options(
+        db.joinedload(Bike.brand),
+        db.joinedload(Bike.listings).joinedload(BikeListing.prices),
+        db.joinedload(Bike.listings).joinedload(BikeListing.raw_specs),
+        db.joinedload(Bike.images)
+    ).filter(Bike.id.in_(bike_ids)).all()
+    by_id = {bike.id: bike for bike in bikes}
+    return [by_id[bike_id].to_dict(**kwargs) for bike_id in bike_ids if bike_id in by_id]
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        db.session.expire_all()
+        db.session.expunge_all()  # Fresh identity map, like a new request
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bike serializers')
+    parser.add_argument('--limit', type=int, default=500, help='Number of bikes to serialize')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per path (best time is reported)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        bike_ids = [bike_id for (bike_id,) in db.session.query(Bike.id).order_by(Bike.id).limit(args.limit).all()]
+        if not bike_ids:
+            print("No bikes in the database - nothing to benchmark.")
+            return
+        print(f"Serializing {len(bike_ids)} bikes, best of {args.repeat} runs\n")
+        print(f"{'mode':<12} {'ORM to_dict':>14} {'bulk':>14} {'speedup':>9}  match")
+
+        for mode, kwargs in MODES.items():
+            orm_time, orm_result = timed(lambda: orm_path(bike_ids, **kwargs), args.repeat)
+            bulk_time, bulk_result = timed(lambda: serialize_bikes(bike_ids, **kwargs), args.repeat)
+            per_orm = orm_time / len(bike_ids) * 1e6
+            per_bulk = bulk_time / len(bike_ids) * 1e6
+            match = "✅" if orm_result == bulk_result else "❌"
+            print(f"{mode:<12} {per_orm:>10.1f} µs/bike {per_bulk:>7.1f} µs/bike {orm_time / bulk_time:>8.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ This script drops:
 - bike_specs_std
 - bike_images
 - bike_variants (per-color/size inventory; Pedalim-only today)
+- bike_catalog_rows (denormalized list-view snapshot; rebuilt by the migration)
 
 This script preserves:
 - users
@@ -34,7 +35,7 @@ from app import create_app
 from app.extensions import db
 from app.models import (
     User, Brand, Source, Bike, BikeListing, BikePrice,
-    BikeSpecRaw, BikeSpecStd, BikeImage, BikeVariant,
+    BikeSpecRaw, BikeSpecStd, BikeImage, BikeVariant, BikeCatalogRow,
     CompareCount, Comparison, PurchaseClick,
 )
 from sqlalchemy import text, inspect
@@ -48,6 +49,10 @@ def _bike_variants_table_exists():
     return "bike_variants" in inspect(db.engine).get_table_names()
 
 
+def _bike_catalog_rows_table_exists():
+    return "bike_catalog_rows" in inspect(db.engine).get_table_names()
+
+
 def get_table_counts(app):
     """Get current counts for all tables"""
     with app.app_context():
@@ -163,6 +168,17 @@ def drop_bike_data(app, dry_run=False):
                 print("      ⏭️  Table bike_variants does not exist (skipped)")
             db.session.flush()
 
+            # 2c. Delete bike_catalog_rows (list-view snapshot, FK checks are off)
+            print("   2c. Deleting catalog snapshot rows...")
+            if _bike_catalog_rows_table_exists():
+                deleted = BikeCatalogRow.query.delete()
+                deleted_counts['bike_catalog_rows'] = deleted
+                print(f"      ✅ Deleted {deleted} catalog snapshot rows")
+            else:
+                deleted_counts['bike_catalog_rows'] = 0
+                print("      ⏭️  Table bike_catalog_rows does not exist (skipped)")
+            db.session.flush()
+
             # 3. Delete bike_specs_std
             print("   3. Deleting standardized specs...")
             deleted = BikeSpecStd.query.delete()
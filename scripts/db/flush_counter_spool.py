@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Write spooled compare counts / purchase clicks to the database now.
+
+Workers flush their own spool every COUNTER_FLUSH_SECONDS and replay spools
+left by dead workers, so this is only needed when no worker is running (e.g.
+after a crash, before taking the host down):
+
+    python scripts/db/flush_counter_spool.py
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv  # noqa: E402
+from app import create_app  # noqa: E402
+from app.services.counter_buffer import flush_counters  # noqa: E402
+
+
+def main():
+    load_dotenv(override=True)
+    app = create_app()
+    with app.app_context():
+        compares, clicks = flush_counters()
+        print(f"Done: flushed {compares} compare increments and {clicks} purchase clicks "
+              f"from {app.config['COUNTER_SPOOL_DIR']}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ sys.path.insert(0, project_root)
 from dotenv import load_dotenv
 from app import create_app
 from app.extensions import db
+from app.utils.helpers import NUMERIC_SPEC_UNITS, parse_spec_numeric
 from app.models import (
     User, Brand, Source, Bike, BikeListing, BikePrice,
     BikeSpecRaw, BikeSpecStd, BikeImage, BikeVariant,
@@ -85,6 +86,38 @@ def add_performance_indexes(app):
         print(f"\n📊 Created {created_count} indexes, skipped {skipped_count}")
 
 
+def build_std_spec(bike_id, spec_name, value):
+    """Create a BikeSpecStd row, filling spec_numeric/spec_unit for numeric specs"""
+    spec_numeric = None
+    spec_unit = NUMERIC_SPEC_UNITS.get(spec_name)
+    if spec_unit:
+        numeric = parse_spec_numeric(value)
+        if numeric is not None and numeric < 10 ** 7:  # DECIMAL(10, 3)
+            spec_numeric = Decimal(str(round(numeric, 3)))
+    return BikeSpecStd(
+        bike_id=bike_id,
+        spec_name=spec_name,
+        spec_value=str(value),
+        spec_numeric=spec_numeric,
+        spec_unit=spec_unit if spec_numeric is not None else None,
+        updated_at=datetime.now(timezone.utc)
+    )
+
+
+def rebuild_catalog_snapshot(app):
+    """Rebuild bike_catalog_rows so list pages read the freshly migrated data"""
+    from app.services.catalog_service import ensure_catalog_table, rebuild_catalog_rows
+    with app.app_context():
+        try:
+            ensure_catalog_table()
+            row_count = rebuild_catalog_rows()
+            print(f"   ✅ Catalog snapshot rebuilt: {row_count} rows")
+        except Exception as e:
+            print(f"   ⚠️  Could not rebuild catalog snapshot: {e}")
+            import traceback
+            traceback.print_exc()
+
+
 def get_or_create_brand(brand_name, brand_cache):
     """Get or create a brand, using cache to avoid duplicates"""
     if not brand_name:
@@ -509,6 +542,7 @@ def migrate_json_data(app):
                             # Specs at root level (old format) - iterate over bike_data
                             spec_items = bike_data.items()
                         
+                        std_spec_names = set()
                         for json_key, value in spec_items:
                             # Skip non-spec fields
                             # Note: rewritten_description is now stored in bike.description, but we also store it in raw_specs for completeness
@@ -530,13 +564,16 @@ def migrate_json_data(app):
                                 
                                 # Add standardized spec (linked to bike, normalized for filtering)
                                 spec_name = json_key.lower().replace(' ', '_').replace('-', '_')
-                                spec = BikeSpecStd(
-                                    bike_id=bike.id,
-                                    spec_name=spec_name,
-                                    spec_value=str(value),
-                                    updated_at=datetime.now(timezone.utc)
-                                )
-                                db.session.add(spec)
+                                std_spec_names.add(spec_name)
+                                db.session.add(build_std_spec(bike.id, spec_name, value))
+                        
+                        # Root-level numeric fields (wh, fork length) are not display specs,
+                        # but the filter engine needs them as typed bike_specs_std values
+                        for json_key, spec_name in (('wh', 'wh'), ('fork length', 'fork_length')):
+                            value = bike_data.get(json_key)
+                            if spec_name not in std_spec_names and value is not None and str(value).strip():
+                                std_spec_names.add(spec_name)
+                                db.session.add(build_std_spec(bike.id, spec_name, value))
                         
                         # Add gallery images (already extracted above)
                         # Deduplicate URLs to avoid unique constraint violations
@@ -721,6 +758,12 @@ def main(force=False):
         print("=" * 60)
         add_performance_indexes(app)
         print("\n✅ Performance indexes created!")
+        
+        # Rebuild the denormalized list-view snapshot (bike_catalog_rows)
+        print("\n" + "=" * 60)
+        print("📦 Rebuilding Catalog Snapshot...")
+        print("=" * 60)
+        rebuild_catalog_snapshot(app)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Research the most-compared bikes ahead of time so AI comparisons start from the
+bike research store (app/services/bike_research.py) instead of the web.
+
+Bikes with a fresh store entry are skipped unless --refresh is given. Run from
+project root with OPENAI_API_KEY set, e.g. nightly:
+
+    python scripts/db/prefetch_bike_research.py --limit 200
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv  # noqa: E402
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Bike, CompareCount  # noqa: E402
+from app.services.ai_service import research_bikes  # noqa: E402
+from app.services.bike_loaders import bike_loader  # noqa: E402
+
+# Bikes researched together (one concurrent round of web lookups)
+BATCH_SIZE = 10
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Prefetch web research for the most-compared bikes')
+    parser.add_argument('--limit', type=int, default=100, help='Number of top-compared bikes (default: 100)')
+    parser.add_argument('--refresh', action='store_true', help='Research again even if a fresh entry exists')
+    args = parser.parse_args()
+
+    load_dotenv(override=True)
+    app = create_app()
+    with app.app_context():
+        bike_ids = [bike_id for (bike_id,) in db.session.query(CompareCount.bike_id)
+                    .order_by(CompareCount.count.desc()).limit(args.limit)]
+        bikes = db.session.query(Bike).options(*bike_loader('compare')).filter(Bike.id.in_(bike_ids)).all()
+        # Same dicts the comparison endpoints pass to the AI service
+        bike_dicts = [bike.to_dict() for bike in bikes]
+
+        found = 0
+        for start in range(0, len(bike_dicts), BATCH_SIZE):
+            batch = bike_dicts[start:start + BATCH_SIZE]
+            research = research_bikes(batch, refresh=args.refresh)
+            found += sum(1 for item in research if item["research"].get("answer"))
+            print(f"Researched {start + len(batch)}/{len(bike_dicts)} bikes")
+        print(f"Done: {found} of {len(bike_dicts)} top-compared bikes have research in the store.")
+
+
+if __name__ == "__main__":
+    main()
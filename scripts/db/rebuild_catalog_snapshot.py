@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Rebuild the bike_catalog_rows list-view snapshot (idempotent: creates the table if missing
+or recreates it when its columns are out of date).
+
+migrate_to_mysql.py already does this at the end of every import; run it by hand
+after editing bike data directly in the database:
+
+    python scripts/db/rebuild_catalog_snapshot.py
+"""
+
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv  # noqa: E402
+from app import create_app  # noqa: E402
+from app.services.catalog_service import ensure_catalog_table, rebuild_catalog_rows  # noqa: E402
+
+
+def main():
+    load_dotenv(override=True)
+    app = create_app()
+    with app.app_context():
+        if ensure_catalog_table():
+            print("Created bike_catalog_rows (table was missing or out of date).")
+        row_count = rebuild_catalog_rows()
+        print(f"Done: bike_catalog_rows rebuilt with {row_count} rows.")
+
+
+if __name__ == "__main__":
+    main()
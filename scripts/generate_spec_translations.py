@@ -0,0 +1,50 @@
+"""
+Generate static/data/spec_translations.json from app/utils/spec_translations.py
+
+bikes.js fetches this file (URL versioned with SPEC_TRANSLATIONS_VERSION) for
+its spec labels. Run after editing the translation registry:
+
+    python scripts/generate_spec_translations.py [--check]
+
+--check exits non-zero if the committed file is out of date.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.spec_translations import (
+    SPEC_TRANSLATIONS_ASSET, SPEC_TRANSLATIONS_VERSION, spec_translations_payload, write_spec_translations_asset
+)
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the spec translations JSON asset')
+    parser.add_argument('--check', action='store_true', help='Only verify the asset is up to date')
+    args = parser.parse_args()
+
+    if args.check:
+        path = os.path.join(STATIC_FOLDER, SPEC_TRANSLATIONS_ASSET)
+        try:
+            with open(path, encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+        if current != spec_translations_payload():
+            print(f"❌ {path} is out of date - run scripts/generate_spec_translations.py")
+            sys.exit(1)
+        print(f"✅ {path} is up to date (version {SPEC_TRANSLATIONS_VERSION})")
+        return
+
+    path = write_spec_translations_asset(STATIC_FOLDER)
+    print(f"✅ Wrote {path} (version {SPEC_TRANSLATIONS_VERSION})")
+
+
+if __name__ == "__main__":
+    main()
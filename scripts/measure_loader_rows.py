@@ -0,0 +1,108 @@
+"""
+Measure SQL statements and rows fetched: old joinedload chains vs. loader profiles
+
+For each profile in app/services/bike_loaders.py, loads the same bikes with
+the joinedload chain the routes used before and with the profile, then
+replays every SELECT that was issued to count the rows (and column values)
+the database sent back.
+
+    python scripts/measure_loader_rows.py [--limit 50]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models import Bike, BikeListing
+from app.services.bike_loaders import bike_loader
+
+# The option chains the routes used before the loader profiles
+LEGACY_OPTIONS = {
+    'list': lambda: [
+        db.joinedload(Bike.brand),
+        db.joinedload(Bike.listings).joinedload(BikeListing.prices),
+        db.joinedload(Bike.listings).joinedload(BikeListing.raw_specs),
+    ],
+    'detail': lambda: [
+        db.joinedload(Bike.brand),
+        db.joinedload(Bike.listings).joinedload(BikeListing.raw_specs),
+        db.joinedload(Bike.listings).joinedload(BikeListing.prices),
+        db.joinedload(Bike.images),
+        db.joinedload(Bike.variants),
+    ],
+    'compare': lambda: [
+        db.joinedload(Bike.brand),
+        db.joinedload(Bike.listings).joinedload(BikeListing.raw_specs),
+        db.joinedload(Bike.listings).joinedload(BikeListing.prices),
+        db.joinedload(Bike.images),
+    ],
+    'similar': lambda: [
+        db.joinedload(Bike.brand),
+        db.joinedload(Bike.listings).joinedload(BikeListing.prices),
+    ],
+}
+
+# What each profile's caller does with the loaded bikes
+CONSUMERS = {
+    'list': lambda bike: bike.to_dict(list_view=True, include_images=False),
+    'detail': lambda bike: (bike.to_dict(), bike.description, list(bike.variants)),
+    'compare': lambda bike: bike.to_dict(),
+    'similar': lambda bike: bike.to_dict(include_specs=False, include_images=False),
+}
+
+
+def measure(bike_ids, options, consume):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    db.session.expunge_all()
+    engine = db.engine
+    event.listen(engine, 'after_cursor_execute', record)
+    try:
+        bikes = db.session.query(Bike).options(*options).filter(Bike.id.in_(bike_ids)).all()
+        for bike in bikes:
+            consume(bike)
+    finally:
+        event.remove(engine, 'after_cursor_execute', record)
+
+    rows = 0
+    values = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            fetched = conn.exec_driver_sql(statement, parameters).fetchall()
+            rows += len(fetched)
+            values += sum(len(row) for row in fetched)
+    return len(statements), rows, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure rows fetched per loader profile')
+    parser.add_argument('--limit', type=int, default=50, help='Number of bikes to load per profile')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        bike_ids = [bike_id for (bike_id,) in db.session.query(Bike.id).order_by(Bike.id).limit(args.limit).all()]
+        if not bike_ids:
+            print("No bikes in the database - nothing to measure.")
+            return
+        print(f"Loading {len(bike_ids)} bikes per profile\n")
+        print(f"{'profile':<9} {'before: queries':>16} {'rows':>7} {'values':>8}   {'after: queries':>15} {'rows':>7} {'values':>8}")
+        for profile, legacy in LEGACY_OPTIONS.items():
+            before = measure(bike_ids, legacy(), CONSUMERS[profile])
+            after = measure(bike_ids, bike_loader(profile), CONSUMERS[profile])
+            print(f"{profile:<9} {before[0]:>16} {before[1]:>7} {before[2]:>8}   {after[0]:>15} {after[1]:>7} {after[2]:>8}")
+
+
+if __name__ == "__main__":
+    main()
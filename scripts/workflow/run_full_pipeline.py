@@ -9,7 +9,8 @@ This script runs the complete data pipeline:
 4. Deduplicate standardized data
 5. Drop bike data from database
 6. Migrate new data to database
-7. Send email notification
+7. Warm page caches
+8. Send email notification
 
 All steps run in a transaction for safe rollback on failure.
 """
@@ -617,6 +618,42 @@ def step_6_migrate(stats, app):
     return success
 
 
+def step_7_warm_cache(stats, app):
+    """Step 7: Pre-render pages so the first visitors hit a warm cache"""
+    stats.start_step('cache_warmup')
+    print("\n" + "="*80)
+    print("STEP 7: WARMING PAGE CACHES")
+    print("="*80)
+    sys.stdout.flush()
+
+    routes_count = 0
+    failed_count = 0
+    error = None
+    try:
+        from app.services.cache_warmer import warm_caches
+        results = warm_caches(app)
+        routes_count = len(results)
+        failed_count = len([r for r in results if r[1] >= 400])
+    except Exception as e:
+        error = str(e)
+        print(f"   ⚠️  Warning: Cache warm-up failed: {e}")
+
+    step_duration = stats.get_step_duration('cache_warmup')
+    print(f"\n📊 Step 7 Summary:")
+    print(f"   Status: {'✅ Success' if error is None else '⚠️  Failed (non-fatal)'}")
+    print(f"   Duration: {int(step_duration / 60)}m {int(step_duration % 60)}s")
+    print(f"   Routes warmed: {routes_count} ({failed_count} failed)")
+    sys.stdout.flush()
+
+    stats.add_step('cache_warmup', 'success' if error is None else 'failed',
+                   routes_warmed=routes_count,
+                   routes_failed=failed_count,
+                   duration=step_duration,
+                   error=error)
+    # A cold cache only costs latency, so this step never stops the pipeline
+    return True
+
+
 def main():
     """Main pipeline execution"""
     import argparse
@@ -673,7 +710,7 @@ def main():
         # Step 1: Run scrapers
         if not args.skip_scrapers:
             print(f"\n{'='*80}")
-            print(f"🔄 Starting Step 1/6: Running Scrapers")
+            print(f"🔄 Starting Step 1/7: Running Scrapers")
             print(f"{'='*80}")
             sys.stdout.flush()
             if not step_1_run_scrapers(stats):
@@ -682,12 +719,12 @@ def main():
                 raise Exception("Pipeline stopped at scraping step")
         else:
             stats.add_step('scraping', 'skipped')
-            print(f"\n⏭️  Step 1/6: Scraping skipped (using existing data)")
+            print(f"\n⏭️  Step 1/7: Scraping skipped (using existing data)")
             sys.stdout.flush()
         
         # Step 2: Check duplicates
         print(f"\n{'='*80}")
-        print(f"🔄 Starting Step 2/6: Checking Duplicates")
+        print(f"🔄 Starting Step 2/7: Checking Duplicates")
         print(f"{'='*80}")
         sys.stdout.flush()
         if not step_2_check_duplicates(stats):
@@ -697,7 +734,7 @@ def main():
         
         # Step 3: Standardize
         print(f"\n{'='*80}")
-        print(f"🔄 Starting Step 3/6: Standardizing Data")
+        print(f"🔄 Starting Step 3/7: Standardizing Data")
         print(f"{'='*80}")
         sys.stdout.flush()
         if not step_3_standardize(stats):
@@ -707,7 +744,7 @@ def main():
         
         # Step 4: Deduplicate standardized data (cross-category duplicates)
         print(f"\n{'='*80}")
-        print(f"🔄 Starting Step 4/6: Deduplicating Standardized Data")
+        print(f"🔄 Starting Step 4/7: Deduplicating Standardized Data")
         print(f"{'='*80}")
         sys.stdout.flush()
         if not step_4_deduplicate(stats):
@@ -718,7 +755,7 @@ def main():
         # Step 5: Drop data (only if not dry-run)
         if not args.dry_run:
             print(f"\n{'='*80}")
-            print(f"🔄 Starting Step 5/6: Dropping Bike Data")
+            print(f"🔄 Starting Step 5/7: Dropping Bike Data")
             print(f"{'='*80}")
             sys.stdout.flush()
             if not step_5_drop_data(stats, app):
@@ -727,13 +764,13 @@ def main():
                 raise Exception("Pipeline stopped at drop data step")
         else:
             stats.add_step('drop_data', 'skipped')
-            print(f"\n⏭️  Step 5/6: Drop data skipped (dry-run mode)")
+            print(f"\n⏭️  Step 5/7: Drop data skipped (dry-run mode)")
             sys.stdout.flush()
         
         # Step 6: Migrate (only if not dry-run)
         if not args.dry_run:
             print(f"\n{'='*80}")
-            print(f"🔄 Starting Step 6/6: Migrating Data to Database")
+            print(f"🔄 Starting Step 6/7: Migrating Data to Database")
             print(f"{'='*80}")
             sys.stdout.flush()
             if not step_6_migrate(stats, app):
@@ -742,7 +779,19 @@ def main():
                 raise Exception("Pipeline stopped at migration step")
         else:
             stats.add_step('migration', 'skipped')
-            print(f"\n⏭️  Step 6/6: Migration skipped (dry-run mode)")
+            print(f"\n⏭️  Step 6/7: Migration skipped (dry-run mode)")
+            sys.stdout.flush()
+        
+        # Step 7: Warm caches (only if data was migrated)
+        if not args.dry_run:
+            print(f"\n{'='*80}")
+            print(f"🔄 Starting Step 7/7: Warming Page Caches")
+            print(f"{'='*80}")
+            sys.stdout.flush()
+            step_7_warm_cache(stats, app)
+        else:
+            stats.add_step('cache_warmup', 'skipped')
+            print(f"\n⏭️  Step 7/7: Cache warm-up skipped (dry-run mode)")
             sys.stdout.flush()
         
         # All steps completed
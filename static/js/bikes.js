@@ -834,23 +834,157 @@ document.addEventListener("DOMContentLoaded", () => {
     const modal = new bootstrap.Modal(modalElement);
     modal.show();
     
-    // Fetch bike details from API
-    fetch(`/api/bike/${encodeURIComponent(bikeId)}`)
+    // Fetch bike details (usually already prefetched with the visible cards)
+    getBikeDetails(bikeId)
+        .then(bike => specTranslationsReady.then(() => showBikeDetailsModal(bike)))
+        .catch(error => {
+            console.error('Error fetching bike details:', error);
+            modalBody.innerHTML = '<div class="alert alert-danger">שגיאה בטעינת פרטי האופניים. אנא נסה שוב.</div>';
+        });
+}
+
+/**
+ * Modal details for the bikes whose cards are on screen, fetched in batches
+ * from /api/bikes?ids=... so opening a modal usually needs no request.
+ */
+const BIKE_DETAILS_BATCH_SIZE = 50;  // server-side limit per request
+const BIKE_DETAILS_PREFETCH_DELAY = 200;
+const bikeDetailsCache = new Map();  // bike id -> Promise of the details (null if not found)
+let bikeDetailsQueue = [];
+let bikeDetailsTimer = null;
+
+function fetchBikeDetailsBatch(bikeIds) {
+    const batch = fetch(`/api/bikes?ids=${bikeIds.map(encodeURIComponent).join(',')}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => data.bikes || {});
+    bikeIds.forEach(bikeId => {
+        const details = batch.then(bikes => bikes[bikeId] || null);
+        // A failed batch is forgotten so the modal can retry with a single fetch
+        details.catch(() => bikeDetailsCache.delete(bikeId));
+        bikeDetailsCache.set(bikeId, details);
+    });
+}
+
+function flushBikeDetailsQueue() {
+    bikeDetailsTimer = null;
+    const bikeIds = bikeDetailsQueue.filter(bikeId => !bikeDetailsCache.has(bikeId));
+    bikeDetailsQueue = [];
+    for (let i = 0; i < bikeIds.length; i += BIKE_DETAILS_BATCH_SIZE) {
+        fetchBikeDetailsBatch(bikeIds.slice(i, i + BIKE_DETAILS_BATCH_SIZE));
+    }
+}
+
+function prefetchBikeDetails(bikeIds) {
+    bikeIds.forEach(bikeId => {
+        bikeId = String(bikeId);
+        if (!bikeDetailsCache.has(bikeId) && !bikeDetailsQueue.includes(bikeId)) {
+            bikeDetailsQueue.push(bikeId);
+        }
+    });
+    if (bikeDetailsQueue.length && !bikeDetailsTimer) {
+        bikeDetailsTimer = setTimeout(flushBikeDetailsQueue, BIKE_DETAILS_PREFETCH_DELAY);
+    }
+}
+
+function getBikeDetails(bikeId) {
+    bikeId = String(bikeId);
+    const prefetched = bikeDetailsCache.get(bikeId);
+    if (prefetched) {
+        return prefetched.then(bike => {
+            if (!bike) {
+                throw new Error(`Bike ${bikeId} not found`);
+            }
+            return bike;
+        });
+    }
+    return fetch(`/api/bike/${encodeURIComponent(bikeId)}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        });
+}
+
+function watchBikeCardsForPrefetch(container) {
+    if (!container || !('IntersectionObserver' in window)) {
+        return;
+    }
+    const visibility = new IntersectionObserver(entries => {
+        const visible = entries.filter(entry => entry.isIntersecting);
+        visible.forEach(entry => visibility.unobserve(entry.target));
+        prefetchBikeDetails(visible.map(entry => entry.target.getAttribute('data-bike-id')).filter(Boolean));
+    }, { rootMargin: '200px 0px' });
+    const observeCards = () => container.querySelectorAll('.bike-card[data-bike-id]').forEach(card => visibility.observe(card));
+    // Cards are re-rendered by filtering and appended by infinite scroll
+    new MutationObserver(observeCards).observe(container, { childList: true });
+    observeCards();
+}
+
+/**
+ * Spec-key -> Hebrew labels, shared with the server side
+ * (app/utils/spec_translations.py). The JSON asset's URL is versioned via
+ * <meta name="spec-translations-url">, so it is fetched once per version and
+ * kept in localStorage between pages.
+ */
+const SPEC_TRANSLATIONS_STORAGE_KEY = 'specTranslations';
+let specTranslations = {};
+
+function normalizeSpecKey(key) {
+    return String(key).toLowerCase().replace(/[_-]/g, ' ').trim().split(/\s+/).join(' ');
+}
+
+function loadSpecTranslations() {
+    const meta = document.querySelector('meta[name="spec-translations-url"]');
+    if (!meta) {
+        return Promise.resolve(specTranslations);
+    }
+    const url = meta.content;
+    try {
+        const stored = JSON.parse(localStorage.getItem(SPEC_TRANSLATIONS_STORAGE_KEY));
+        if (stored && stored.url === url && stored.translations) {
+            specTranslations = stored.translations;
+            return Promise.resolve(specTranslations);
+        }
+    } catch (e) {
+        // Storage disabled or corrupt entry - fall through to the network
+    }
+    return fetch(url)
         .then(response => {
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             return response.json();
         })
-        .then(bike => {
-            showBikeDetailsModal(bike);
+        .then(data => {
+            specTranslations = data.translations || {};
+            try {
+                localStorage.setItem(SPEC_TRANSLATIONS_STORAGE_KEY, JSON.stringify({ url, translations: specTranslations }));
+            } catch (e) {
+                // Quota exceeded / private mode: the HTTP cache still has it
+            }
+            return specTranslations;
         })
         .catch(error => {
-            console.error('Error fetching bike details:', error);
-            modalBody.innerHTML = '<div class="alert alert-danger">שגיאה בטעינת פרטי האופניים. אנא נסה שוב.</div>';
+            console.error('Error loading spec translations:', error);
+            return specTranslations;
         });
 }
 
+const specTranslationsReady = loadSpecTranslations();
+
+/**
+ * Hebrew label for a spec key, or a readable version of the key itself
+ */
+function translateSpecKey(key) {
+    return specTranslations[normalizeSpecKey(key)] || formatFieldName(key);
+}
+
 /**
  * Format field names for display when no Hebrew translation exists
  * Converts snake_case or camelCase to readable format
@@ -883,149 +1017,6 @@ function showBikeDetailsModal(bike) {
         // Adapt bike data to work with both old and new formats
         const adaptedBike = adaptBikeData(bike);
         
-        // Field translations and organization (includes common raw spec keys)
-        const fieldTranslations = {
-            'brand': 'מותג',
-            'model': 'דגם',
-            'year': 'שנה',
-            'bike_type': 'סוג אופניים',
-            'bike_series': 'סדרה',
-            'price': 'מחיר',
-            'disc_price': 'מחיר מבצע',
-            'motor': 'מנוע',
-            'battery': 'סוללה',
-            'wh': '(WH) סוללה',
-            'fork': 'בולם קדמי',
-            'rear_shock': 'בולם אחורי',
-            'shock': 'בולם',
-            'frame': 'שלדה',
-            'tires': 'צמיגים',
-            'brakes': 'בלמים',
-            'weight': 'משקל',
-            'wheel_size': 'גודל גלגלים',
-            'sub_category': 'סוג אופניים',
-            'size': 'מידה',
-            'sizes': 'מידות',
-            'sku': 'מק"ט',
-            'gear_count': 'מספר הילוכים',
-            'number_of_gears': 'מספר הילוכים',
-            'front_brake': 'ברקס קידמי',
-            'rear_brake': 'ברקס אחורי',
-            'front_tire': 'צמיג קדמי',
-            'rear_tire': 'צמיג אחורי',
-            'saddle': 'אוכף',
-            'pedals': 'דוושות',
-            'charger': 'מטען',
-            'screen': 'מסך',
-            'extras': 'תוספות',
-            'additionals': 'תוספות',
-            'rear_der': 'מעביר אחורי',
-            'shifter': 'שיפטר',
-            'shifters': 'שיפטרים',
-            'crank_set': 'קראנק',
-            'crankset': 'קראנק',
-            'crank': 'קראנק',
-            'chain': 'שרשרת',
-            'chainring': 'גלגל שיניים',
-            'chainset': 'קראנק',
-            'chainstay': 'זרוע אחורית',
-            'cassette': 'קסטה',
-            'rotors': 'רוטורים',
-            'rotor': 'רוטור',
-            'handlebar': 'כידון',
-            'handelbar': 'כידון',
-            'bar': 'כידון',
-            'seat_post': 'מוט אוכף',
-            'seatpost': 'מוט אוכף',
-            'seatpost_clamp': 'מהדק מוט אוכף',
-            'stem': 'סטם',
-            'lights': 'תאורה',
-            'lighting': 'תאורה',
-            'wheels': 'גלגלים',
-            'wheelset': 'סט גלגלים',
-            'wheelbase': 'בסיס גלגלים',
-            'rims': 'חישוקים',
-            'spokes': 'חישורים',
-            'front_hub': 'ציר קדמי',
-            'rear_hub': 'ציר אחורי',
-            'hub': 'רכזת',
-            'hubs': 'רכזות',
-            'headset': 'הד סט',
-            'head tube': 'צינור היגוי',
-            'remote': 'שלט',
-            'fork_length': 'אורך בולמים',
-            'chain_guide': 'מדריך שרשרת',
-            'chainguide': 'מדריך שרשרת',
-            'tubes': 'פנימיות',
-            'front_wheel': 'גלגל קדמי',
-            'rear_wheel': 'גלגל אחורי',
-            'rear_derailleur': 'מעביר אחורי',
-            'rear derailleur': 'מעביר אחורי',
-            'front_derailleur': 'מעביר קדמי',
-            'front derailleur': 'מעביר קדמי',
-            'derailleur': 'מעביר',
-            'mech': 'מעביר',
-            'bb': 'בראקט תחתון',
-            'bottom_bracket': 'בראקט תחתון',
-            'battery_capacity': 'קיבולת סוללה',
-            'front_wheel_size': 'גודל גלגל קדמי',
-            'rear_wheel_size': 'גודל גלגל אחורי',
-            'battery_watts_per_hour': 'סוללה (WH)',
-            'rear_wheel_maxtravel': 'מהלך מקסימלי אחורי',
-            'brake_lever': 'ידית בלם',
-            'brake_levers': 'ידיות בלם',
-            'brake levers': 'ידיות בלם',
-            'clamp': 'מהדק',
-            'seat_clamp': 'מהדק אוכף',
-            'front_axle': 'ציר קדמי',
-            'rear_axle': 'ציר אחורי',
-            'axle': 'ציר',
-            'category': 'קטגוריה',
-            'style': 'סגנון',
-            'suspension': 'מתלה',
-            'groupset': 'קבוצת העברה',
-            'drivetrain': 'מערכת הינע',
-            'display': 'תצוגה',
-            'controller': 'בקר',
-            'control_system': 'מערכת בקרה',
-            'accessories': 'אביזרים',
-            'grips': 'גריפים',
-            'grip': 'גריפ',
-            'seat': 'אוכף',
-            'tire': 'צמיג',
-            'tyres': 'צמיגים',
-            'valve': 'ונטיל',
-            'speed': 'מהירות',
-            'speeds': 'הילוכים',
-            'gears': 'הילוכים',
-            'color': 'צבע',
-            'colours': 'צבעים',
-            'colors': 'צבעים',
-            'material': 'חומר',
-            'travel': 'מהלך',
-            'trail': 'טרייל',
-            'seat angle': 'זווית אוכף',
-            'bottom bracket drop': 'ירידת בראקט',
-            'front guide': 'מדריך קדמי',
-            'diameter': 'קוטר',
-            'width': 'רוחב',
-            'length': 'אורך',
-            'height': 'גובה',
-            'angle': 'זווית',
-            'reach': 'ריץ\'',
-            'stack': 'סטאק',
-            'range': 'טווח',
-            'torque': 'מומנט',
-            'power': 'עוצמה',
-            'voltage': 'מתח',
-            'amperage': 'עוצמת זרם',
-            'charge_time': 'זמן טעינה',
-            'charging_time': 'זמן טעינה',
-            'rim_tape': 'סרט חישוק',
-            'handlebar_tape': 'סרט כידון',
-            'additionals': 'תוספות'
-        };
-        
         // Define the order of fields to display
         const fieldOrder = [
             'brand',
@@ -1164,7 +1155,7 @@ function showBikeDetailsModal(bike) {
             }
             
             // Translate the field name, or format it nicely if no translation exists
-            const translatedKey = fieldTranslations[key] || formatFieldName(key);
+            const translatedKey = translateSpecKey(key);
             
             // Check if value is long and needs collapsible functionality
             const isLongValue = value && value.length > 100;
@@ -1207,7 +1198,7 @@ function showBikeDetailsModal(bike) {
                 }
                 
                 // Translate the field name if translation exists, otherwise format it nicely
-                const translatedKey = fieldTranslations[key] || formatFieldName(key);
+                const translatedKey = translateSpecKey(key);
                 
                 // Check if value is long and needs collapsible functionality
                 const isLongValue = value && value.length > 100;
@@ -1457,6 +1448,7 @@ function showBikeDetailsModal(bike) {
     // Attach initial button listeners
     attachCompareButtonListeners();
     attachPurchaseButtonListeners();
+    watchBikeCardsForPrefetch(bikesList);
 
     
     // Only load bikes via AJAX if they're not already rendered server-side
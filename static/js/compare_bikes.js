@@ -113,6 +113,135 @@ document.addEventListener('click', function(e) {
     }
 });
 
+/**
+ * AI comparisons run as background jobs: POST queues one, then we poll its
+ * status URL until it is done. When the server offers an events stream
+ * (job.events_url, AI_JOB_EVENTS) we follow that instead, falling back to
+ * polling if EventSource is unavailable or the stream drops. Resolves with the finished job,
+ * which carries data / comparison_id / share_url. A comparison of the same
+ * bikes that is already stored comes back done (cached: true) right away;
+ * pass refresh to generate a new one. While the answer is generated, each
+ * finished part ({field, value} or {field, index, value} for bikes[i]) is
+ * passed to onPartial as it arrives.
+ */
+const AI_JOB_POLL_INTERVAL = 1500;
+
+function aiJobResult(job) {
+    if (job.status === 'done') {
+        return job;
+    }
+    throw new Error(job.error || 'שגיאה ביצירת ההשוואה');
+}
+
+function pollAiComparisonJob(statusUrl, onPartial) {
+    let seenParts = 0;
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(statusUrl, { cache: 'no-store' })
+                .then(async res => {
+                    const job = await res.json();
+                    if (!res.ok) {
+                        throw new Error(job.error || `HTTP error! status: ${res.status}`);
+                    }
+                    if (onPartial && job.partial) {
+                        job.partial.slice(seenParts).forEach(onPartial);
+                        seenParts = Math.max(seenParts, job.partial.length);
+                    }
+                    if (job.status === 'done' || job.status === 'failed') {
+                        resolve(aiJobResult(job));
+                    } else {
+                        setTimeout(poll, AI_JOB_POLL_INTERVAL);
+                    }
+                })
+                .catch(reject);
+        };
+        poll();
+    });
+}
+
+function waitForAiComparisonJob(job, onPartial) {
+    if (job.status === 'done' || job.status === 'failed') {
+        return Promise.resolve(job).then(aiJobResult);
+    }
+    if (!job.events_url || !window.EventSource) {
+        return pollAiComparisonJob(job.status_url, onPartial);
+    }
+    return new Promise((resolve, reject) => {
+        const events = new EventSource(job.events_url);
+        if (onPartial) {
+            events.addEventListener('partial', event => onPartial(JSON.parse(event.data)));
+        }
+        const finish = event => {
+            events.close();
+            try {
+                resolve(aiJobResult(JSON.parse(event.data)));
+            } catch (err) {
+                reject(err);
+            }
+        };
+        events.addEventListener('done', finish);
+        events.addEventListener('failed', finish);
+        events.onerror = () => {
+            // Stream closed early (proxy timeout, network): fall back to polling
+            events.close();
+            pollAiComparisonJob(job.status_url, onPartial).then(resolve, reject);
+        };
+    });
+}
+
+function fetchAiComparison(refresh = false, onPartial = null) {
+    return fetch(refresh ? "/api/compare_ai_jobs?refresh=1" : "/api/compare_ai_jobs", { method: "POST" })
+        .then(async res => {
+            const data = await res.json();
+            if (!res.ok) {
+                // Extract error message from response if available
+                const errorMsg = data.error || `HTTP error! status: ${res.status}`;
+                throw new Error(errorMsg);
+            }
+            return data;
+        })
+        .then(job => waitForAiComparisonJob(job, onPartial));
+}
+
+function renderAiBikeCard(bike) {
+    const card = document.createElement('div');
+    card.className = 'card mb-3';
+    card.innerHTML = `
+        <div class="card-header fw-bold d-flex justify-content-between align-items-center">
+            <span>${bike.name}</span>
+        </div>
+        <div class="card-body">
+            <p><strong>👍 יתרונות:</strong> ${bike.pros?.join(', ')}</p>
+            <p><strong>👎 חסרונות:</strong> ${bike.cons?.join(', ')}</p>
+            <p><strong>🚵‍♂️ מתאים ל:</strong> ${bike.best_for}</p>
+        </div>
+    `;
+    return card;
+}
+
+// Show one finished part of a comparison that is still being generated
+function renderAiComparisonPart(part) {
+    const textElements = {
+        intro: 'ai-intro',
+        recommendation: 'ai-recommendation',
+        expert_tip: 'ai-expert-tip',
+    };
+    if (textElements[part.field]) {
+        const element = document.getElementById(textElements[part.field]);
+        if (element) {
+            element.textContent = part.value || '';
+        }
+    } else if (part.field === 'bikes' && part.value) {
+        const analysisContainer = document.getElementById('ai-bike-analysis');
+        if (analysisContainer) {
+            if (part.index === 0) {
+                analysisContainer.innerHTML = '';
+            }
+            analysisContainer.appendChild(renderAiBikeCard(part.value));
+        }
+    }
+}
+
 function runAiComparison() {
     const container = document.getElementById("ai-comparison-container");
     
@@ -130,16 +259,28 @@ function runAiComparison() {
         startThinkingAnimation();
     }
 
-    fetch("/api/compare_ai_from_session")
-        .then(async res => {
-            const data = await res.json();
-            if (!res.ok) {
-                // Extract error message from response if available
-                const errorMsg = data.error || `HTTP error! status: ${res.status}`;
-                throw new Error(errorMsg);
+    let showingParts = false;
+    const onPartial = part => {
+        // First part: swap the loading message for the (partly filled) comparison
+        if (!showingParts) {
+            showingParts = true;
+            if (loadingDiv) {
+                loadingDiv.style.display = 'none';
+                stopThinkingAnimation();
             }
-            return data;
-        })
+            ['ai-intro', 'ai-recommendation', 'ai-expert-tip', 'ai-bike-analysis'].forEach(id => {
+                const element = document.getElementById(id);
+                if (element) {
+                    element.textContent = '';
+                }
+            });
+            container.style.display = "block";
+            container.scrollIntoView({ behavior: "smooth" });
+        }
+        renderAiComparisonPart(part);
+    };
+
+    fetchAiComparison(false, onPartial)
         .then(data => {
             // Hide loading message
             if (loadingDiv) {
@@ -157,7 +298,9 @@ function runAiComparison() {
             
             // Show the container only after successful API response
             container.style.display = "block";
-            container.scrollIntoView({ behavior: "smooth" });
+            if (!showingParts) {
+                container.scrollIntoView({ behavior: "smooth" });
+            }
             
             // Handle new response format with comparison_id and share_url
             let comparisonData = data;
@@ -207,19 +350,7 @@ function runAiComparison() {
             analysisContainer.innerHTML = '';
 
             comparisonData.bikes?.forEach(bike => {
-                const card = document.createElement('div');
-                card.className = 'card mb-3';
-                card.innerHTML = `
-                    <div class="card-header fw-bold d-flex justify-content-between align-items-center">
-                        <span>${bike.name}</span>
-                    </div>
-                    <div class="card-body">
-                        <p><strong>👍 יתרונות:</strong> ${bike.pros?.join(', ')}</p>
-                        <p><strong>👎 חסרונות:</strong> ${bike.cons?.join(', ')}</p>
-                        <p><strong>🚵‍♂️ מתאים ל:</strong> ${bike.best_for}</p>
-                    </div>
-                `;
-                analysisContainer.appendChild(card);
+                analysisContainer.appendChild(renderAiBikeCard(bike));
             });
 
             // Note: WhatsApp share button is already handled above
@@ -0,0 +1,49 @@
+"""
+Shared fixtures: a TestingConfig app on a throwaway SQLite database.
+
+The environment is set before ``app.config`` is imported (create_app loads
+``.env`` with override=True, which would otherwise point the tests at a real
+database).
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+_TMP = tempfile.mkdtemp(prefix='emtb-tests-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_TMP, 'test.db')
+os.environ['CACHE_DIR'] = os.path.join(_TMP, 'cache')
+os.environ['COUNTER_SPOOL_DIR'] = os.path.join(_TMP, 'counters')
+os.environ['FEATURE_STORE_DIR'] = os.path.join(_TMP, 'features')
+
+import app.config  # noqa: E402,F401  (read the settings above before .env can override them)
+from app import create_app  # noqa: E402
+from app.extensions import cache, db  # noqa: E402
+
+
+@compiles(BigInteger, 'sqlite')
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY; production runs MySQL
+    return 'INTEGER'
+
+
+@pytest.fixture(scope='session')
+def app():
+    application = create_app('testing')
+    yield application
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture
+def app_ctx(app):
+    """App context with empty tables and an empty cache."""
+    with app.test_request_context():
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+        yield app
+        db.session.remove()
@@ -0,0 +1,61 @@
+"""Slug / uuid resolution through the in-memory bike index."""
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Bike
+from app.services import bike_index
+from app.services.bike_index import resolve_bike_id, resolve_bike_ids
+
+
+@pytest.fixture
+def bikes(app_ctx, monkeypatch):
+    db.session.add(Bike(id=1, model='One', slug='index-bike-one', uuid='11111111-1111-1111-1111-111111111111'))
+    db.session.commit()
+    # Every test database starts at the same catalog version: don't reuse another test's index
+    monkeypatch.setattr(bike_index, '_current', {'version': None, 'index': None})
+
+
+@pytest.fixture
+def queries(app_ctx):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT') and 'bikes' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+
+def test_slug_and_uuid_resolve_from_memory(bikes, queries):
+    resolve_bike_id('index-bike-one')
+    queries.clear()
+    assert resolve_bike_id('index-bike-one') == 1
+    assert resolve_bike_id('11111111-1111-1111-1111-111111111111') == 1
+    assert resolve_bike_ids(['index-bike-one', 'nope-1']) == {'index-bike-one': 1}
+    assert len(queries) == 2  # only the unknown identifier went to the database
+
+
+def test_unknown_identifier_is_remembered(bikes, queries):
+    resolve_bike_id('index-bike-one')
+    queries.clear()
+    assert resolve_bike_id('no-such-bike') is None
+    looked_up = len(queries)
+    assert looked_up == 2
+    assert resolve_bike_id('no-such-bike') is None
+    assert resolve_bike_ids(['no-such-bike']) == {}
+    assert len(queries) == looked_up
+
+
+def test_remembered_miss_expires(bikes, queries, monkeypatch):
+    assert resolve_bike_id('added-later') is None
+    db.session.add(Bike(id=2, model='Two', slug='added-later', uuid='22222222-2222-2222-2222-222222222222'))
+    db.session.commit()
+    assert resolve_bike_id('added-later') is None
+
+    monkeypatch.setattr(bike_index, 'MISS_SECONDS', 0)
+    bike_index.get_bike_index().add_miss('added-later')
+    assert resolve_bike_id('added-later') == 2
@@ -0,0 +1,46 @@
+"""Cross-worker locks on the file backend: exclusive, owned by a token, and expiring."""
+
+import os
+import shutil
+import time
+
+import pytest
+
+from app.utils.cache_lock import _lock_path, acquire_lock, release_lock
+
+
+@pytest.fixture(autouse=True)
+def no_locks(app_ctx):
+    shutil.rmtree(os.path.dirname(_lock_path('any')), ignore_errors=True)
+
+
+def test_lock_is_exclusive_until_released(app_ctx):
+    token = acquire_lock('tagged:key', timeout=30)
+    assert token
+    assert acquire_lock('tagged:key', timeout=30) is None
+    assert acquire_lock('tagged:other', timeout=30)
+
+    release_lock('tagged:key', token)
+    assert acquire_lock('tagged:key', timeout=30)
+
+
+def test_release_needs_the_holders_token(app_ctx):
+    token = acquire_lock('tagged:key', timeout=30)
+    assert token
+    release_lock('tagged:key', 'not-the-token')
+    assert acquire_lock('tagged:key', timeout=30) is None
+    release_lock('tagged:key', token)
+
+
+def test_expired_lock_is_taken_over(app_ctx):
+    stale = acquire_lock('tagged:key', timeout=30)
+    assert stale
+    old = time.time() - 60
+    os.utime(_lock_path('tagged:key'), (old, old))
+
+    token = acquire_lock('tagged:key', timeout=30)
+    assert token and token != stale
+    # The previous holder's late release must not free the new holder's lock
+    release_lock('tagged:key', stale)
+    assert acquire_lock('tagged:key', timeout=30) is None
+    release_lock('tagged:key', token)
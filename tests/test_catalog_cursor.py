@@ -0,0 +1,73 @@
+"""Keyset cursors for /api/filter_bikes: the codec and paging through every sort."""
+
+import base64
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models import BikeCatalogRow, CompareCount
+from app.services.catalog_service import (
+    CATALOG_SORTS, InvalidCursor, catalog_page_after, decode_cursor, encode_cursor,
+)
+from app.services.data_version import bump_data_version, CATALOG
+
+
+def _raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('sort, key, bike_id', [
+    ('id', 0, 1),
+    ('price_asc', 12900, 42),
+    ('year_desc', 2025, 7),
+    ('popularity', 0, 10 ** 12),
+])
+def test_cursor_round_trip(sort, key, bike_id):
+    cursor = encode_cursor(sort, key, bike_id)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, sort) == (key, bike_id)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor('price_asc', 100, 1), 'price_desc')
+
+
+@pytest.mark.parametrize('cursor', [
+    '', 'not a cursor!', 'abc', _raw_cursor({'sort': 'id'}), _raw_cursor(['id', 1]),
+    _raw_cursor(['id', 'cheap', 1]), _raw_cursor(['id', [1], 1]), _raw_cursor('xyz'),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 'id')
+
+
+def test_pages_cover_every_sort_without_gaps(app_ctx):
+    prices = [None, 9000, 9000, 15000, 4000, None, 22000, 9000, 31000, 15000, 4000, 12000, 18000]
+    years = [2024, None, 2023, 2024, 2025, 2022, 2024, None, 2023, 2025, 2024, 2022, 2023]
+    counts = [0, 5, 5, None, 12, 3, 5, None, 1, 12, 0, 7, 3]
+    for i, (price, year, count) in enumerate(zip(prices, years, counts), start=1):
+        db.session.add(BikeCatalogRow(bike_id=i, public_id=f'bike-{i}', brand='Brand', model=f'Model {i}',
+                                      category='electric', price_value=price, year=year))
+        if count is not None:
+            db.session.add(CompareCount(bike_id=i, count=count))
+    db.session.commit()
+    bump_data_version(CATALOG)
+
+    filters = {'category': 'electric'}
+    for sort in CATALOG_SORTS:
+        everything, last_cursor = catalog_page_after(filters, sort=sort, limit=100)
+        assert last_cursor is None
+        assert sorted(everything) == list(range(1, len(prices) + 1))
+
+        paged, cursor = [], None
+        while True:
+            ids, cursor = catalog_page_after(filters, sort=sort, cursor=cursor, limit=4)
+            paged.extend(ids)
+            if cursor is None:
+                break
+        assert paged == everything, sort
+
+    popular, _ = catalog_page_after(filters, sort='popularity', limit=100)
+    assert [counts[i - 1] or 0 for i in popular] == sorted((c or 0 for c in counts), reverse=True)
@@ -0,0 +1,73 @@
+"""FeatureStore.mask and filtered_catalog_query must select the same bikes."""
+
+import pytest
+
+from app.extensions import db
+from app.models import BikeCatalogRow
+from app.services.catalog_service import filtered_catalog_query
+from app.services.feature_store import build_feature_store
+
+ROWS = [
+    # bike_id, brand, model, year, category, sub_category, style, price_value, disc_price, wh, fork_mm, frame, motor
+    (1, 'Giant', 'Trance X E+ 2', 2024, 'electric', 'electric_mtb', 'trail', 28000, None, 750, 150, 'aluminium', 'Yamaha'),
+    (2, 'Giant', 'Reign 100%', 2023, 'mtb', 'full_suspension', 'enduro', 15000, '13,500', None, 170, 'carbon', None),
+    (3, 'Cube', 'Stereo_Hybrid', None, 'electric', 'electric_mtb', 'trail', None, None, 0, None, None, 'Bosch'),
+    (4, 'Trek', 'FX 3', 2025, 'city', 'city', None, 4200, '', None, 0, 'aluminium', None),
+    (5, 'cube', 'Kathmandu', 2024, 'electric', 'electric_ city', None, 17000, '15,900', 625, None, None, 'Bosch'),
+    (6, 'Scott', 'Spark RC', 2022, 'mtb', 'full_suspension', 'xc', 32000, None, None, 120, 'carbon', None),
+]
+
+FILTERS = [
+    {},
+    {'q': 'giant'},
+    {'q': '100%'},
+    {'q': '%'},
+    {'q': 'o_h'},
+    {'q': '_'},
+    {'q': 'e+'},
+    {'q': 'cube'},
+    {'years': [2024]},
+    {'years': [2022, 2025]},
+    {'brands': ['Giant', 'Trek']},
+    {'min_price': 10000},
+    {'max_price': 16000},
+    {'min_price': 5000, 'max_price': 20000},
+    {'min_battery': 700},
+    {'max_battery': 650},
+    {'min_fork': 140, 'max_fork': 160},
+    {'frame_material': 'carbon'},
+    {'motor_brands': ['Bosch']},
+    {'has_discount': True},
+    {'sub_categories': ['electric_city']},
+    {'sub_categories': ['electric_mtb', 'full_suspension']},
+    {'styles': ['trail']},
+    {'category': 'electric'},
+    {'category': 'electric', 'q': 'a', 'min_price': 1000, 'motor_brands': ['Bosch', 'Yamaha']},
+]
+
+
+@pytest.fixture
+def catalog(app_ctx):
+    for (bike_id, brand, model, year, category, sub_category, style, price_value, disc_price,
+         wh, fork_mm, frame_material, motor_brand) in ROWS:
+        db.session.add(BikeCatalogRow(
+            bike_id=bike_id, public_id=f'bike-{bike_id}', brand=brand, model=model, year=year,
+            category=category, sub_category=sub_category, style=style, price_value=price_value,
+            price=str(price_value) if price_value else None, disc_price=disc_price, wh=wh, fork_mm=fork_mm,
+            frame_material=frame_material, motor_brand=motor_brand,
+        ))
+    db.session.commit()
+    return build_feature_store()
+
+
+@pytest.mark.parametrize('filters', FILTERS, ids=repr)
+def test_mask_matches_sql(catalog, filters):
+    sql_ids = {bike_id for (bike_id,) in filtered_catalog_query(filters, columns=[BikeCatalogRow.bike_id])}
+    mask_ids = set(catalog.ids[catalog.mask(filters)].tolist())
+    assert mask_ids == sql_ids
+
+
+def test_search_is_literal(catalog):
+    """% and _ in the search text are characters, not wildcards."""
+    ids = {bike_id for (bike_id,) in filtered_catalog_query({'q': '_'}, columns=[BikeCatalogRow.bike_id])}
+    assert ids == {3}
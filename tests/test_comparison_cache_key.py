@@ -0,0 +1,43 @@
+"""comparison_cache_key identifies a set of bikes, not the way it was requested."""
+
+import pytest
+
+from app.extensions import db
+from app.models import Bike
+from app.services.comparison_jobs import comparison_cache_key
+from app.services.data_version import bump_data_version, CATALOG
+
+
+@pytest.fixture
+def bikes(app_ctx):
+    rows = [Bike(id=i, model=f'Model {i}', slug=f'cache-key-bike-{i}', uuid=f'00000000-0000-0000-0000-00000000000{i}')
+            for i in range(1, 4)]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [(bike.slug, bike.uuid) for bike in rows]
+
+
+def test_key_ignores_order_and_identifier_kind(bikes):
+    (slug1, uuid1), (slug2, uuid2), (slug3, _) = bikes
+    key = comparison_cache_key([slug1, slug2, slug3])
+    assert key is not None
+    assert comparison_cache_key([slug3, slug1, slug2]) == key
+    assert comparison_cache_key([uuid2, slug3, uuid1]) == key
+    assert comparison_cache_key([slug1, uuid1, slug2, slug3]) == key
+
+
+def test_key_depends_on_the_bikes(bikes):
+    (slug1, _), (slug2, _), (slug3, _) = bikes
+    assert comparison_cache_key([slug1, slug2]) != comparison_cache_key([slug1, slug3])
+
+
+def test_unknown_bike_has_no_key(bikes):
+    (slug1, _), _, _ = bikes
+    assert comparison_cache_key([slug1, 'no-such-bike']) is None
+
+
+def test_catalog_change_moves_the_key(bikes):
+    slugs = [slug for slug, _ in bikes]
+    before = comparison_cache_key(slugs)
+    bump_data_version(CATALOG)
+    assert comparison_cache_key(slugs) != before
@@ -0,0 +1,65 @@
+"""Counter spool batches: parsing and flushing to compare_counts / purchase_clicks."""
+
+import json
+import os
+
+from app.extensions import db
+from app.models import Bike, CompareCount, PurchaseClick
+from app.services import counter_buffer
+from app.services.counter_buffer import _read_batch, flush_counters
+
+
+def _write_lines(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write((line if isinstance(line, str) else json.dumps(line)) + '\n')
+
+
+def test_read_batch_skips_malformed_events(tmp_path):
+    path = tmp_path / 'counters-1-1.batch'
+    _write_lines(path, [
+        {'e': 'compare', 'bike_id': 1},
+        {'e': 'compare', 'bike_id': 1},
+        {'e': 'compare', 'bike_id': 2},
+        {'e': 'compare'},  # no bike_id
+        {'e': 'click', 'bike_id': 2, 'importer': 'shop', 'at': '2026-01-02T03:04:05'},
+        {'e': 'click', 'bike_id': 2},  # no timestamp
+        {'e': 'click', 'bike_id': 2, 'at': 'yesterday'},
+        {'e': 'click', 'bike_id': 2, 'at': None},
+        '[1, 2]',
+        '{"e": "compare", "bike_',  # partial last line
+    ])
+
+    compares, clicks = _read_batch(str(path))
+
+    assert compares == {1: 2, 2: 1}
+    assert len(clicks) == 1
+    assert clicks[0]['bike_id'] == 2 and clicks[0]['importer'] == 'shop'
+    assert clicks[0]['created_at'].isoformat() == '2026-01-02T03:04:05'
+
+
+def test_flush_counters_writes_and_removes_batches(app_ctx):
+    db.session.add_all([Bike(id=1, model='One'), Bike(id=2, model='Two')])
+    db.session.add(CompareCount(bike_id=1, count=5))
+    db.session.commit()
+
+    directory = app_ctx.config['COUNTER_SPOOL_DIR']
+    os.makedirs(directory, exist_ok=True)
+    spool = os.path.join(directory, f'counters-{os.getpid()}.spool')
+    _write_lines(spool, [
+        {'e': 'compare', 'bike_id': 1},
+        {'e': 'compare', 'bike_id': 2},
+        {'e': 'compare', 'bike_id': 2},
+        {'e': 'compare', 'bike_id': 99},  # deleted bike
+        {'e': 'click'},  # malformed
+        {'e': 'click', 'bike_id': 1, 'importer': 'shop', 'at': '2026-01-02T03:04:05'},
+    ])
+    counter_buffer._state['file'] = None
+
+    assert flush_counters(app_ctx) == (3, 1)  # bike 99's increment is dropped
+
+    counts = dict(db.session.query(CompareCount.bike_id, CompareCount.count))
+    assert counts == {1: 6, 2: 2}
+    assert [(c.bike_id, c.importer) for c in db.session.query(PurchaseClick)] == [(1, 'shop')]
+    assert not [name for name in os.listdir(directory) if name.startswith('counters-')]
+    assert flush_counters(app_ctx) == (0, 0)
@@ -0,0 +1,79 @@
+"""JsonFieldStream reports the same events however the text is split."""
+
+import json
+import random
+
+import pytest
+
+from app.utils.json_stream import JsonFieldStream
+
+DOCUMENT = {
+    'intro': 'השוואה בין "שני" דגמים, עם {סוגריים} ו-[מערכים]\\',
+    'bikes': [
+        {'name': 'Trance X E+ 2', 'pros': ['מנוע חזק', 'סוללה 750Wh'], 'cons': [], 'score': 8.5},
+        {'name': 'Levo\nSL', 'pros': ['קל'], 'cons': ['יקר'], 'score': 9, 'extra': None},
+        {'name': 'Kenevo', 'pros': [], 'cons': [], 'score': -1e3, 'flags': [True, False]},
+    ],
+    'recommendation': 'Levo SL',
+    'expert_tip': 'בדקו את לחץ האוויר \\u05d0 לפני כל רכיבה',
+    'rating': 7,
+    'done': True,
+}
+
+EXPECTED = [
+    ('field', 'intro', DOCUMENT['intro']),
+    ('item', 'bikes', 0, DOCUMENT['bikes'][0]),
+    ('item', 'bikes', 1, DOCUMENT['bikes'][1]),
+    ('item', 'bikes', 2, DOCUMENT['bikes'][2]),
+    ('field', 'recommendation', 'Levo SL'),
+    ('field', 'expert_tip', DOCUMENT['expert_tip']),
+    ('field', 'rating', 7),
+    ('field', 'done', True),
+]
+
+
+def _feed(text, sizes):
+    stream = JsonFieldStream()
+    events = []
+    position = 0
+    for size in sizes:
+        events.extend(stream.feed(text[position:position + size]))
+        position += size
+    events.extend(stream.feed(text[position:]))
+    return stream, events
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_whole_document(indent):
+    text = '```json\n' + json.dumps(DOCUMENT, ensure_ascii=False, indent=indent) + '\n```'
+    stream, events = _feed(text, [])
+    assert events == EXPECTED
+    assert stream.text == text
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_one_character_at_a_time(indent):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent)
+    _, events = _feed(text, [1] * len(text))
+    assert events == EXPECTED
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_random_chunks(seed):
+    rng = random.Random(seed)
+    text = json.dumps(DOCUMENT, ensure_ascii=seed % 2 == 0, indent=rng.choice([None, 1, 4]))
+    sizes = [rng.randint(1, 40) for _ in range(len(text))]
+    _, events = _feed(text, sizes)
+    assert events == EXPECTED
+
+
+def test_number_at_end_of_object_waits_for_delimiter():
+    stream = JsonFieldStream()
+    assert stream.feed('{"a": 12') == []
+    assert stream.feed('3') == []
+    assert stream.feed('}') == [('field', 'a', 123)]
+
+
+def test_trailing_text_is_ignored():
+    _, events = _feed('{"a": 1}\n{"b": 2}', [])
+    assert events == [('field', 'a', 1)]
@@ -0,0 +1,40 @@
+"""Conditional GETs on page-cached views."""
+
+import pytest
+
+from app.extensions import db
+from app.models import BikeCatalogRow
+from app.utils import page_cache
+
+
+@pytest.fixture
+def client(app_ctx):
+    # An empty snapshot is rebuilt (new catalog version) on every request
+    db.session.add(BikeCatalogRow(bike_id=1, public_id='bike-1', brand='Brand', model='Model'))
+    db.session.commit()
+    client = app_ctx.test_client()
+    client.get('/')  # the session's CSRF secret is part of the ETag; create it first
+    return client
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get('/')
+    assert first.status_code == 200 and first.headers['ETag']
+    again = client.get('/', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_if_modified_since_alone_is_not_a_304(client):
+    first = client.get('/')
+    again = client.get('/', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 200
+
+
+def test_new_time_bucket_changes_the_etag(client, monkeypatch):
+    first = client.get('/')
+    now = page_cache.time.time()
+    monkeypatch.setattr(page_cache.time, 'time', lambda: now + 3600)
+    again = client.get('/', headers={'If-None-Match': first.headers['ETag'],
+                                     'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 200
+    assert again.headers['ETag'] != first.headers['ETag']
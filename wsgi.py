@@ -13,5 +13,10 @@ from app import create_app
 # Create the Flask application
 application = create_app()
 
+# Optionally pre-fill the shared cache when workers boot (one worker does the work)
+if os.getenv('WARM_CACHE_ON_BOOT', 'false').lower() == 'true':
+    from app.services.cache_warmer import warm_caches_in_background
+    warm_caches_in_background(application)
+
 if __name__ == "__main__":
     application.run()